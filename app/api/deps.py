@@ -1,20 +1,29 @@
+import hmac
+import time
+from collections.abc import Awaitable, Callable
 from typing import Annotated
 
 import jwt
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from google.cloud.firestore import Client as FirestoreClient
 from pydantic import ValidationError
 
-from app.core import security
+from app.core import latency, security
+from app.core.api_keys import API_KEY_HEADER, CachedApiKey, api_key_cache, split_api_key
 from app.core.config import settings
 from app.core.database import get_database
-from app.models import TokenPayload, User
+from app.core.revocation import revocations
+from app.models import AuthenticatedUser, TokenPayload
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
 )
+optional_oauth2 = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/login/access-token", auto_error=False
+)
+api_key_header = APIKeyHeader(name=API_KEY_HEADER, auto_error=False)
 
 
 def get_db() -> FirestoreClient:
@@ -26,46 +35,154 @@ DatabaseDep = Annotated[FirestoreClient, Depends(get_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-async def get_current_user(db: DatabaseDep, token: TokenDep) -> User:
-    """Get current authenticated user."""
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-    except (InvalidTokenError, ValidationError):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Could not validate credentials",
+async def get_current_user(token: TokenDep) -> AuthenticatedUser:
+    """Get current authenticated user.
+
+    The user is described by the token's claims and checked against the
+    in-memory revocation list, so no database read is needed. Deactivating
+    a user (or changing their password or privileges) revokes their tokens.
+    """
+    with latency.timed("auth"):
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
+            )
+            token_data = TokenPayload(**payload)
+        except (InvalidTokenError, ValidationError):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Could not validate credentials",
+            )
+
+        if not (token_data.sub and token_data.jti and token_data.email) or (
+            token_data.iat is None
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Could not validate credentials",
+            )
+
+        if revocations.is_revoked(token_data.jti, token_data.sub, token_data.iat):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+            )
+
+        user = AuthenticatedUser(
+            _id=token_data.sub,
+            email=token_data.email,
+            is_superuser=token_data.superuser,
+            full_name=token_data.name,
         )
 
-    if not token_data.sub:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Get user from Firestore
-    user_ref = db.collection("users").document(token_data.sub)
-    user_doc = user_ref.get()
-    
-    if not user_doc.exists:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    user_dict = user_doc.to_dict()
-    user_dict["id"] = user_doc.id
-    user = User(**user_dict)
-    
-    if not user.is_active:
-        raise HTTPException(status_code=400, detail="Inactive user")
-
+    latency.identify_user(token_data.sub)
     return user
 
 
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[AuthenticatedUser, Depends(get_current_user)]
 
 
-def get_current_active_superuser(current_user: CurrentUser) -> User:
+def get_current_active_superuser(current_user: CurrentUser) -> AuthenticatedUser:
     """Dependency to verify current user is superuser."""
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+
+async def verify_metrics_reader(
+    token: Annotated[str | None, Depends(optional_oauth2)],
+) -> None:
+    """Dependency letting a scraper or a superuser read ``/metrics``.
+
+    Scrapers send ``Authorization: Bearer <METRICS_TOKEN>``: access tokens
+    expire too soon to be configured in one.
+    """
+    if (
+        token
+        and settings.METRICS_TOKEN
+        and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode())
+    ):
+        return
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    get_current_active_superuser(await get_current_user(token))
+
+
+def _load_api_key(db: FirestoreClient, key_id: str) -> CachedApiKey:
+    snapshot = db.collection("api_keys").document(key_id).get()
+    if not snapshot.exists:
+        return CachedApiKey(b"", (), None, time.monotonic())
+    key = snapshot.to_dict()
+    user_doc = db.collection("users").document(key["user_id"]).get()
+    user = None
+    if user_doc.exists and user_doc.get("is_active"):
+        # Devices never act with superuser privileges
+        user = AuthenticatedUser(
+            **{**user_doc.to_dict(), "is_superuser": False}, _id=user_doc.id
+        )
+    return CachedApiKey(
+        key["secret_hash"], tuple(key["scopes"]), user, time.monotonic()
+    )
+
+
+def authenticate_api_key(
+    db: FirestoreClient, key: str, scope: str
+) -> AuthenticatedUser:
+    """Verify a device API key, reading Firestore only on a cache miss."""
+    parsed = split_api_key(key)
+    if parsed is None:
+        raise HTTPException(status_code=403, detail="Invalid API key")
+    key_id, secret_hash = parsed
+
+    entry = api_key_cache.get(key_id)
+    if entry is None:
+        entry = _load_api_key(db, key_id)
+        api_key_cache.put(key_id, entry)
+
+    if (
+        entry.user is None
+        or not hmac.compare_digest(entry.secret_hash, secret_hash)
+        or revocations.is_token_revoked(key_id)
+    ):
+        raise HTTPException(status_code=403, detail="Invalid API key")
+    if scope not in entry.scopes:
+        raise HTTPException(
+            status_code=403, detail="The API key is not allowed to use this resource"
+        )
+    return entry.user
+
+
+def api_key_or_user(
+    scope: str,
+) -> Callable[..., Awaitable[AuthenticatedUser]]:
+    """Dependency accepting a device API key with ``scope`` or a user token."""
+
+    async def get_current_principal(
+        db: DatabaseDep,
+        api_key: Annotated[str | None, Depends(api_key_header)],
+        token: Annotated[str | None, Depends(optional_oauth2)],
+    ) -> AuthenticatedUser:
+        if api_key:
+            with latency.timed("auth"):
+                user = authenticate_api_key(db, api_key, scope)
+            latency.identify_user(user.id)
+            return user
+        if not token:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return await get_current_user(token)
+
+    return get_current_principal
+
+
+SalesUser = Annotated[AuthenticatedUser, Depends(api_key_or_user("sales"))]
+ProductsUser = Annotated[AuthenticatedUser, Depends(api_key_or_user("products"))]
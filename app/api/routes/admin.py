@@ -0,0 +1,124 @@
+import asyncio
+import tracemalloc
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.api.deps import DatabaseDep, get_current_active_superuser
+from app.core import jobs, latency, memory
+from app.core.database import document_to_dict
+from app.core.loop_monitor import monitor
+from app.core.profiler import SamplingProfiler, get_request_profile, profile_lock
+from app.models import (
+    EventLoopReport,
+    JobPublic,
+    LatencyReport,
+    MemoryDiffPublic,
+    MemoryReport,
+    MemorySnapshotPublic,
+    Message,
+    RouteLatency,
+    SlowRequest,
+)
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(get_current_active_superuser)],
+)
+
+
+@router.get("/latency", response_model=LatencyReport)
+async def read_latency() -> Any:
+    """Per-route latency percentiles and the most recent slow requests."""
+    return LatencyReport(
+        routes=[
+            RouteLatency(route=route, **values)
+            for route, values in latency.percentiles().items()
+        ],
+        slow_requests=[SlowRequest(**record) for record in latency.slow_requests],
+    )
+
+
+@router.get("/event-loop", response_model=EventLoopReport)
+async def read_event_loop() -> Any:
+    """Event-loop lag and, in local mode, stacks of calls that blocked it."""
+    return EventLoopReport(**monitor.report())
+
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def profile_worker(seconds: float = Query(default=10, gt=0, le=120)) -> Any:
+    """
+    Sample this worker's stacks for a number of seconds.
+
+    Returns collapsed stacks, ready for flamegraph.pl or speedscope.
+    """
+    if not profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    try:
+        profiler = SamplingProfiler()
+        profiler.start()
+        await asyncio.sleep(seconds)
+        return PlainTextResponse(profiler.stop())
+    finally:
+        profile_lock.release()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def read_request_profile(profile_id: str) -> Any:
+    """Collapsed stacks of a request profiled with the X-Profile header."""
+    profile = get_request_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    route, collapsed = profile
+    return PlainTextResponse(collapsed, headers={"X-Profile-Route": route})
+
+
+@router.get("/memory", response_model=MemoryReport)
+async def read_memory() -> Any:
+    """Worker RSS, stored allocation snapshots and the size of every cache."""
+    return MemoryReport(
+        rss_bytes=memory.rss_bytes(),
+        tracing=tracemalloc.is_tracing(),
+        snapshots=memory.snapshot_ids(),
+        caches=memory.cache_sizes(),
+    )
+
+
+@router.post("/memory/snapshots", response_model=MemorySnapshotPublic)
+async def create_memory_snapshot(limit: int = Query(default=25, gt=0, le=200)) -> Any:
+    """
+    Take a tracemalloc snapshot and return its top allocation sites.
+
+    Tracing starts with the first snapshot, so take a baseline, let traffic
+    run, then diff a later snapshot against it.
+    """
+    return MemorySnapshotPublic(**memory.take_snapshot(limit))
+
+
+@router.get("/memory/snapshots/{old_id}/diff/{new_id}", response_model=MemoryDiffPublic)
+async def diff_memory_snapshots(
+    old_id: str, new_id: str, limit: int = Query(default=25, gt=0, le=200)
+) -> Any:
+    """Allocation sites that grew the most between two snapshots."""
+    top = memory.compare_snapshots(old_id, new_id, limit)
+    if top is None:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    return MemoryDiffPublic(old_id=old_id, new_id=new_id, top=top)
+
+
+@router.delete("/memory/snapshots", response_model=Message)
+async def delete_memory_snapshots() -> Any:
+    """Stop tracing allocations and drop the stored snapshots."""
+    memory.stop_tracing()
+    return Message(message="Memory tracing stopped")
+
+
+@router.get("/jobs/{job_id}", response_model=JobPublic)
+async def read_job(db: DatabaseDep, job_id: str) -> Any:
+    """Status and progress of a background job, such as a cascade delete."""
+    snapshot = db.collection(jobs.COLLECTION).document(job_id).get()
+    if not snapshot.exists:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobPublic(**document_to_dict(snapshot))
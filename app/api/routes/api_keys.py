@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.api.deps import CurrentUser, DatabaseDep, get_current_active_superuser
+from app.core.api_keys import create_api_key, revoke_api_key
+from app.core.database import document_to_dict
+from app.models import ApiKeyCreate, ApiKeyCreated, ApiKeyPublic, ApiKeysPublic, Message
+
+router = APIRouter(
+    prefix="/api-keys",
+    tags=["api-keys"],
+    dependencies=[Depends(get_current_active_superuser)],
+)
+
+
+@router.get("/", response_model=ApiKeysPublic)
+async def read_api_keys(db: DatabaseDep) -> Any:
+    """Retrieve device API keys."""
+    keys = [
+        ApiKeyPublic(**document_to_dict(snapshot))
+        for snapshot in db.collection("api_keys").stream()
+    ]
+    return ApiKeysPublic(data=keys, count=len(keys))
+
+
+@router.post("/", response_model=ApiKeyCreated)
+async def create_api_key_for_device(
+    *, db: DatabaseDep, current_user: CurrentUser, key_in: ApiKeyCreate
+) -> Any:
+    """
+    Create an API key for a device such as a POS terminal.
+
+    The key is only returned in this response; store it on the device.
+    """
+    user_id = key_in.user_id or current_user.id
+    if not db.collection("users").document(user_id).get().exists:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    key_id, key, secret_hash = create_api_key()
+    now = datetime.now(timezone.utc)
+    key_dict = {
+        "name": key_in.name,
+        "scopes": key_in.scopes,
+        "user_id": user_id,
+        "secret_hash": secret_hash,
+        "created_by": current_user.id,
+        "created_at": now,
+        "updated_at": now,
+    }
+    db.collection("api_keys").document(key_id).set(key_dict)
+    return ApiKeyCreated(**key_dict, _id=key_id, key=key)
+
+
+@router.delete("/{id}", response_model=Message)
+async def delete_api_key(db: DatabaseDep, id: str) -> Any:
+    """Delete an API key; every worker stops accepting it within a second or so."""
+    if not db.collection("api_keys").document(id).get().exists:
+        raise HTTPException(status_code=404, detail="API key not found")
+    revoke_api_key(db, id)
+    return Message(message="API key deleted successfully")
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Any
+
+from fastapi import APIRouter
+from google.cloud import firestore
+
+from app.api.deps import CurrentUser, DatabaseDep
+from app.core import memory
+from app.core.config import settings
+from app.core.database import document_to_dict
+from app.core.swr_cache import StaleWhileRevalidateCache
+from app.models import DashboardPublic
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+# Rows of each list on the dashboard
+DASHBOARD_ROWS = 10
+
+# Everything but the user is the same for every caller, so it is shared
+overview_cache: StaleWhileRevalidateCache[dict[str, Any]] = StaleWhileRevalidateCache(
+    settings.DASHBOARD_FRESH_SECONDS, settings.DASHBOARD_STALE_SECONDS
+)
+memory.register_cache("dashboard.overview", lambda: len(overview_cache))
+
+
+def read_latest(db: Any, collection: str) -> list[dict[str, Any]]:
+    query = (
+        db.collection(collection)
+        .order_by("created_at", direction=firestore.Query.DESCENDING)
+        .limit(DASHBOARD_ROWS)
+    )
+    return [document_to_dict(snapshot) for snapshot in query.stream()]
+
+
+def read_first(db: Any, collection: str, order_by: str) -> list[dict[str, Any]]:
+    query = db.collection(collection).order_by(order_by).limit(DASHBOARD_ROWS)
+    return [document_to_dict(snapshot) for snapshot in query.stream()]
+
+
+def count(db: Any, collection: str) -> int:
+    # An aggregation query: billed by index entries read, not documents
+    return int(db.collection(collection).count().get()[0][0].value)
+
+
+async def read_overview(db: Any) -> dict[str, Any]:
+    """Read the shared part of the dashboard, its queries running concurrently."""
+    # The Firestore client blocks, so each query runs in its own thread
+    (
+        recent_sales,
+        sales_count,
+        products,
+        products_count,
+        recent_adjustments,
+    ) = await asyncio.gather(
+        asyncio.to_thread(read_latest, db, "sales"),
+        asyncio.to_thread(count, db, "sales"),
+        asyncio.to_thread(read_first, db, "products", "name"),
+        asyncio.to_thread(count, db, "products"),
+        asyncio.to_thread(read_latest, db, "inventory_adjustments"),
+    )
+    return {
+        "recent_sales": recent_sales,
+        "sales_count": sales_count,
+        "products": products,
+        "products_count": products_count,
+        "recent_adjustments": recent_adjustments,
+        "generated_at": datetime.now(timezone.utc),
+    }
+
+
+@router.get("/", response_model=DashboardPublic)
+async def read_dashboard(db: DatabaseDep, current_user: CurrentUser) -> Any:
+    """
+    Everything the home screen shows, in one round trip.
+
+    Sales, products and adjustments may be up to
+    DASHBOARD_FRESH_SECONDS + DASHBOARD_STALE_SECONDS old; see generated_at.
+    """
+    overview = await overview_cache.get(lambda: read_overview(db))
+    return DashboardPublic(user=current_user.model_dump(by_alias=True), **overview)
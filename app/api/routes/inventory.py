@@ -1,14 +1,24 @@
+from datetime import datetime, timedelta, timezone
 from typing import Any
-from datetime import datetime, timezone
 
 from fastapi import APIRouter, HTTPException
+from google.api_core.exceptions import FailedPrecondition
+from google.cloud import firestore
+from google.cloud.firestore import FieldFilter
 
+from app import crud
 from app.api.deps import CurrentUser, DatabaseDep
+from app.core.database import apply_write, document_to_dict
+from app.core.document_cache import document_cache
 from app.models import (
     InventoryAdjustment,
     InventoryAdjustmentCreate,
     InventoryAdjustmentPublic,
+    InventoryAdjustmentsBulkCreate,
     InventoryAdjustmentsPublic,
+    InventoryStockPublic,
+    LowStockAlertPublic,
+    LowStockAlertsPublic,
 )
 
 router = APIRouter(prefix="/inventory", tags=["inventory"])
@@ -20,56 +30,230 @@ async def read_adjustments(
 ) -> Any:
     """Retrieve inventory adjustments."""
     count = await db.inventory_adjustments.count_documents({})
-    cursor = db.inventory_adjustments.find().sort("created_at", -1).skip(skip).limit(limit)
-    adjustments = [
-        InventoryAdjustment(**adj_dict) async for adj_dict in cursor
-    ]
-    
+    cursor = (
+        db.inventory_adjustments.find().sort("created_at", -1).skip(skip).limit(limit)
+    )
+    adjustments = [InventoryAdjustment(**adj_dict) async for adj_dict in cursor]
+
     return InventoryAdjustmentsPublic(data=adjustments, count=count)
 
 
+@router.get("/low-stock", response_model=LowStockAlertsPublic)
+async def read_low_stock(db: DatabaseDep, current_user: CurrentUser) -> Any:
+    """List items and products at or below their reorder point."""
+    alerts = [
+        LowStockAlertPublic(**document_to_dict(snapshot))
+        for snapshot in db.collection("low_stock").stream()
+    ]
+    return LowStockAlertsPublic(data=alerts, count=len(alerts))
+
+
 @router.post("/adjustments", response_model=InventoryAdjustmentPublic)
 async def create_adjustment(
-    *, db: DatabaseDep, current_user: CurrentUser, adjustment_in: InventoryAdjustmentCreate
+    *,
+    db: DatabaseDep,
+    current_user: CurrentUser,
+    adjustment_in: InventoryAdjustmentCreate,
 ) -> Any:
     """Create inventory adjustment."""
-    # Get current item
-    item_dict = await db.items.find_one({"_id": adjustment_in.item_id})
-    if not item_dict:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
-    previous_quantity = item_dict.get("stock_quantity", 0)
-    
-    # Calculate new quantity based on adjustment type
-    if adjustment_in.adjustment_type == "add":
-        new_quantity = previous_quantity + adjustment_in.quantity
-    elif adjustment_in.adjustment_type == "remove":
-        new_quantity = previous_quantity - adjustment_in.quantity
+    item_ref = db.collection("items").document(adjustment_in.item_id)
+    adjustment_ref = db.collection("inventory_adjustments").document()
+
+    @firestore.transactional
+    def adjust(transaction: firestore.Transaction) -> dict[str, Any]:
+        snapshot = item_ref.get(transaction=transaction)
+        if not snapshot.exists:
+            raise HTTPException(status_code=404, detail="Item not found")
+        item_dict = snapshot.to_dict()
+        previous_quantity = item_dict.get("stock_quantity", 0)
+
+        # Calculate new quantity based on adjustment type
+        new_quantity = crud.apply_adjustment(
+            previous_quantity, adjustment_in.adjustment_type, adjustment_in.quantity
+        )
+        if new_quantity < 0:
+            raise HTTPException(
+                status_code=400, detail="Adjustment would result in negative stock"
+            )
+
+        now = datetime.now(timezone.utc)
+        adjustment_dict = {
+            **adjustment_in.model_dump(),
+            "user_id": current_user.id,
+            "previous_quantity": previous_quantity,
+            "new_quantity": new_quantity,
+            "created_at": now,
+            "updated_at": now,
+        }
+        transaction.update(item_ref, {"stock_quantity": new_quantity})
+        transaction.set(adjustment_ref, adjustment_dict)
+        reorder_point = item_dict.get("reorder_point")
+        low_stock = crud.low_stock_write(
+            db,
+            kind="item",
+            ref_id=adjustment_in.item_id,
+            name=item_dict.get("title"),
+            was_low=crud.is_low_stock(previous_quantity, reorder_point),
+            quantity=new_quantity,
+            reorder_point=reorder_point,
+        )
+        if low_stock:
+            apply_write(transaction, low_stock)
+        return adjustment_dict
+
+    adjustment_dict = adjust(db.transaction())
+    document_cache.evict("items", adjustment_in.item_id)
+    return InventoryAdjustmentPublic(**adjustment_dict, _id=adjustment_ref.id)
+
+
+@router.post("/adjustments/bulk", response_model=InventoryAdjustmentsPublic)
+async def create_adjustments_bulk(
+    *,
+    db: DatabaseDep,
+    current_user: CurrentUser,
+    bulk_in: InventoryAdjustmentsBulkCreate,
+) -> Any:
+    """
+    Create many inventory adjustments, e.g. from a stock count.
+
+    All of them are applied or none is: if an item's stock changes meanwhile,
+    nothing is written and the request fails with 409, so it can be retried.
+    """
+    items = db.collection("items")
+    item_refs = {
+        adjustment_in.item_id: items.document(adjustment_in.item_id)
+        for adjustment_in in bulk_in.adjustments
+    }
+    snapshots = {
+        snapshot.id: snapshot
+        for snapshot in db.get_all(list(item_refs.values()))
+        if snapshot.exists
+    }
+    item_dicts = {
+        item_id: snapshot.to_dict() for item_id, snapshot in snapshots.items()
+    }
+    stock = {
+        item_id: item_dict.get("stock_quantity", 0)
+        for item_id, item_dict in item_dicts.items()
+    }
+    missing = [item_id for item_id in item_refs if item_id not in stock]
+    if missing:
+        raise HTTPException(
+            status_code=404, detail=f"Items not found: {', '.join(missing)}"
+        )
+
+    # Validate the whole request before writing anything; adjustments to the
+    # same item are applied in order against the running quantity.
+    now = datetime.now(timezone.utc)
+    writes = []
+    adjustments = []
+    for position, adjustment_in in enumerate(bulk_in.adjustments):
+        previous_quantity = stock[adjustment_in.item_id]
+        new_quantity = crud.apply_adjustment(
+            previous_quantity, adjustment_in.adjustment_type, adjustment_in.quantity
+        )
         if new_quantity < 0:
             raise HTTPException(
                 status_code=400,
-                detail="Adjustment would result in negative stock"
+                detail=(
+                    f"Adjustment for item {adjustment_in.item_id} "
+                    "would result in negative stock"
+                ),
             )
-    else:  # set
-        new_quantity = adjustment_in.quantity
-    
-    # Update item stock
-    await db.items.update_one(
-        {"_id": adjustment_in.item_id},
-        {"$set": {"stock_quantity": new_quantity}}
+        stock[adjustment_in.item_id] = new_quantity
+
+        # Distinct timestamps keep the ledger order unambiguous for
+        # point-in-time stock lookups
+        created_at = now + timedelta(microseconds=position)
+        adjustment_dict = {
+            **adjustment_in.model_dump(),
+            "user_id": current_user.id,
+            "previous_quantity": previous_quantity,
+            "new_quantity": new_quantity,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+        adjustment_ref = db.collection("inventory_adjustments").document()
+        writes.append(("set", adjustment_ref, adjustment_dict))
+        adjustments.append(
+            InventoryAdjustmentPublic(**adjustment_dict, _id=adjustment_ref.id)
+        )
+
+    batch = db.batch()
+    for item_id, item_dict in item_dicts.items():
+        # Only write the stock read above: a concurrent adjustment fails the
+        # whole commit rather than being overwritten
+        batch.update(
+            item_refs[item_id],
+            {"stock_quantity": stock[item_id]},
+            option=db.write_option(last_update_time=snapshots[item_id].update_time),
+        )
+        reorder_point = item_dict.get("reorder_point")
+        low_stock = crud.low_stock_write(
+            db,
+            kind="item",
+            ref_id=item_id,
+            name=item_dict.get("title"),
+            was_low=crud.is_low_stock(
+                item_dict.get("stock_quantity", 0), reorder_point
+            ),
+            quantity=stock[item_id],
+            reorder_point=reorder_point,
+        )
+        if low_stock:
+            writes.append(low_stock)
+
+    for write in writes:
+        apply_write(batch, write)
+    try:
+        batch.commit()
+    except FailedPrecondition:
+        raise HTTPException(
+            status_code=409,
+            detail="Stock changed while applying the adjustments, please retry",
+        )
+    for item_id in item_refs:
+        document_cache.evict("items", item_id)
+    return InventoryAdjustmentsPublic(data=adjustments, count=len(adjustments))
+
+
+@router.get("/items/{item_id}/stock", response_model=InventoryStockPublic)
+async def read_item_stock_at(
+    db: DatabaseDep,
+    current_user: CurrentUser,
+    item_id: str,
+    at: datetime | None = None,
+) -> Any:
+    """Get the stock of an item at a point in time (now by default).
+
+    Every ledger entry records the resulting ``new_quantity``, so the stock at
+    ``at`` is that of the latest adjustment up to then: one indexed read,
+    however long the ledger grows.
+
+    This trusts the stored ``new_quantity`` rather than replaying the ledger,
+    so it returns what was recorded at the time, even where that was wrong;
+    ``python -m app.reconcile_stock`` replays the ledgers and reports such
+    breaks.
+    """
+    if at is None:
+        at = datetime.now(timezone.utc)
+
+    query = (
+        db.collection("inventory_adjustments")
+        .where(filter=FieldFilter("item_id", "==", item_id))
+        .where(filter=FieldFilter("created_at", "<=", at))
+        .order_by("created_at", direction=firestore.Query.DESCENDING)
+        .limit(1)
     )
-    
-    # Create adjustment record
-    adjustment_dict = {
-        **adjustment_in.model_dump(),
-        "user_id": current_user.id,
-        "previous_quantity": previous_quantity,
-        "new_quantity": new_quantity,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
-    }
-    
-    result = await db.inventory_adjustments.insert_one(adjustment_dict)
-    adjustment_dict["_id"] = result.inserted_id
-    
-    return InventoryAdjustment(**adjustment_dict)
+    for snapshot in query.stream():
+        return InventoryStockPublic(
+            item_id=item_id,
+            at=at,
+            quantity=snapshot.to_dict()["new_quantity"],
+            adjustment_id=snapshot.id,
+        )
+
+    if not db.collection("items").document(item_id).get().exists:
+        raise HTTPException(status_code=404, detail="Item not found")
+    # No adjustment yet: items start with no stock
+    return InventoryStockPublic(item_id=item_id, at=at, quantity=0)
@@ -2,8 +2,19 @@ from typing import Any
 
 from fastapi import APIRouter, HTTPException
 
+from app import crud
 from app.api.deps import CurrentUser, DatabaseDep
-from app.models import Item, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate, Message
+from app.core.database import Write, commit_in_batches, document_to_dict
+from app.core.document_cache import document_cache
+from app.models import (
+    BatchRead,
+    Item,
+    ItemCreate,
+    ItemPublic,
+    ItemsPublic,
+    ItemUpdate,
+    Message,
+)
 
 router = APIRouter(prefix="/items", tags=["items"])
 
@@ -26,6 +37,24 @@ async def read_items(
     return ItemsPublic(data=items, count=count)
 
 
+@router.post("/batch", response_model=ItemsPublic)
+async def read_items_batch(
+    db: DatabaseDep, current_user: CurrentUser, body: BatchRead
+) -> Any:
+    """
+    Get items by ID, in one round trip.
+
+    Items are returned in the order asked for; unknown IDs, and for regular
+    users items of other owners, are left out.
+    """
+    items = [
+        item
+        for item in crud.get_documents(db, "items", body.ids)
+        if current_user.is_superuser or item.get("owner_id") == current_user.id
+    ]
+    return ItemsPublic(data=items, count=len(items))
+
+
 @router.get("/{id}", response_model=ItemPublic)
 async def read_item(db: DatabaseDep, current_user: CurrentUser, id: str) -> Any:
     """Get item by ID."""
@@ -47,11 +76,23 @@ async def create_item(
     """Create new item."""
     item_dict = item_in.model_dump()
     item_dict["owner_id"] = current_user.id
-
-    result = await db.items.insert_one(item_dict)
-    item_dict["_id"] = result.inserted_id
-
-    return Item(**item_dict)
+    reference = db.collection("items").document()
+    writes: list[Write] = [("set", reference, item_dict)]
+    # Items start with no stock, so one with a reorder point starts out low
+    low_stock = crud.low_stock_write(
+        db,
+        kind="item",
+        ref_id=reference.id,
+        name=item_dict["title"],
+        was_low=False,
+        quantity=item_dict.get("stock_quantity", 0),
+        reorder_point=item_dict["reorder_point"],
+    )
+    if low_stock:
+        writes.append(low_stock)
+    commit_in_batches(db, writes)
+
+    return ItemPublic(**item_dict, _id=reference.id)
 
 
 @router.put("/{id}", response_model=ItemPublic)
@@ -59,32 +100,56 @@ async def update_item(
     *, db: DatabaseDep, current_user: CurrentUser, id: str, item_in: ItemUpdate
 ) -> Any:
     """Update an item."""
-    item_dict = await db.items.find_one({"_id": id})
-    if not item_dict:
+    reference = db.collection("items").document(id)
+    snapshot = reference.get()
+    if not snapshot.exists:
         raise HTTPException(status_code=404, detail="Item not found")
+    item_dict = document_to_dict(snapshot)
 
     item = Item(**item_dict)
     if not current_user.is_superuser and str(item.owner_id) != str(current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
 
     update_data = item_in.model_dump(exclude_unset=True)
-    if update_data:
-        await db.items.update_one({"_id": id}, {"$set": update_data})
-
-    updated_item_dict = await db.items.find_one({"_id": id})
-    return Item(**updated_item_dict)
+    writes = []
+    if "reorder_point" in update_data:
+        stock_quantity = item_dict.get("stock_quantity", 0)
+        low_stock = crud.low_stock_write(
+            db,
+            kind="item",
+            ref_id=id,
+            name=update_data.get("title", item.title),
+            was_low=crud.is_low_stock(stock_quantity, item_dict.get("reorder_point")),
+            quantity=stock_quantity,
+            reorder_point=update_data["reorder_point"],
+        )
+        if low_stock:
+            writes.append(low_stock)
+
+    return ItemPublic(
+        **crud.update_document(db, reference, item_dict, update_data, writes)
+    )
 
 
 @router.delete("/{id}")
 async def delete_item(db: DatabaseDep, current_user: CurrentUser, id: str) -> Message:
     """Delete an item."""
-    item_dict = await db.items.find_one({"_id": id})
-    if not item_dict:
+    reference = db.collection("items").document(id)
+    snapshot = reference.get()
+    if not snapshot.exists:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    item = Item(**item_dict)
+    item = Item(**document_to_dict(snapshot))
     if not current_user.is_superuser and str(item.owner_id) != str(current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
 
-    await db.items.delete_one({"_id": id})
+    # The item and its low-stock entry go together
+    commit_in_batches(
+        db,
+        [
+            ("delete", reference, None),
+            ("delete", crud.low_stock_ref(db, "item", id), None),
+        ],
+    )
+    document_cache.evict("items", id)
     return Message(message="Item deleted successfully")
@@ -1,23 +1,39 @@
+import math
 from datetime import timedelta
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
+import jwt
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app import crud
-from app.api.deps import CurrentUser, DatabaseDep
+from app.api.deps import CurrentUser, DatabaseDep, TokenDep
 from app.core import security
 from app.core.config import settings
-from app.models import Message, NewPassword, Token
+from app.core.rate_limit import client_ip, get_login_rate_limiter
+from app.core.revocation import revocations
+from app.models import Message, NewPassword, RefreshTokenRequest, Token
 
 router = APIRouter(tags=["login"])
 
 
 @router.post("/login/access-token")
 async def login_access_token(
-    db: DatabaseDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
+    request: Request,
+    db: DatabaseDep,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ) -> Token:
     """OAuth2 compatible token login, get an access token for future requests"""
+    # Before the password check, so throttled attempts cost no bcrypt hash
+    retry_after = get_login_rate_limiter(db).check(
+        client_ip(request), form_data.username
+    )
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
     user = await crud.authenticate(
         db=db, email=form_data.username, password=form_data.password
     )
@@ -29,11 +45,48 @@ async def login_access_token(
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return Token(
         access_token=security.create_access_token(
-            str(user.id), expires_delta=access_token_expires
-        )
+            str(user.id),
+            expires_delta=access_token_expires,
+            claims=security.user_claims(user),
+        ),
+        refresh_token=crud.create_refresh_token(db, str(user.id)),
     )
 
 
+@router.post("/login/refresh")
+async def refresh_access_token(db: DatabaseDep, body: RefreshTokenRequest) -> Token:
+    """Exchange a refresh token for a new access token and refresh token"""
+    rotated = crud.rotate_refresh_token(db, body.refresh_token)
+    if not rotated:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    user, refresh_token = rotated
+
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return Token(
+        access_token=security.create_access_token(
+            user.id,
+            expires_delta=access_token_expires,
+            claims=security.user_claims(user),
+        ),
+        refresh_token=refresh_token,
+    )
+
+
+@router.post("/logout", response_model=Message)
+async def logout(
+    db: DatabaseDep,
+    token: TokenDep,
+    current_user: CurrentUser,
+    body: RefreshTokenRequest | None = None,
+) -> Any:
+    """Revoke the access token, and the refresh token if given"""
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+    revocations.revoke_token(db, payload["jti"], payload["exp"])
+    if body:
+        crud.revoke_refresh_token_family(db, body.refresh_token)
+    return Message(message="Logged out")
+
+
 @router.post("/login/test-token", response_model=Message)
 async def test_token(current_user: CurrentUser) -> Any:
     """Test access token"""
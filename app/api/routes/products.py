@@ -1,11 +1,15 @@
 from typing import Any
 
 from fastapi import APIRouter, HTTPException
+from google.cloud.firestore import FieldFilter
 
-from app.api.deps import CurrentUser, DatabaseDep
+from app import crud
+from app.api.deps import DatabaseDep, ProductsUser
+from app.core.database import Write, commit_in_batches, document_to_dict
+from app.core.document_cache import document_cache
 from app.models import (
+    BatchRead,
     Message,
-    Product,
     ProductCreate,
     ProductPublic,
     ProductsPublic,
@@ -17,71 +21,121 @@ router = APIRouter(prefix="/products", tags=["products"])
 
 @router.get("/", response_model=ProductsPublic)
 async def read_products(
-    db: DatabaseDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    db: DatabaseDep, current_user: ProductsUser, skip: int = 0, limit: int = 100
 ) -> Any:
-    """Retrieve products."""
-    count = await db.products.count_documents({})
-    cursor = db.products.find().skip(skip).limit(limit)
-    products = [Product(**product_dict) async for product_dict in cursor]
+    """Retrieve products, by name."""
+    collection = db.collection("products")
+    count = int(collection.count().get()[0][0].value)
+    page = collection.order_by("name").offset(skip).limit(limit)
+    products = [document_to_dict(snapshot) for snapshot in page.stream()]
 
     return ProductsPublic(data=products, count=count)
 
 
+@router.post("/batch", response_model=ProductsPublic)
+async def read_products_batch(
+    db: DatabaseDep, current_user: ProductsUser, body: BatchRead
+) -> Any:
+    """
+    Get products by ID, in one round trip.
+
+    Products are returned in the order asked for; unknown IDs are left out.
+    """
+    products = crud.get_documents(db, "products", body.ids)
+    return ProductsPublic(data=products, count=len(products))
+
+
 @router.get("/{id}", response_model=ProductPublic)
-async def read_product(db: DatabaseDep, current_user: CurrentUser, id: str) -> Any:
+async def read_product(db: DatabaseDep, current_user: ProductsUser, id: str) -> Any:
     """Get product by ID."""
-    product_dict = await db.products.find_one({"_id": id})
-    if not product_dict:
+    snapshot = db.collection("products").document(id).get()
+    if not snapshot.exists:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    return Product(**product_dict)
+    return document_to_dict(snapshot)
 
 
 @router.post("/", response_model=ProductPublic)
 async def create_product(
-    *, db: DatabaseDep, current_user: CurrentUser, product_in: ProductCreate
+    *, db: DatabaseDep, current_user: ProductsUser, product_in: ProductCreate
 ) -> Any:
     """Create new product."""
     product_dict = product_in.model_dump()
-
-    result = await db.products.insert_one(product_dict)
-    product_dict["_id"] = result.inserted_id
-
-    return ProductPublic(**product_dict)
+    reference = db.collection("products").document()
+    writes: list[Write] = [("set", reference, product_dict)]
+    low_stock = crud.low_stock_write(
+        db,
+        kind="product",
+        ref_id=reference.id,
+        name=product_dict["name"],
+        was_low=False,
+        quantity=product_dict["stock_quantity"],
+        reorder_point=product_dict["reorder_point"],
+    )
+    if low_stock:
+        writes.append(low_stock)
+    commit_in_batches(db, writes)
+
+    return ProductPublic(**product_dict, _id=reference.id)
 
 
 @router.put("/{id}", response_model=ProductPublic)
 async def update_product(
-    *, db: DatabaseDep, current_user: CurrentUser, id: str, product_in: ProductUpdate
+    *, db: DatabaseDep, current_user: ProductsUser, id: str, product_in: ProductUpdate
 ) -> Any:
     """Update a product."""
-    product_dict = await db.products.find_one({"_id": id})
-    if not product_dict:
+    reference = db.collection("products").document(id)
+    snapshot = reference.get()
+    if not snapshot.exists:
         raise HTTPException(status_code=404, detail="Product not found")
+    product_dict = document_to_dict(snapshot)
 
     update_data = product_in.model_dump(exclude_unset=True)
-    if update_data:
-        await db.products.update_one({"_id": id}, {"$set": update_data})
+    writes = []
+    if "stock_quantity" in update_data or "reorder_point" in update_data:
+        updated = {**product_dict, **update_data}
+        low_stock = crud.low_stock_write(
+            db,
+            kind="product",
+            ref_id=id,
+            name=updated.get("name"),
+            was_low=crud.is_low_stock(
+                product_dict.get("stock_quantity", 0), product_dict.get("reorder_point")
+            ),
+            quantity=updated.get("stock_quantity", 0),
+            reorder_point=updated.get("reorder_point"),
+        )
+        if low_stock:
+            writes.append(low_stock)
 
-    updated_product_dict = await db.products.find_one({"_id": id})
-    return Product(**updated_product_dict)
+    return ProductPublic(
+        **crud.update_document(db, reference, product_dict, update_data, writes)
+    )
 
 
 @router.delete("/{id}")
 async def delete_product(
-    db: DatabaseDep, current_user: CurrentUser, id: str
+    db: DatabaseDep, current_user: ProductsUser, id: str
 ) -> Message:
     """Delete a product."""
-    product_dict = await db.products.find_one({"_id": id})
-    if not product_dict:
+    reference = db.collection("products").document(id)
+    if not reference.get().exists:
         raise HTTPException(status_code=404, detail="Product not found")
 
     # Check if product is used in recipes
-    recipe_count = await db.recipes.count_documents({"product_id": id})
-    if recipe_count > 0:
+    recipes = db.collection("recipes").where(filter=FieldFilter("product_id", "==", id))
+    if recipes.limit(1).count().get()[0][0].value > 0:
         raise HTTPException(
             status_code=400, detail="Cannot delete product that is used in recipes"
         )
 
-    await db.products.delete_one({"_id": id})
-    return Message(message="Product deleted successfully")
\ No newline at end of file
+    # The product and its low-stock entry go together
+    commit_in_batches(
+        db,
+        [
+            ("delete", reference, None),
+            ("delete", crud.low_stock_ref(db, "product", id), None),
+        ],
+    )
+    document_cache.evict("products", id)
+    return Message(message="Product deleted successfully")
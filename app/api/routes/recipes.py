@@ -1,15 +1,24 @@
+from collections import defaultdict
+from datetime import datetime, timezone
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from google.cloud import firestore
 
+from app import crud
 from app.api.deps import CurrentUser, DatabaseDep
+from app.core.database import apply_write, document_to_dict
+from app.core.document_cache import document_cache
 from app.models import (
+    BatchRead,
+    InventoryAdjustmentPublic,
     Message,
+    ProductionPublic,
     Recipe,
     RecipeCreate,
     RecipePublic,
     RecipesPublic,
-    RecipeUpdate
+    RecipeUpdate,
 )
 
 router = APIRouter(prefix="/recipes", tags=["recipes"])
@@ -27,6 +36,19 @@ async def read_recipes(
     return RecipesPublic(data=recipes, count=count)
 
 
+@router.post("/batch", response_model=RecipesPublic)
+async def read_recipes_batch(
+    db: DatabaseDep, current_user: CurrentUser, body: BatchRead
+) -> Any:
+    """
+    Get recipes by ID, in one round trip.
+
+    Recipes are returned in the order asked for; unknown IDs are left out.
+    """
+    recipes = crud.get_documents(db, "recipes", body.ids)
+    return RecipesPublic(data=recipes, count=len(recipes))
+
+
 @router.get("/{id}", response_model=RecipePublic)
 async def read_recipe(db: DatabaseDep, current_user: CurrentUser, id: str) -> Any:
     """Get recipe by ID."""
@@ -67,40 +89,185 @@ async def update_recipe(
     *, db: DatabaseDep, current_user: CurrentUser, id: str, recipe_in: RecipeUpdate
 ) -> Any:
     """Update a recipe."""
-    recipe_dict = await db.recipes.find_one({"_id": id})
-    if not recipe_dict:
+    reference = db.collection("recipes").document(id)
+    # The recipe and whatever the update refers to, in one round trip
+    references = [reference]
+    if recipe_in.product_id:
+        references.append(db.collection("products").document(recipe_in.product_id))
+    for ingredient in recipe_in.ingredients or []:
+        references.append(db.collection("items").document(ingredient.item_id))
+    snapshots = {
+        snapshot.reference.path: snapshot for snapshot in db.get_all(references)
+    }
+
+    if not snapshots[reference.path].exists:
         raise HTTPException(status_code=404, detail="Recipe not found")
+    for other in references[1:]:
+        if snapshots[other.path].exists:
+            continue
+        if other.parent.id == "products":
+            raise HTTPException(status_code=404, detail="Product not found")
+        raise HTTPException(status_code=404, detail=f"Item {other.id} not found")
 
     update_data = recipe_in.model_dump(exclude_unset=True)
+    recipe_dict = document_to_dict(snapshots[reference.path])
+    return RecipePublic(**crud.update_document(db, reference, recipe_dict, update_data))
 
-    # Verify product exists if being updated
-    if recipe_in.product_id:
-        product_dict = await db.products.find_one({"_id": recipe_in.product_id})
-        if not product_dict:
+
+@router.delete("/{id}")
+async def delete_recipe(db: DatabaseDep, current_user: CurrentUser, id: str) -> Message:
+    """Delete a recipe."""
+    reference = db.collection("recipes").document(id)
+    if not reference.get().exists:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+
+    reference.delete()
+    document_cache.evict("recipes", id)
+    return Message(message="Recipe deleted successfully")
+
+
+@router.post("/{id}/produce", response_model=ProductionPublic)
+async def produce_recipe(
+    *,
+    db: DatabaseDep,
+    current_user: CurrentUser,
+    id: str,
+    batches: int = Query(default=1, gt=0),
+) -> Any:
+    """Produce batches of a recipe, consuming its ingredients in one transaction."""
+    recipe_ref = db.collection("recipes").document(id)
+
+    @firestore.transactional
+    def produce(transaction: firestore.Transaction) -> ProductionPublic:
+        recipe_snapshot = recipe_ref.get(transaction=transaction)
+        if not recipe_snapshot.exists:
+            raise HTTPException(status_code=404, detail="Recipe not found")
+
+        recipe = Recipe(**recipe_snapshot.to_dict())
+        if not recipe.is_active:
+            raise HTTPException(status_code=400, detail="Recipe is not active")
+        # Product stock is counted in whole units, so a fractional yield is
+        # refused rather than rounded away
+        produced_quantity = recipe.yield_quantity * batches
+        if not produced_quantity.is_integer():
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    f"{batches} batch(es) yield {produced_quantity} units; "
+                    "products are stocked in whole units"
+                ),
+            )
+
+        # The same item may appear in more than one ingredient line
+        required: dict[str, float] = defaultdict(float)
+        for ingredient in recipe.ingredients:
+            required[ingredient.item_id] += ingredient.quantity * batches
+
+        product_ref = db.collection("products").document(recipe.product_id)
+        item_refs = [db.collection("items").document(item_id) for item_id in required]
+        snapshots = {
+            snapshot.reference.path: snapshot
+            for snapshot in db.get_all(
+                [product_ref, *item_refs], transaction=transaction
+            )
+        }
+
+        product_snapshot = snapshots[product_ref.path]
+        if not product_snapshot.exists:
             raise HTTPException(status_code=404, detail="Product not found")
 
-    # Verify all ingredients exist if being updated
-    if recipe_in.ingredients:
-        for ingredient in recipe_in.ingredients:
-            item_dict = await db.items.find_one({"_id": ingredient.item_id})
-            if not item_dict:
+        now = datetime.now(timezone.utc)
+        adjustments = []
+        low_stock_writes = []
+        for item_ref in item_refs:
+            item_snapshot = snapshots[item_ref.path]
+            if not item_snapshot.exists:
                 raise HTTPException(
-                    status_code=404, detail=f"Item {ingredient.item_id} not found"
+                    status_code=404, detail=f"Item {item_ref.id} not found"
                 )
 
-    if update_data:
-        await db.recipes.update_one({"_id": id}, {"$set": update_data})
+            item_dict = item_snapshot.to_dict()
+            previous_quantity = item_dict.get("stock_quantity", 0)
+            new_quantity = previous_quantity - required[item_ref.id]
+            if new_quantity < 0:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Not enough stock for item {item_ref.id}",
+                )
+            low_stock_writes.append(
+                crud.low_stock_write(
+                    db,
+                    kind="item",
+                    ref_id=item_ref.id,
+                    name=item_dict.get("title"),
+                    was_low=crud.is_low_stock(
+                        previous_quantity, item_dict.get("reorder_point")
+                    ),
+                    quantity=new_quantity,
+                    reorder_point=item_dict.get("reorder_point"),
+                )
+            )
 
-    updated_recipe_dict = await db.recipes.find_one({"_id": id})
-    return Recipe(**updated_recipe_dict)
+            adjustments.append(
+                {
+                    "item_id": item_ref.id,
+                    "adjustment_type": "remove",
+                    "quantity": required[item_ref.id],
+                    "reason": f"Production of {batches} batch(es) of {recipe.name}",
+                    "reference": id,
+                    "user_id": current_user.id,
+                    "previous_quantity": previous_quantity,
+                    "new_quantity": new_quantity,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
 
+        # Firestore transactions require every read to happen before any write
+        product_dict = product_snapshot.to_dict()
+        product_stock = product_dict.get("stock_quantity", 0)
+        transaction.update(
+            product_ref, {"stock_quantity": product_stock + int(produced_quantity)}
+        )
+        low_stock_writes.append(
+            crud.low_stock_write(
+                db,
+                kind="product",
+                ref_id=product_ref.id,
+                name=product_dict.get("name"),
+                was_low=crud.is_low_stock(
+                    product_stock, product_dict.get("reorder_point")
+                ),
+                quantity=product_stock + int(produced_quantity),
+                reorder_point=product_dict.get("reorder_point"),
+            )
+        )
+        for low_stock in low_stock_writes:
+            if low_stock:
+                apply_write(transaction, low_stock)
 
-@router.delete("/{id}")
-async def delete_recipe(db: DatabaseDep, current_user: CurrentUser, id: str) -> Message:
-    """Delete a recipe."""
-    recipe_dict = await db.recipes.find_one({"_id": id})
-    if not recipe_dict:
-        raise HTTPException(status_code=404, detail="Recipe not found")
+        created_adjustments = []
+        for adjustment in adjustments:
+            transaction.update(
+                db.collection("items").document(adjustment["item_id"]),
+                {"stock_quantity": adjustment["new_quantity"]},
+            )
+            adjustment_ref = db.collection("inventory_adjustments").document()
+            transaction.set(adjustment_ref, adjustment)
+            created_adjustments.append(
+                InventoryAdjustmentPublic(**adjustment, _id=adjustment_ref.id)
+            )
+
+        return ProductionPublic(
+            recipe_id=id,
+            product_id=recipe.product_id,
+            batches=batches,
+            produced_quantity=produced_quantity,
+            adjustments=created_adjustments,
+        )
 
-    await db.recipes.delete_one({"_id": id})
-    return Message(message="Recipe deleted successfully")
\ No newline at end of file
+    production = produce(db.transaction())
+    document_cache.evict("products", production.product_id)
+    for adjustment in production.adjustments:
+        document_cache.evict("items", adjustment.item_id)
+    return production
@@ -1,28 +1,69 @@
+from collections import defaultdict
 from typing import Any
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, HTTPException
+from google.cloud import firestore
+from google.cloud.firestore import FieldFilter
 
-from app.api.deps import CurrentUser, DatabaseDep
-from app.models import Message, Sale, SaleCreate, SalePublic, SalesPublic
+from app import crud
+from app.api.deps import DatabaseDep, SalesUser
+from app.core.database import Write, apply_write, document_to_dict
+from app.core.document_cache import document_cache
+from app.core.indexes import SALES_FILTERS
+from app.models import (
+    Message,
+    PaymentMethod,
+    Sale,
+    SaleCreate,
+    SalePublic,
+    SalesPublic,
+    SaleStatus,
+)
 
 router = APIRouter(prefix="/sales", tags=["sales"])
 
 
 @router.get("/", response_model=SalesPublic)
 async def read_sales(
-    db: DatabaseDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    db: DatabaseDep,
+    current_user: SalesUser,
+    skip: int = 0,
+    limit: int = 100,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    user_id: str | None = None,
+    status: SaleStatus | None = None,
+    payment_method: PaymentMethod | None = None,
 ) -> Any:
-    """Retrieve sales."""
-    count = await db.sales.count_documents({})
-    cursor = db.sales.find().sort("created_at", -1).skip(skip).limit(limit)
-    sales = [Sale(**sale_dict) async for sale_dict in cursor]
-    
+    """Retrieve sales, newest first, optionally filtered.
+
+    ``start`` is inclusive and ``end`` exclusive. Every combination of
+    filters is served by the indexes in app/core/indexes.py.
+    """
+    query = db.collection("sales")
+    equal = {"user_id": user_id, "status": status, "payment_method": payment_method}
+    for field in SALES_FILTERS:
+        if equal[field] is not None:
+            query = query.where(filter=FieldFilter(field, "==", equal[field]))
+    if start is not None:
+        query = query.where(filter=FieldFilter("created_at", ">=", start))
+    if end is not None:
+        query = query.where(filter=FieldFilter("created_at", "<", end))
+
+    count = int(query.count().get()[0][0].value)
+    page = (
+        query.order_by("created_at", direction=firestore.Query.DESCENDING)
+        .offset(skip)
+        .limit(limit)
+    )
+    sales = [SalePublic(**document_to_dict(snapshot)) for snapshot in page.stream()]
+
     return SalesPublic(data=sales, count=count)
 
 
 @router.get("/{id}", response_model=SalePublic)
-async def read_sale(db: DatabaseDep, current_user: CurrentUser, id: str) -> Any:
+async def read_sale(db: DatabaseDep, current_user: SalesUser, id: str) -> Any:
     """Get sale by ID."""
     sale_dict = await db.sales.find_one({"_id": id})
     if not sale_dict:
@@ -33,38 +74,35 @@ async def read_sale(db: DatabaseDep, current_user: CurrentUser, id: str) -> Any:
 
 @router.post("/", response_model=SalePublic)
 async def create_sale(
-    *, db: DatabaseDep, current_user: CurrentUser, sale_in: SaleCreate
+    *, db: DatabaseDep, current_user: SalesUser, sale_in: SaleCreate
 ) -> Any:
-    """Create new sale."""
-    # Calculate totals
+    """Create new sale, taking its products out of stock in one transaction."""
+    # The same product may appear in more than one line
+    sold: dict[str, float] = defaultdict(float)
     subtotal = 0.0
     items_with_subtotal = []
-    
     for item in sale_in.items:
-        # Verify product exists
-        product_dict = await db.products.find_one({"_id": item.product_id})
-        if not product_dict:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Product {item.product_id} not found"
-            )
-        
+        sold[item.product_id] += item.quantity
         item_subtotal = (item.unit_price * item.quantity) - item.discount
         subtotal += item_subtotal
-        
-        items_with_subtotal.append({
-            **item.model_dump(),
-            "subtotal": item_subtotal
-        })
-    
+        items_with_subtotal.append({**item.model_dump(), "subtotal": item_subtotal})
+    for product_id, quantity in sold.items():
+        # Product stock is counted in whole units
+        if not float(quantity).is_integer():
+            raise HTTPException(
+                status_code=400,
+                detail=f"Product {product_id} is sold in whole units",
+            )
+
     # Generate sale number
-    count = await db.sales.count_documents({})
+    count = int(db.collection("sales").count().get()[0][0].value)
     sale_number = f"SALE-{count + 1:06d}"
-    
+
     # Calculate tax and total (example: 10% tax)
     tax = subtotal * 0.1
     total = subtotal + tax
-    
+
+    now = datetime.now(timezone.utc)
     sale_dict = {
         "sale_number": sale_number,
         "customer_name": sale_in.customer_name,
@@ -79,45 +117,117 @@ async def create_sale(
         "status": "completed",
         "user_id": current_user.id,
         "notes": sale_in.notes,
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "created_at": now,
+        "updated_at": now,
     }
-    
-    result = await db.sales.insert_one(sale_dict)
-    sale_dict["_id"] = result.inserted_id
-    
-    # Update product stock
-    for item in sale_in.items:
-        await db.products.update_one(
-            {"_id": item.product_id},
-            {"$inc": {"stock_quantity": -item.quantity}}
-        )
-    
-    return Sale(**sale_dict)
+    sale_ref = db.collection("sales").document()
+    product_refs = [
+        db.collection("products").document(product_id) for product_id in sold
+    ]
+
+    @firestore.transactional
+    def sell(transaction: firestore.Transaction) -> None:
+        snapshots = {
+            snapshot.reference.path: snapshot
+            for snapshot in db.get_all(product_refs, transaction=transaction)
+        }
+        # Firestore transactions require every read to happen before any write
+        writes: list[Write] = []
+        for product_ref in product_refs:
+            snapshot = snapshots[product_ref.path]
+            if not snapshot.exists:
+                raise HTTPException(
+                    status_code=404, detail=f"Product {product_ref.id} not found"
+                )
+            product_dict = snapshot.to_dict()
+            stock_quantity = product_dict.get("stock_quantity", 0)
+            new_quantity = stock_quantity - int(sold[product_ref.id])
+            if new_quantity < 0:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Not enough stock for product {product_ref.id}",
+                )
+            writes.append(("update", product_ref, {"stock_quantity": new_quantity}))
+            low_stock = crud.low_stock_write(
+                db,
+                kind="product",
+                ref_id=product_ref.id,
+                name=product_dict.get("name"),
+                was_low=crud.is_low_stock(
+                    stock_quantity, product_dict.get("reorder_point")
+                ),
+                quantity=new_quantity,
+                reorder_point=product_dict.get("reorder_point"),
+            )
+            if low_stock:
+                writes.append(low_stock)
+        writes.append(("set", sale_ref, sale_dict))
+        for write in writes:
+            apply_write(transaction, write)
+
+    sell(db.transaction())
+    for product_id in sold:
+        document_cache.evict("products", product_id)
+    return SalePublic(**sale_dict, _id=sale_ref.id)
 
 
 @router.delete("/{id}")
-async def delete_sale(db: DatabaseDep, current_user: CurrentUser, id: str) -> Message:
-    """Delete a sale (cancel)."""
-    sale_dict = await db.sales.find_one({"_id": id})
-    if not sale_dict:
-        raise HTTPException(status_code=404, detail="Sale not found")
-    
-    sale = Sale(**sale_dict)
-    if sale.status == "cancelled":
-        raise HTTPException(status_code=400, detail="Sale already cancelled")
-    
-    # Restore product stock
-    for item in sale.items:
-        await db.products.update_one(
-            {"_id": item.product_id},
-            {"$inc": {"stock_quantity": item.quantity}}
+async def delete_sale(db: DatabaseDep, current_user: SalesUser, id: str) -> Message:
+    """Delete a sale (cancel), putting its products back in stock."""
+    sale_ref = db.collection("sales").document(id)
+
+    @firestore.transactional
+    def cancel(transaction: firestore.Transaction) -> dict[str, float]:
+        snapshot = sale_ref.get(transaction=transaction)
+        if not snapshot.exists:
+            raise HTTPException(status_code=404, detail="Sale not found")
+        sale = Sale(**snapshot.to_dict())
+        if sale.status == "cancelled":
+            raise HTTPException(status_code=400, detail="Sale already cancelled")
+
+        restored: dict[str, float] = defaultdict(float)
+        for item in sale.items:
+            restored[item.product_id] += item.quantity
+        product_refs = [
+            db.collection("products").document(product_id) for product_id in restored
+        ]
+        writes: list[Write] = []
+        # Products deleted since the sale have no stock to restore
+        for product in db.get_all(product_refs, transaction=transaction):
+            if not product.exists:
+                continue
+            product_dict = product.to_dict()
+            stock_quantity = product_dict.get("stock_quantity", 0)
+            new_quantity = stock_quantity + int(restored[product.id])
+            writes.append(
+                ("update", product.reference, {"stock_quantity": new_quantity})
+            )
+            low_stock = crud.low_stock_write(
+                db,
+                kind="product",
+                ref_id=product.id,
+                name=product_dict.get("name"),
+                was_low=crud.is_low_stock(
+                    stock_quantity, product_dict.get("reorder_point")
+                ),
+                quantity=new_quantity,
+                reorder_point=product_dict.get("reorder_point"),
+            )
+            if low_stock:
+                writes.append(low_stock)
+
+        # Mark as cancelled instead of deleting
+        writes.append(
+            (
+                "update",
+                sale_ref,
+                {"status": "cancelled", "updated_at": datetime.now(timezone.utc)},
+            )
         )
-    
-    # Mark as cancelled instead of deleting
-    await db.sales.update_one(
-        {"_id": id},
-        {"$set": {"status": "cancelled", "updated_at": datetime.now(timezone.utc)}}
-    )
-    
+        for write in writes:
+            apply_write(transaction, write)
+        return restored
+
+    for product_id in cancel(db.transaction()):
+        document_cache.evict("products", product_id)
     return Message(message="Sale cancelled successfully")
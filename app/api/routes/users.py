@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -9,8 +10,11 @@ from app.api.deps import (
     get_current_active_superuser,
 )
 from app.core.config import settings
+from app.core.jobs import cascade_deletes
 from app.core.security import get_password_hash, verify_password
 from app.models import (
+    CascadeStep,
+    JobPublic,
     Message,
     UpdatePassword,
     User,
@@ -46,14 +50,13 @@ async def read_users(db: DatabaseDep, skip: int = 0, limit: int = 100) -> Any:
 )
 async def create_user(*, db: DatabaseDep, user_in: UserCreate) -> Any:
     """Create new user."""
-    user = await crud.get_user_by_email(db=db, email=user_in.email)
-    if user:
+    try:
+        user = await crud.create_user(db=db, user_create=user_in)
+    except crud.EmailAlreadyRegisteredError:
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system.",
         )
-
-    user = await crud.create_user(db=db, user_create=user_in)
     if settings.emails_enabled and user_in.email:
         email_data = generate_new_account_email(
             email_to=user_in.email, username=user_in.email, password=user_in.password
@@ -71,21 +74,18 @@ async def update_user_me(
     *, db: DatabaseDep, user_in: UserUpdateMe, current_user: CurrentUser
 ) -> Any:
     """Update own user."""
-    if user_in.email:
-        existing_user = await crud.get_user_by_email(db=db, email=user_in.email)
-        if existing_user and str(existing_user.id) != str(current_user.id):
-            raise HTTPException(
-                status_code=409, detail="User with this email already exists"
-            )
-
-    update_data = user_in.model_dump(exclude_unset=True)
-    if update_data:
-        await db.users.update_one(
-            {"_id": current_user.id},
-            {"$set": update_data},
+    try:
+        updated_user = await crud.update_user(
+            db=db,
+            user_id=current_user.id,
+            user_in=UserUpdate(**user_in.model_dump(exclude_unset=True)),
         )
-
-    updated_user = await crud.get_user_by_id(db, str(current_user.id))
+    except crud.EmailAlreadyRegisteredError:
+        raise HTTPException(
+            status_code=409, detail="User with this email already exists"
+        )
+    if not updated_user:
+        raise HTTPException(status_code=404, detail="User not found")
     return updated_user
 
 
@@ -94,18 +94,24 @@ async def update_password_me(
     *, db: DatabaseDep, body: UpdatePassword, current_user: CurrentUser
 ) -> Any:
     """Update own password."""
-    if not verify_password(body.current_password, current_user.hashed_password):
+    # Tokens carry no password hash; check against the stored one
+    user_doc = db.collection("users").document(current_user.id).get()
+    if not user_doc.exists:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not verify_password(body.current_password, user_doc.get("hashed_password")):
         raise HTTPException(status_code=400, detail="Incorrect password")
     if body.current_password == body.new_password:
         raise HTTPException(
             status_code=400, detail="New password cannot be the same as the current one"
         )
 
-    hashed_password = get_password_hash(body.new_password)
-    await db.users.update_one(
-        {"_id": current_user.id},
-        {"$set": {"hashed_password": hashed_password}},
+    user_doc.reference.update(
+        {
+            "hashed_password": get_password_hash(body.new_password),
+            "updated_at": datetime.now(timezone.utc),
+        }
     )
+    crud.revoke_user_tokens(db, current_user.id)
 
     return Message(message="Password updated successfully")
 
@@ -116,34 +122,45 @@ async def read_user_me(current_user: CurrentUser) -> Any:
     return current_user
 
 
-@router.delete("/me", response_model=Message)
+def delete_user_data(db: Any, user_id: str) -> JobPublic:
+    """Delete a user now, and what it owns in a background job."""
+    crud.delete_user(db, user_id)
+    crud.revoke_user_tokens(db, user_id)
+    job = cascade_deletes.submit(
+        db,
+        kind="delete_user",
+        steps=[CascadeStep(collection="items", field="owner_id", value=user_id)],
+    )
+    return JobPublic(**job)
+
+
+@router.delete("/me", status_code=202, response_model=JobPublic)
 async def delete_user_me(db: DatabaseDep, current_user: CurrentUser) -> Any:
-    """Delete own user."""
+    """
+    Delete own user.
+
+    The user's items are deleted by the returned background job.
+    """
     if current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
 
-    await db.users.delete_one({"_id": current_user.id})
-    await db.items.delete_many({"owner_id": current_user.id})
-
-    return Message(message="User deleted successfully")
+    return delete_user_data(db, current_user.id)
 
 
 @router.post("/signup", response_model=UserPublic)
 async def register_user(db: DatabaseDep, user_in: UserRegister) -> Any:
     """Create new user without the need to be logged in."""
-    user = await crud.get_user_by_email(db=db, email=user_in.email)
-    if user:
+    user_create = UserCreate.model_validate(user_in)
+    try:
+        return await crud.create_user(db=db, user_create=user_create)
+    except crud.EmailAlreadyRegisteredError:
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system",
         )
 
-    user_create = UserCreate.model_validate(user_in)
-    user = await crud.create_user(db=db, user_create=user_create)
-    return user
-
 
 @router.get("/{user_id}", response_model=UserPublic)
 async def read_user_by_id(
@@ -177,29 +194,33 @@ async def update_user(
     user_in: UserUpdate,
 ) -> Any:
     """Update a user."""
-    db_user = await crud.get_user_by_id(db, user_id)
-    if not db_user:
+    try:
+        updated_user = await crud.update_user(db=db, user_id=user_id, user_in=user_in)
+    except crud.EmailAlreadyRegisteredError:
+        raise HTTPException(
+            status_code=409, detail="User with this email already exists"
+        )
+    if not updated_user:
         raise HTTPException(
             status_code=404,
             detail="The user with this id does not exist in the system",
         )
-
-    if user_in.email:
-        existing_user = await crud.get_user_by_email(db=db, email=user_in.email)
-        if existing_user and str(existing_user.id) != user_id:
-            raise HTTPException(
-                status_code=409, detail="User with this email already exists"
-            )
-
-    updated_user = await crud.update_user(db=db, user_id=user_id, user_in=user_in)
     return updated_user
 
 
-@router.delete("/{user_id}", dependencies=[Depends(get_current_active_superuser)])
-async def delete_user(
-    db: DatabaseDep, current_user: CurrentUser, user_id: str
-) -> Message:
-    """Delete a user."""
+@router.delete(
+    "/{user_id}",
+    dependencies=[Depends(get_current_active_superuser)],
+    status_code=202,
+    response_model=JobPublic,
+)
+async def delete_user(db: DatabaseDep, current_user: CurrentUser, user_id: str) -> Any:
+    """
+    Delete a user.
+
+    The user's items are deleted by the returned background job; follow it
+    at /admin/jobs/{job_id}.
+    """
     user = await crud.get_user_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -209,7 +230,4 @@ async def delete_user(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
 
-    await db.items.delete_many({"owner_id": user_id})
-    await db.users.delete_one({"_id": user_id})
-
-    return Message(message="User deleted successfully")
+    return delete_user_data(db, user_id)
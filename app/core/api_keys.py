@@ -0,0 +1,110 @@
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from app.core import memory
+from app.core.config import settings
+from app.core.revocation import revocations
+from app.models import AuthenticatedUser
+
+API_KEY_HEADER = "X-API-Key"
+API_KEY_PREFIX = "mk_"
+MAX_CACHED_KEYS = 10_000
+
+
+def hash_api_key_secret(secret: str) -> bytes:
+    # Keys are random, so a keyed hash is enough: verifying takes
+    # microseconds, and a leaked collection is useless without SECRET_KEY
+    return hmac.new(
+        settings.SECRET_KEY.encode(), secret.encode(), hashlib.sha256
+    ).digest()
+
+
+def create_api_key() -> tuple[str, str, bytes]:
+    """Return ``(key_id, key, secret_hash)`` for a new API key.
+
+    The key is ``mk_<key_id>.<secret>``; only the secret's hash is stored,
+    under the key ID.
+    """
+    key_id = uuid.uuid4().hex
+    secret = secrets.token_urlsafe(32)
+    return key_id, f"{API_KEY_PREFIX}{key_id}.{secret}", hash_api_key_secret(secret)
+
+
+def split_api_key(key: str) -> tuple[str, bytes] | None:
+    """Return ``(key_id, secret_hash)`` of an API key, if well formed."""
+    if not key.startswith(API_KEY_PREFIX):
+        return None
+    key_id, _, secret = key[len(API_KEY_PREFIX) :].partition(".")
+    if not key_id or not secret:
+        return None
+    return key_id, hash_api_key_secret(secret)
+
+
+@dataclass
+class CachedApiKey:
+    """A key loaded from Firestore; ``user`` is ``None`` for unusable keys."""
+
+    secret_hash: bytes
+    scopes: tuple[str, ...]
+    user: AuthenticatedUser | None
+    loaded_at: float
+
+
+class ApiKeyCache:
+    """Recently used API keys, so verifying one needs no Firestore read.
+
+    Entries live for ``API_KEY_CACHE_SECONDS``; unknown key IDs are cached
+    too, so guessing keys cannot turn into a read per request. Deleting a
+    key also revokes its ID, which reaches every worker before the cache
+    entries expire.
+    """
+
+    def __init__(self, maxsize: int = MAX_CACHED_KEYS) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CachedApiKey] = OrderedDict()
+
+    def get(self, key_id: str) -> CachedApiKey | None:
+        with self._lock:
+            entry = self._entries.get(key_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.loaded_at > settings.API_KEY_CACHE_SECONDS:
+                del self._entries[key_id]
+                return None
+            self._entries.move_to_end(key_id)
+            return entry
+
+    def put(self, key_id: str, entry: CachedApiKey) -> None:
+        with self._lock:
+            self._entries[key_id] = entry
+            self._entries.move_to_end(key_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def evict(self, key_id: str) -> None:
+        with self._lock:
+            self._entries.pop(key_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+api_key_cache = ApiKeyCache()
+memory.register_cache("api_keys.cache", lambda: len(api_key_cache))
+
+
+def revoke_api_key(db: Any, key_id: str) -> None:
+    """Delete an API key; every worker stops accepting it within a second or so."""
+    db.collection("api_keys").document(key_id).delete()
+    # Workers that cached the key reject it once the revocation reaches them;
+    # after the cache entry expires the key is simply gone
+    revocations.revoke_token(db, key_id, time.time() + settings.API_KEY_CACHE_SECONDS)
+    api_key_cache.evict(key_id)
@@ -39,8 +39,32 @@ class Settings(BaseSettings):
     )
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = secrets.token_urlsafe(32)
-    # 60 minutes * 24 hours * 8 days = 8 days
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Access tokens are short-lived; clients renew them with a refresh token
+    # at /login/refresh, which needs no password check
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # How long a verified device API key is trusted without a database read
+    API_KEY_CACHE_SECONDS: int = 60
+    # How long batch reads may serve a product, item or recipe from the
+    # worker's cache; edits through the API evict it right away, other
+    # workers and stock movements are seen after at most this long
+    DOCUMENT_CACHE_SECONDS: int = 10
+    # GET /dashboard is served from a shared copy for DASHBOARD_FRESH_SECONDS;
+    # for DASHBOARD_STALE_SECONDS more, the stale copy is served while a
+    # fresh one is read in the background
+    DASHBOARD_FRESH_SECONDS: int = 5
+    DASHBOARD_STALE_SECONDS: int = 60
+    # Password logins allowed per client IP and per account: a burst, then a
+    # steady rate. "memory" limits each worker on its own; "firestore" shares
+    # the buckets between workers and instances at a transaction per attempt
+    LOGIN_RATE_LIMIT_IP_BURST: int = 20
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE: float = 10
+    LOGIN_RATE_LIMIT_ACCOUNT_BURST: int = 5
+    LOGIN_RATE_LIMIT_ACCOUNT_PER_MINUTE: float = 2
+    LOGIN_RATE_LIMIT_BACKEND: Literal["memory", "firestore"] = "memory"
+    # Proxies in front of the app that append to X-Forwarded-For (1 on Cloud
+    # Run); 0 uses the connection's address
+    FORWARDED_PROXY_HOPS: int = 0
     FRONTEND_HOST: str = "http://localhost:5173"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
@@ -82,6 +106,24 @@ class Settings(BaseSettings):
     def emails_enabled(self) -> bool:
         return bool(self.SMTP_HOST and self.EMAILS_FROM_EMAIL)
 
+    # Requests slower than this are kept for inspection in /admin/latency
+    SLOW_REQUEST_THRESHOLD_MS: int = 500
+    SLOW_REQUEST_BUFFER_SIZE: int = 200
+
+    # Event-loop lag sampling; in local mode stalls longer than the threshold
+    # also have the loop thread's stack captured
+    EVENT_LOOP_MONITOR_INTERVAL_MS: int = 50
+    EVENT_LOOP_BLOCK_THRESHOLD_MS: int = 100
+
+    # Sampling profiler; requests sent with "X-Profile: <PROFILING_TOKEN>" are
+    # profiled individually (disabled while the token is unset)
+    PROFILER_INTERVAL_MS: int = 10
+    PROFILING_TOKEN: str | None = None
+
+    # Static bearer token for Prometheus to scrape /metrics with; superusers
+    # can read it with their access token too
+    METRICS_TOKEN: str | None = None
+
     EMAIL_TEST_USER: EmailStr = "test@example.com"
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
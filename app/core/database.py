@@ -1,8 +1,16 @@
+import asyncio
 import logging
+import os
+from collections.abc import Iterable
+from typing import Any
+
 import firebase_admin
 from firebase_admin import credentials, firestore as firebase_firestore
 from google.cloud import firestore
 from google.cloud.firestore import Client as FirestoreClient
+from google.cloud.firestore_admin_v1 import FirestoreAdminClient
+
+from app.core import indexes
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -73,13 +81,83 @@ def get_collection(collection_name: str) -> firestore.CollectionReference:
     return database.collection(collection_name)
 
 
-# Note: Firestore doesn't require index creation like MongoDB
-# Indexes are automatically created for single-field queries
-# Composite indexes need to be created in Firebase Console or via firestore.indexes.json
+def document_to_dict(snapshot: firestore.DocumentSnapshot) -> dict[str, Any]:
+    """Return a document's data with its ID under the ``_id`` key used by the models."""
+    return {**(snapshot.to_dict() or {}), "_id": snapshot.id}
+
+
+# A pending ``(operation, reference, data)`` write; ``operation`` is ``"set"``,
+# ``"update"`` or ``"delete"`` and ``data`` is ignored for deletes
+Write = tuple[str, firestore.DocumentReference, dict[str, Any] | None]
+
+# Firestore rejects write batches with more than 500 operations
+MAX_BATCH_WRITES = 500
+
+
+def apply_write(
+    writer: firestore.WriteBatch | firestore.Transaction, write: Write
+) -> None:
+    """Queue a write on a batch or transaction."""
+    operation, reference, data = write
+    if operation == "delete":
+        writer.delete(reference)
+    else:
+        getattr(writer, operation)(reference, data)
+
+
+def commit_in_batches(database: FirestoreClient, writes: Iterable[Write]) -> int:
+    """Commit writes in batches of at most 500, returning the number of batches."""
+    batch = database.batch()
+    pending = 0
+    committed = 0
+    for write in writes:
+        apply_write(batch, write)
+        pending += 1
+        if pending == MAX_BATCH_WRITES:
+            batch.commit()
+            committed += 1
+            batch = database.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+        committed += 1
+    return committed
+
+
+# Single-field indexes are automatic; composite ones are declared in
+# app/core/indexes.py and deployed from the generated firestore.indexes.json
 async def create_indexes() -> None:
     """
-    Firestore handles single-field indexes automatically.
-    Composite indexes should be defined in firestore.indexes.json
-    and deployed via Firebase CLI: firebase deploy --only firestore:indexes
+    Check that the composite indexes the queries need exist and are ready.
+
+    Firestore cannot create indexes from the client: deploy them with
+    ``firebase deploy --only firestore:indexes``. Missing ones, or failing
+    to list them, are fatal outside local, where queries needing them would
+    fail.
     """
-    logger.info("Firestore indexes are managed via Firebase Console or firestore.indexes.json")
+    if os.environ.get("FIRESTORE_EMULATOR_HOST"):
+        # The emulator serves every query without indexes
+        return
+
+    parent = f"{get_database()._database_string}/collectionGroups/-"
+    try:
+        existing = await asyncio.to_thread(
+            lambda: list(FirestoreAdminClient().list_indexes(parent=parent))
+        )
+    except Exception as e:
+        if settings.ENVIRONMENT != "local":
+            raise RuntimeError(f"Could not list Firestore indexes: {e}")
+        logger.warning(f"Could not list Firestore indexes, not checking them: {e}")
+        return
+
+    missing = indexes.missing_indexes(existing)
+    if not missing:
+        logger.info(f"All {len(indexes.INDEXES)} composite Firestore indexes are ready")
+        return
+    for index in missing:
+        logger.error(f"Missing or building Firestore index: {index}")
+    if settings.ENVIRONMENT != "local":
+        raise RuntimeError(
+            f"{len(missing)} Firestore indexes are missing, deploy "
+            "firestore.indexes.json: firebase deploy --only firestore:indexes"
+        )
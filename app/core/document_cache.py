@@ -0,0 +1,57 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.core import memory
+from app.core.config import settings
+
+MAX_CACHED_DOCUMENTS = 10_000
+
+
+class DocumentCache:
+    """Recently read documents, by collection and ID, for batch reads.
+
+    Entries live for ``DOCUMENT_CACHE_SECONDS``, and the least recently used
+    ones are dropped beyond ``maxsize``. Routes that change a document
+    evict it, so this worker never serves its own stale writes.
+    """
+
+    def __init__(self, maxsize: int = MAX_CACHED_DOCUMENTS) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str], tuple[float, dict[str, Any]]] = (
+            OrderedDict()
+        )
+
+    def get(self, collection: str, doc_id: str) -> dict[str, Any] | None:
+        key = (collection, doc_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            loaded_at, document = entry
+            if time.monotonic() - loaded_at > settings.DOCUMENT_CACHE_SECONDS:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return document
+
+    def put(self, collection: str, doc_id: str, document: dict[str, Any]) -> None:
+        key = (collection, doc_id)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), document)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def evict(self, collection: str, doc_id: str) -> None:
+        with self._lock:
+            self._entries.pop((collection, doc_id), None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+document_cache = DocumentCache()
+memory.register_cache("document_cache.entries", lambda: len(document_cache))
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+import emails  # type: ignore
+from emails.backend.smtp import SMTPBackend  # type: ignore
+
+from app.core import memory
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Emails sent over one connection before checking for new ones
+BATCH_SIZE = 50
+# Attempts per email; the delay between them doubles from RETRY_DELAY
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 1.0
+# Close the SMTP connection after this long without emails
+IDLE_TIMEOUT = 30.0
+# How long shutdown waits for queued emails to be delivered
+DRAIN_TIMEOUT = 10.0
+
+
+@dataclass
+class OutgoingEmail:
+    email_to: str
+    subject: str
+    html_content: str
+
+
+def smtp_options() -> dict[str, Any]:
+    options: dict[str, Any] = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
+    if settings.SMTP_TLS:
+        options["tls"] = True
+    elif settings.SMTP_SSL:
+        options["ssl"] = True
+    if settings.SMTP_USER:
+        options["user"] = settings.SMTP_USER
+    if settings.SMTP_PASSWORD:
+        options["password"] = settings.SMTP_PASSWORD
+    return options
+
+
+class EmailOutbox:
+    """Emails waiting to be delivered by a background task.
+
+    Request handlers only queue emails. The task delivers them in batches
+    over one SMTP connection, kept open while emails keep coming, and
+    retries failed ones with exponential backoff. SMTP calls block, so they
+    run in a worker thread.
+    """
+
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue[OutgoingEmail] = asyncio.Queue()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._backend: Any = None
+        self.sent_total = 0
+        self.failed_total = 0
+
+    def start(self) -> None:
+        """Start delivering emails; call from inside the running loop."""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._loop = asyncio.get_running_loop()
+        self._task = self._loop.create_task(self._deliver_forever())
+
+    async def stop(self, timeout: float = DRAIN_TIMEOUT) -> None:
+        """Deliver the queued emails, waiting at most ``timeout`` seconds."""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Shutting down with {self._queue.qsize()} emails unsent")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._loop = None
+        await asyncio.to_thread(self._close)
+
+    def enqueue(self, email: OutgoingEmail) -> None:
+        """Queue an email for delivery; safe to call from any thread."""
+        if self._loop is None:
+            raise RuntimeError("The email outbox is not running")
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, email)
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    async def _deliver_forever(self) -> None:
+        while True:
+            try:
+                first = await asyncio.wait_for(self._queue.get(), IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                await asyncio.to_thread(self._close)
+                continue
+            batch = [first]
+            while len(batch) < BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._deliver_with_retries(batch)
+            except Exception:
+                # This is the only delivery task: it must outlive any batch
+                logger.exception(f"Delivering {len(batch)} emails failed")
+                self.failed_total += len(batch)
+                await asyncio.to_thread(self._close)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _deliver_with_retries(self, batch: list[OutgoingEmail]) -> None:
+        pending = batch
+        for attempt in range(MAX_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(RETRY_DELAY * 2 ** (attempt - 1))
+            pending = await asyncio.to_thread(self._send_batch, pending)
+            if not pending:
+                return
+        self.failed_total += len(pending)
+        for email in pending:
+            logger.error(f"Giving up on email to {email.email_to}: {email.subject}")
+
+    def _send_batch(self, batch: list[OutgoingEmail]) -> list[OutgoingEmail]:
+        """Send emails over the shared connection; return the failed ones."""
+        if self._backend is None:
+            self._backend = SMTPBackend(**smtp_options())
+        failed = []
+        for email in batch:
+            message = emails.Message(
+                subject=email.subject,
+                html=email.html_content,
+                mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
+            )
+            try:
+                response = message.send(to=email.email_to, smtp=self._backend)
+            except Exception:
+                logger.exception(f"Sending email to {email.email_to} failed")
+                response = None
+            if response is not None and response.success:
+                self.sent_total += 1
+            else:
+                logger.warning(f"send email result: {response}")
+                failed.append(email)
+        if failed:
+            # Reconnect for the retry, in case the connection went bad
+            self._close()
+        return failed
+
+    def _close(self) -> None:
+        if self._backend is not None:
+            self._backend.close()
+            self._backend = None
+
+
+outbox = EmailOutbox()
+memory.register_cache("email_outbox.queue", lambda: len(outbox))
@@ -0,0 +1,90 @@
+"""Composite indexes the app's queries need, declared once.
+
+``firestore.indexes.json`` is generated from ``INDEXES`` (run
+``python -m app.core.indexes``) and deployed with
+``firebase deploy --only firestore:indexes``; ``create_indexes()`` checks at
+startup that every index here exists and is ready.
+"""
+
+import json
+import sys
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Literal
+
+INDEXES_FILE = Path(__file__).resolve().parents[2] / "firestore.indexes.json"
+
+Order = Literal["ASCENDING", "DESCENDING"]
+
+
+@dataclass(frozen=True)
+class CompositeIndex:
+    collection: str
+    fields: tuple[tuple[str, Order], ...]
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "collectionGroup": self.collection,
+            "queryScope": "COLLECTION",
+            "fields": [
+                {"fieldPath": field, "order": order} for field, order in self.fields
+            ],
+        }
+
+
+# Equality filters read_sales accepts. Firestore merges indexes for
+# equality filters sharing the same sort, so one index per filter covers
+# every combination of them.
+SALES_FILTERS = ("user_id", "status", "payment_method")
+
+INDEXES: tuple[CompositeIndex, ...] = (
+    *(
+        CompositeIndex("sales", ((field, "ASCENDING"), ("created_at", "DESCENDING")))
+        for field in SALES_FILTERS
+    ),
+    # An item's ledger, newest first: stock at a point in time, reconciliation
+    CompositeIndex(
+        "inventory_adjustments",
+        (("item_id", "ASCENDING"), ("created_at", "DESCENDING")),
+    ),
+)
+
+
+def render(indexes: Iterable[CompositeIndex] = INDEXES) -> str:
+    """Return the ``firestore.indexes.json`` contents for ``indexes``."""
+    document = {
+        "indexes": [index.to_json() for index in indexes],
+        "fieldOverrides": [],
+    }
+    return json.dumps(document, indent=2) + "\n"
+
+
+def missing_indexes(
+    existing: Iterable[Any], indexes: Iterable[CompositeIndex] = INDEXES
+) -> list[CompositeIndex]:
+    """Return those of ``indexes`` not among the ready ``existing`` ones.
+
+    ``existing`` are the Admin API's ``Index`` messages, from
+    ``FirestoreAdminClient.list_indexes``.
+    """
+    ready = set()
+    for index in existing:
+        if index.state.name != "READY" or index.query_scope.name != "COLLECTION":
+            continue
+        # Names look like projects/p/databases/d/collectionGroups/<collection>/...
+        collection = index.name.split("/")[5]
+        fields = tuple(
+            (field.field_path, field.order.name)
+            for field in index.fields
+            # Firestore appends the document name to every composite index
+            if field.field_path != "__name__"
+        )
+        ready.add(CompositeIndex(collection, fields))
+    return [index for index in indexes if index not in ready]
+
+
+if __name__ == "__main__":
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else INDEXES_FILE
+    path.write_text(render())
+    print(f"Wrote {len(INDEXES)} indexes to {path}")
@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from google.cloud import firestore
+from google.cloud.firestore import Client as FirestoreClient
+from google.cloud.firestore import FieldFilter
+
+from app.core import memory
+from app.core.database import MAX_BATCH_WRITES
+from app.models import CascadeStep
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "jobs"
+# Pause between batches: 500 deletes a second is the sustained write rate
+# Firestore recommends starting from, and leaves room for regular traffic
+BATCH_INTERVAL = 1.0
+# A running job not updated for this long was abandoned by its worker (a
+# restart or a crash) and is resumed by the next worker to look for one
+LEASE_SECONDS = 60
+# How often every worker looks for abandoned jobs
+RESUME_INTERVAL = LEASE_SECONDS
+# How long shutdown waits for running jobs to reach a batch boundary
+STOP_TIMEOUT = 10.0
+
+
+class CascadeDeleteRunner:
+    """Cascade deletes run in the background, with their progress stored.
+
+    A job deletes, step by step, every document of a collection whose field
+    equals a value, one batch of 500 at a time. Jobs are kept in the
+    ``jobs`` collection, so any worker can report on them. Deleting by query
+    is idempotent, so a job cut short by a restart is resumed from scratch
+    and simply continues where its last batch left off.
+    """
+
+    def __init__(self) -> None:
+        # Jobs running on this worker, by ID
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+        self._watcher: asyncio.Task[None] | None = None
+        self._stopping = threading.Event()
+
+    def submit(
+        self, db: FirestoreClient, kind: str, steps: list[CascadeStep]
+    ) -> dict[str, Any]:
+        """Store a job and start running it; return the stored job."""
+        now = datetime.now(timezone.utc)
+        reference = db.collection(COLLECTION).document()
+        job = {
+            "kind": kind,
+            "status": "running",
+            "steps": [step.model_dump() for step in steps],
+            "deleted": {step.collection: 0 for step in steps},
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        reference.set(job)
+        self._spawn(db, reference, steps)
+        return {**job, "_id": reference.id}
+
+    def start(self, db: FirestoreClient) -> None:
+        """Resume abandoned jobs now and every ``RESUME_INTERVAL`` seconds.
+
+        Call from inside the running loop.
+        """
+        self._stopping.clear()
+        self._resume(db, self._claim_abandoned(db))
+        self._watcher = asyncio.get_running_loop().create_task(self._watch(db))
+
+    async def stop(self) -> None:
+        """Stop running jobs at their next batch; other workers resume them."""
+        self._stopping.set()
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+        if self._tasks:
+            await asyncio.wait(self._tasks.values(), timeout=STOP_TIMEOUT)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def _watch(self, db: FirestoreClient) -> None:
+        # Workers that die while others keep running leave their jobs to
+        # whichever worker looks next, not to the next one to start
+        while True:
+            await asyncio.sleep(RESUME_INTERVAL)
+            try:
+                claimed = await asyncio.to_thread(self._claim_abandoned, db)
+            except Exception:
+                logger.exception("Looking for abandoned jobs failed")
+                continue
+            self._resume(db, claimed)
+
+    def _claim_abandoned(
+        self, db: FirestoreClient
+    ) -> list[tuple[Any, list[CascadeStep]]]:
+        """Claim the running jobs whose lease expired; return them and their steps."""
+        claimed = []
+        running = db.collection(COLLECTION).where(
+            filter=FieldFilter("status", "==", "running")
+        )
+        for snapshot in running.stream():
+            if snapshot.id in self._tasks:
+                continue
+            if self._claim(db, snapshot.reference):
+                steps = [CascadeStep(**step) for step in snapshot.get("steps")]
+                claimed.append((snapshot.reference, steps))
+        return claimed
+
+    def _resume(
+        self, db: FirestoreClient, claimed: list[tuple[Any, list[CascadeStep]]]
+    ) -> None:
+        for reference, steps in claimed:
+            logger.info(f"Resuming job {reference.id}")
+            self._spawn(db, reference, steps)
+
+    def _claim(self, db: FirestoreClient, reference: Any) -> bool:
+        @firestore.transactional
+        def claim(transaction: firestore.Transaction) -> bool:
+            snapshot = reference.get(transaction=transaction)
+            now = datetime.now(timezone.utc)
+            if (
+                not snapshot.exists
+                or snapshot.get("status") != "running"
+                or snapshot.get("updated_at") > now - timedelta(seconds=LEASE_SECONDS)
+            ):
+                return False
+            transaction.update(reference, {"updated_at": now})
+            return True
+
+        return claim(db.transaction())
+
+    def _spawn(
+        self, db: FirestoreClient, reference: Any, steps: list[CascadeStep]
+    ) -> None:
+        task = asyncio.get_running_loop().create_task(
+            asyncio.to_thread(self._run, db, reference, steps)
+        )
+        self._tasks[reference.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(reference.id, None))
+
+    def _run(
+        self, db: FirestoreClient, reference: Any, steps: list[CascadeStep]
+    ) -> None:
+        try:
+            for step in steps:
+                self._delete_matching(db, reference, step)
+        except Exception as exc:
+            logger.exception(f"Job {reference.id} failed")
+            reference.update(
+                {
+                    "status": "failed",
+                    "error": str(exc),
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            )
+            return
+        if not self._stopping.is_set():
+            reference.update(
+                {"status": "completed", "updated_at": datetime.now(timezone.utc)}
+            )
+
+    def _delete_matching(
+        self, db: FirestoreClient, reference: Any, step: CascadeStep
+    ) -> None:
+        # Deleted documents drop out of the query, so every page is the first
+        page = (
+            db.collection(step.collection)
+            .where(filter=FieldFilter(step.field, "==", step.value))
+            .select([])
+            .limit(MAX_BATCH_WRITES)
+        )
+        while not self._stopping.is_set():
+            documents = list(page.stream())
+            if not documents:
+                return
+            batch = db.batch()
+            for document in documents:
+                batch.delete(document.reference)
+            batch.commit()
+            reference.update(
+                {
+                    f"deleted.{step.collection}": firestore.Increment(len(documents)),
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            )
+            if len(documents) < MAX_BATCH_WRITES:
+                return
+            self._stopping.wait(BATCH_INTERVAL)
+
+
+cascade_deletes = CascadeDeleteRunner()
+memory.register_cache("jobs.running", lambda: len(cascade_deletes))
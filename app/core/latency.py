@@ -0,0 +1,222 @@
+import bisect
+import threading
+import time
+from collections import defaultdict, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any
+
+import fastapi.routing
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import memory, metrics
+from app.core.config import settings
+
+# Bucket upper bounds in seconds, 1 ms to ~70 s growing by 25%: percentiles
+# read from the histogram are within one bucket width of the true value
+BUCKETS = tuple(0.001 * 1.25**n for n in range(51))
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; observing is a bisect and an increment."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile in seconds, interpolating inside a bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = BUCKETS[index - 1] if index else 0.0
+                upper = BUCKETS[index] if index < len(BUCKETS) else BUCKETS[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return BUCKETS[-1]
+
+
+@dataclass
+class RequestTimings:
+    """Time spent in the phases of a request that the histogram cannot see."""
+
+    auth: float = 0.0
+    serialization: float = 0.0
+    user_id: str | None = None
+
+
+current_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+_lock = threading.Lock()
+_histograms: dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+slow_requests: deque[dict[str, Any]] = deque(maxlen=settings.SLOW_REQUEST_BUFFER_SIZE)
+memory.register_cache("latency.histograms", lambda: len(_histograms))
+memory.register_cache("latency.slow_requests", lambda: len(slow_requests))
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Add the time spent in the block to a phase of the current request."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = current_timings.get()
+        if timings is not None:
+            elapsed = time.perf_counter() - started
+            setattr(timings, phase, getattr(timings, phase) + elapsed)
+
+
+def identify_user(user_id: str) -> None:
+    """Record who made the current request, for slow-request records."""
+    timings = current_timings.get()
+    if timings is not None:
+        timings.user_id = user_id
+
+
+_instrumented = False
+
+
+def instrument_serialization() -> None:
+    """Time FastAPI's response validation and serialization step."""
+    global _instrumented
+    if _instrumented:
+        return
+    _instrumented = True
+
+    serialize_response = fastapi.routing.serialize_response
+
+    @wraps(serialize_response)
+    async def timed_serialize_response(*args: Any, **kwargs: Any) -> Any:
+        with timed("serialization"):
+            return await serialize_response(*args, **kwargs)
+
+    # Looked up as a module global by FastAPI's request handler on every call
+    fastapi.routing.serialize_response = timed_serialize_response  # type: ignore[assignment]
+
+
+def observe(route: str, seconds: float) -> None:
+    with _lock:
+        _histograms[route].observe(seconds)
+
+
+def percentiles() -> dict[str, dict[str, float]]:
+    """Return request count and p50/p95/p99 in milliseconds per route."""
+    with _lock:
+        return {
+            route: {
+                "count": histogram.count,
+                "p50_ms": histogram.quantile(0.50) * 1000,
+                "p95_ms": histogram.quantile(0.95) * 1000,
+                "p99_ms": histogram.quantile(0.99) * 1000,
+            }
+            for route, histogram in sorted(_histograms.items())
+        }
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+        slow_requests.clear()
+
+
+def render_prometheus() -> str:
+    """Render the per-route histograms in the Prometheus text exposition format."""
+    name = "http_request_duration_seconds"
+    lines = [
+        f"# HELP {name} HTTP request latency.",
+        f"# TYPE {name} histogram",
+    ]
+    with _lock:
+        for route, histogram in sorted(_histograms.items()):
+            label = metrics.route_label(route)
+            # Bucket labels are the route label plus the upper bound
+            prefix = label[:-1]
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, histogram.counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{prefix},le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{prefix},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{label} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{label} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+
+class LatencyMiddleware:
+    """Record per-route latency and capture requests slower than the threshold.
+
+    Must run inside ``FirestoreMetricsMiddleware`` (be added before it) so the
+    request's Firestore operations are available for slow-request records.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        status_code = 500
+
+        async def send_capturing_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_capturing_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_timings.reset(token)
+            route = metrics.route_name(scope)
+            observe(route, elapsed)
+            if elapsed * 1000 >= settings.SLOW_REQUEST_THRESHOLD_MS:
+                slow_requests.append(
+                    _slow_request(scope, route, status_code, elapsed, timings)
+                )
+
+
+def _slow_request(
+    scope: Scope,
+    route: str,
+    status_code: int,
+    elapsed: float,
+    timings: RequestTimings,
+) -> dict[str, Any]:
+    stats = metrics.current_stats.get() or metrics.OperationStats()
+    return {
+        "at": datetime.now(timezone.utc),
+        "method": scope["method"],
+        "path": scope["path"],
+        "route": route,
+        "status_code": status_code,
+        "user_id": timings.user_id,
+        "total_ms": elapsed * 1000,
+        "auth_ms": timings.auth * 1000,
+        "db_ms": stats.seconds * 1000,
+        "serialization_ms": timings.serialization * 1000,
+        "firestore_calls": stats.calls,
+        "firestore_reads": stats.reads,
+        "firestore_writes": stats.writes,
+        "firestore_deletes": stats.deletes,
+    }
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any
+
+from app.core import memory
+from app.core.config import settings
+from app.core.latency import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+class LoopMonitor:
+    """Measure event-loop lag and catch the code that blocks the loop.
+
+    A task sleeps for a fixed interval and records how late it wakes up. When
+    stack capture is enabled, a watchdog thread also notices when that task
+    stops waking up at all and records the loop thread's stack while it is
+    still blocked, which points straight at the offending call site.
+    """
+
+    def __init__(self) -> None:
+        self.interval = settings.EVENT_LOOP_MONITOR_INTERVAL_MS / 1000
+        self.threshold = settings.EVENT_LOOP_BLOCK_THRESHOLD_MS / 1000
+        self.lag = LatencyHistogram()
+        self.max_lag = 0.0
+        self.blocks: deque[dict[str, Any]] = deque(maxlen=50)
+        self.blocked_total = 0
+        self._heartbeat = time.monotonic()
+        self._lock = threading.Lock()
+        self._task: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._loop_thread_id: int | None = None
+
+    def start(self, capture_stacks: bool) -> None:
+        """Start monitoring the running loop; call from inside it."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._measure())
+        if capture_stacks:
+            self._watchdog = threading.Thread(
+                target=self._watch, name="loop-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _measure(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._heartbeat = time.monotonic()
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - expected, 0.0)
+            with self._lock:
+                self.lag.observe(lag)
+                self.max_lag = max(self.max_lag, lag)
+                if lag >= self.threshold:
+                    self.blocked_total += 1
+
+    def _watch(self) -> None:
+        captured_heartbeat = None
+        while not self._stopped.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            # Capture each stall once, while the loop is still stuck in it
+            if blocked < self.threshold or heartbeat == captured_heartbeat:
+                continue
+            captured_heartbeat = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id or 0)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            logger.warning(f"Event loop blocked for {blocked * 1000:.0f} ms\n{stack}")
+            with self._lock:
+                self.blocks.append(
+                    {
+                        "at": datetime.now(timezone.utc),
+                        "blocked_ms": blocked * 1000,
+                        "stack": stack,
+                    }
+                )
+
+    def report(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "samples": self.lag.count,
+                "p50_ms": self.lag.quantile(0.50) * 1000,
+                "p99_ms": self.lag.quantile(0.99) * 1000,
+                "max_ms": self.max_lag * 1000,
+                "blocked_total": self.blocked_total,
+                "blocks": list(self.blocks),
+            }
+
+    def render_prometheus(self) -> str:
+        """Render lag metrics in the Prometheus text exposition format."""
+        with self._lock:
+            lines = [
+                "# HELP event_loop_lag_seconds Delay of event-loop wakeups.",
+                "# TYPE event_loop_lag_seconds summary",
+                *(
+                    f'event_loop_lag_seconds{{quantile="{q}"}} {self.lag.quantile(q):.6f}'
+                    for q in (0.5, 0.9, 0.99)
+                ),
+                f"event_loop_lag_seconds_sum {self.lag.sum:.6f}",
+                f"event_loop_lag_seconds_count {self.lag.count}",
+                "# HELP event_loop_lag_max_seconds Largest event-loop lag seen.",
+                "# TYPE event_loop_lag_max_seconds gauge",
+                f"event_loop_lag_max_seconds {self.max_lag:.6f}",
+                "# HELP event_loop_blocked_total Stalls longer than the block threshold.",
+                "# TYPE event_loop_blocked_total counter",
+                f"event_loop_blocked_total {self.blocked_total}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+monitor = LoopMonitor()
+memory.register_cache("loop_monitor.blocks", lambda: len(monitor.blocks))
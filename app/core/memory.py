@@ -0,0 +1,97 @@
+import os
+import threading
+import tracemalloc
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+# Snapshots hold every traced allocation, so only the most recent few are kept
+MAX_SNAPSHOTS = 4
+TRACEBACK_FRAMES = 10
+
+_lock = threading.Lock()
+_caches: dict[str, Callable[[], int]] = {}
+_snapshots: OrderedDict[str, tuple[datetime, tracemalloc.Snapshot]] = OrderedDict()
+
+
+def register_cache(name: str, size: Callable[[], int]) -> None:
+    """Report an in-process cache (its number of entries) in memory diagnostics."""
+    _caches[name] = size
+
+
+def cache_sizes() -> dict[str, int]:
+    return {name: size() for name, size in sorted(_caches.items())}
+
+
+def rss_bytes() -> int | None:
+    """Current resident set size of the worker, where /proc is available."""
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IndexError, ValueError, AttributeError):
+        return None
+
+
+def _sites(stats: list[Any], limit: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "location": str(stat.traceback[0]),
+            "size_bytes": stat.size,
+            "count": stat.count,
+            "size_diff_bytes": getattr(stat, "size_diff", None),
+            "count_diff": getattr(stat, "count_diff", None),
+        }
+        for stat in stats[:limit]
+    ]
+
+
+def take_snapshot(limit: int) -> dict[str, Any]:
+    """Snapshot traced allocations, starting tracemalloc on first use.
+
+    Allocations made before tracing started are not traced, so the first
+    snapshot mostly serves as the baseline for later diffs.
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEBACK_FRAMES)
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),)
+    )
+    snapshot_id = str(uuid.uuid4())
+    taken_at = datetime.now(timezone.utc)
+    with _lock:
+        _snapshots[snapshot_id] = (taken_at, snapshot)
+        while len(_snapshots) > MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+    return {
+        "id": snapshot_id,
+        "taken_at": taken_at,
+        "traced_bytes": tracemalloc.get_traced_memory()[0],
+        "top": _sites(snapshot.statistics("lineno"), limit),
+    }
+
+
+def compare_snapshots(
+    old_id: str, new_id: str, limit: int
+) -> list[dict[str, Any]] | None:
+    """Allocation sites that grew the most between two snapshots."""
+    with _lock:
+        old = _snapshots.get(old_id)
+        new = _snapshots.get(new_id)
+    if old is None or new is None:
+        return None
+    return _sites(new[1].compare_to(old[1], "lineno"), limit)
+
+
+def snapshot_ids() -> list[str]:
+    with _lock:
+        return list(_snapshots)
+
+
+def stop_tracing() -> None:
+    """Stop tracemalloc and drop the stored snapshots."""
+    with _lock:
+        _snapshots.clear()
+    tracemalloc.stop()
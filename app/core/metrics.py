@@ -0,0 +1,336 @@
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, fields
+from functools import wraps
+from typing import Any
+
+from fastapi.routing import APIRoute
+from google.cloud.firestore_v1.aggregation import AggregationQuery
+from google.cloud.firestore_v1.batch import WriteBatch
+from google.cloud.firestore_v1.client import Client
+from google.cloud.firestore_v1.document import DocumentReference
+from google.cloud.firestore_v1.query import Query
+from google.cloud.firestore_v1.transaction import Transaction
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import memory
+from app.core.config import settings
+
+
+@dataclass
+class OperationStats:
+    """Firestore operations issued while serving a route (or a request)."""
+
+    calls: int = 0
+    seconds: float = 0.0
+    reads: int = 0
+    writes: int = 0
+    deletes: int = 0
+    documents: int = 0
+
+    def add(self, other: "OperationStats") -> None:
+        for field in fields(self):
+            total = getattr(self, field.name) + getattr(other, field.name)
+            setattr(self, field.name, total)
+
+
+# Stats of the request being served; unset outside requests (scripts, startup)
+current_stats: ContextVar[OperationStats | None] = ContextVar(
+    "firestore_stats", default=None
+)
+
+# Operations issued outside any request are reported under this route
+BACKGROUND_ROUTE = "background"
+UNMATCHED_ROUTE = "unmatched"
+
+_lock = threading.Lock()
+_totals: dict[str, OperationStats] = defaultdict(OperationStats)
+_requests: dict[str, int] = defaultdict(int)
+memory.register_cache("metrics.routes", lambda: len(_totals))
+
+
+def _record(stats: OperationStats) -> None:
+    request_stats = current_stats.get()
+    if request_stats is not None:
+        request_stats.add(stats)
+        return
+    with _lock:
+        _totals[BACKGROUND_ROUTE].add(stats)
+
+
+def record_request(route: str, stats: OperationStats) -> None:
+    """Add the operations of a finished request to its route totals."""
+    with _lock:
+        _totals[route].add(stats)
+        _requests[route] += 1
+
+
+def snapshot() -> dict[str, OperationStats]:
+    """Return a copy of the per-route totals."""
+    with _lock:
+        totals = {}
+        for route, stats in _totals.items():
+            totals[route] = OperationStats()
+            totals[route].add(stats)
+        return totals
+
+
+def reset() -> None:
+    with _lock:
+        _totals.clear()
+        _requests.clear()
+
+
+class _CountingStream:
+    """Wraps a Firestore result stream, counting documents as they are consumed.
+
+    Attribute access is delegated so ``get_explain_metrics`` and friends keep
+    working on the wrapped stream.
+    """
+
+    def __init__(self, stream: Any, started: float, aggregation: bool) -> None:
+        self._stream = stream
+        self._started = started
+        self._aggregation = aggregation
+        self._documents = 0
+        self._done = False
+
+    def __iter__(self) -> Iterator[Any]:
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            value = next(self._stream)
+        except StopIteration:
+            self._finish()
+            raise
+        self._documents += 1
+        return value
+
+    def _finish(self) -> None:
+        if self._done:
+            return
+        self._done = True
+        # A query costs at least one read even when it returns nothing, and an
+        # aggregation is billed as one read per batch of index entries
+        documents = 0 if self._aggregation else self._documents
+        _record(
+            OperationStats(
+                calls=1,
+                seconds=time.perf_counter() - self._started,
+                reads=max(documents, 1),
+                documents=documents,
+            )
+        )
+
+    def __del__(self) -> None:
+        # Callers that stop iterating early (e.g. after the first match)
+        # still have the documents they consumed accounted for
+        self._finish()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+
+def _timed(
+    method: Callable[..., Any], count: Callable[[Any, Any], OperationStats]
+) -> Callable[..., Any]:
+    @wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        result = method(self, *args, **kwargs)
+        stats = count(self, result)
+        stats.calls = 1
+        stats.seconds = time.perf_counter() - started
+        _record(stats)
+        return result
+
+    return wrapper
+
+
+def _streamed(method: Callable[..., Any], aggregation: bool) -> Callable[..., Any]:
+    @wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        return _CountingStream(
+            method(self, *args, **kwargs), time.perf_counter(), aggregation
+        )
+
+    return wrapper
+
+
+def _get_all(method: Callable[..., Any]) -> Callable[..., Any]:
+    @wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Iterator[Any]:
+        started = time.perf_counter()
+        documents = reads = 0
+        try:
+            for snapshot in method(self, *args, **kwargs):
+                reads += 1
+                documents += snapshot.exists
+                yield snapshot
+        finally:
+            _record(
+                OperationStats(
+                    calls=1,
+                    seconds=time.perf_counter() - started,
+                    reads=reads,
+                    documents=documents,
+                )
+            )
+
+    return wrapper
+
+
+def _commit(method: Callable[..., Any]) -> Callable[..., Any]:
+    @wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        # Count the queued writes before the commit clears them
+        deletes = sum(
+            1
+            for write in self._write_pbs
+            if write._pb.WhichOneof("operation") == "delete"
+        )
+        stats = OperationStats(
+            calls=1, writes=len(self._write_pbs) - deletes, deletes=deletes
+        )
+        started = time.perf_counter()
+        result = method(self, *args, **kwargs)
+        stats.seconds = time.perf_counter() - started
+        _record(stats)
+        return result
+
+    return wrapper
+
+
+_instrumented = False
+
+
+def instrument_firestore() -> None:
+    """Count every Firestore read, write and delete issued by the process.
+
+    The client classes are patched once, so operations are accounted for
+    whichever code path issues them. Safe to call more than once.
+    """
+    global _instrumented
+    if _instrumented:
+        return
+    _instrumented = True
+
+    DocumentReference.get = _timed(  # type: ignore[method-assign]
+        DocumentReference.get,
+        lambda _, snapshot: OperationStats(reads=1, documents=int(snapshot.exists)),
+    )
+    DocumentReference.delete = _timed(  # type: ignore[method-assign]
+        DocumentReference.delete, lambda *_: OperationStats(deletes=1)
+    )
+    Query.stream = _streamed(Query.stream, aggregation=False)  # type: ignore[method-assign]
+    AggregationQuery.stream = _streamed(  # type: ignore[method-assign]
+        AggregationQuery.stream, aggregation=True
+    )
+    Client.get_all = _get_all(Client.get_all)  # type: ignore[method-assign]
+    # Document set/update/create commit through a one-write batch
+    WriteBatch.commit = _commit(WriteBatch.commit)  # type: ignore[method-assign]
+    Transaction._commit = _commit(Transaction._commit)  # type: ignore[method-assign]
+
+
+def route_name(scope: Scope) -> str:
+    """Return the operation ID (``custom_generate_unique_id``) of the matched route."""
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return UNMATCHED_ROUTE
+    for route in app.router.routes:
+        if isinstance(route, APIRoute) and route.endpoint is endpoint:
+            return route.unique_id
+    return getattr(endpoint, "__name__", UNMATCHED_ROUTE)
+
+
+class FirestoreMetricsMiddleware:
+    """Attribute Firestore operations to the route that issued them.
+
+    In local mode the request's counts are also returned as ``X-Firestore-*``
+    response headers.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = OperationStats()
+        token = current_stats.set(stats)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-firestore-reads", str(stats.reads).encode()),
+                    (b"x-firestore-writes", str(stats.writes).encode()),
+                    (b"x-firestore-deletes", str(stats.deletes).encode()),
+                    (b"x-firestore-seconds", f"{stats.seconds:.6f}".encode()),
+                ]
+            await send(message)
+
+        debug = settings.ENVIRONMENT == "local"
+        try:
+            await self.app(scope, receive, send_with_headers if debug else send)
+        finally:
+            current_stats.reset(token)
+            record_request(route_name(scope), stats)
+
+
+_METRICS = (
+    ("reads", "firestore_reads_total", "counter", "Firestore document reads."),
+    ("writes", "firestore_writes_total", "counter", "Firestore document writes."),
+    ("deletes", "firestore_deletes_total", "counter", "Firestore document deletes."),
+    (
+        "documents",
+        "firestore_documents_returned_total",
+        "counter",
+        "Documents returned by Firestore reads.",
+    ),
+)
+
+
+def route_label(route: str) -> str:
+    """Prometheus label set for a route."""
+    escaped = route.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'{{route="{escaped}"}}'
+
+
+def render_prometheus() -> str:
+    """Render the per-route totals in the Prometheus text exposition format."""
+    totals = snapshot()
+    with _lock:
+        requests = dict(_requests)
+
+    lines = [
+        "# HELP http_requests_total HTTP requests served.",
+        "# TYPE http_requests_total counter",
+        *(
+            f"http_requests_total{route_label(route)} {count}"
+            for route, count in sorted(requests.items())
+        ),
+    ]
+    for attribute, name, kind, description in _METRICS:
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+        lines += [
+            f"{name}{route_label(route)} {getattr(stats, attribute)}"
+            for route, stats in sorted(totals.items())
+        ]
+    lines += [
+        "# HELP firestore_call_seconds Time spent in Firestore calls.",
+        "# TYPE firestore_call_seconds summary",
+    ]
+    for route, stats in sorted(totals.items()):
+        lines.append(
+            f"firestore_call_seconds_sum{route_label(route)} {stats.seconds:.6f}"
+        )
+        lines.append(f"firestore_call_seconds_count{route_label(route)} {stats.calls}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,124 @@
+import secrets
+import sys
+import threading
+import uuid
+from collections import Counter, deque
+from types import FrameType
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import memory
+from app.core.config import settings
+from app.core.metrics import route_name
+
+PROFILE_HEADER = "x-profile"
+
+
+def _frame_label(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_name}"
+
+
+class SamplingProfiler:
+    """Statistical profiler that periodically samples every thread's stack.
+
+    Samples are aggregated as collapsed stacks (``frame;frame;frame count``),
+    the input format of flamegraph.pl and speedscope. Nothing is installed in
+    the profiled code, so overhead is one stack walk per thread per sample.
+    """
+
+    def __init__(self, interval: float | None = None) -> None:
+        self.interval = interval or settings.PROFILER_INTERVAL_MS / 1000
+        self.samples: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and return the collapsed stacks."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.collapsed()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                current: FrameType | None = frame
+                while current is not None:
+                    stack.append(_frame_label(current))
+                    current = current.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+
+# Single worker-wide profile at a time; per-request profiles are kept in a
+# small ring buffer until a superuser fetches them
+profile_lock = threading.Lock()
+request_profiles: deque[tuple[str, str, str]] = deque(maxlen=20)
+memory.register_cache("profiler.request_profiles", lambda: len(request_profiles))
+
+
+def get_request_profile(profile_id: str) -> tuple[str, str] | None:
+    """Return ``(route, collapsed stacks)`` of a per-request profile."""
+    for stored_id, route, collapsed in request_profiles:
+        if stored_id == profile_id:
+            return route, collapsed
+    return None
+
+
+class ProfilingMiddleware:
+    """Profile single requests that carry ``X-Profile: <PROFILING_TOKEN>``.
+
+    The response gets an ``X-Profile-Id`` header; the collapsed stacks are
+    then available at ``/admin/profiles/{id}``. Other requests running on the
+    worker at the same time show up in the samples too.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    def _requested(self, scope: Scope) -> bool:
+        if scope["type"] != "http" or not settings.PROFILING_TOKEN:
+            return False
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER.encode():
+                return secrets.compare_digest(value, settings.PROFILING_TOKEN.encode())
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = str(uuid.uuid4())
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-profile-id", profile_id.encode()),
+                ]
+            await send(message)
+
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            request_profiles.append((profile_id, route_name(scope), profiler.stop()))
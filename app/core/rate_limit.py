@@ -0,0 +1,160 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Protocol
+
+from google.cloud import firestore
+from google.cloud.firestore import Client as FirestoreClient
+from starlette.requests import Request
+
+from app.core import memory
+from app.core.config import settings
+
+# Expired buckets are swept after this many requests
+SWEEP_INTERVAL = 1024
+
+
+class BucketStore(Protocol):
+    def take(self, key: str, capacity: float, rate: float) -> float:
+        """Take one token from a bucket; return 0, or seconds until one refills."""
+        ...
+
+
+def _refill(
+    tokens: float, updated: float, now: float, capacity: float, rate: float
+) -> float:
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+class MemoryBucketStore:
+    """Token buckets of one worker.
+
+    A bucket is three floats; a bucket that has refilled to capacity says
+    nothing a missing one does not, so those are swept, and memory only
+    grows with the clients currently being throttled.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # key -> (tokens, updated, full_at)
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._requests = 0
+
+    def take(self, key: str, capacity: float, rate: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            self._requests += 1
+            if self._requests % SWEEP_INTERVAL == 0:
+                self._sweep(now)
+            tokens, updated, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = _refill(tokens, updated, now, capacity, rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+                return (1 - tokens) / rate
+            tokens -= 1
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            return 0.0
+
+    def _sweep(self, now: float) -> None:
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items() if bucket[2] > now
+        }
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class FirestoreBucketStore:
+    """Token buckets shared by every worker, one document per bucket.
+
+    Costs a transaction per attempt, still far cheaper than a bcrypt check.
+    Bucket documents are meant to be removed by a TTL policy on
+    ``expires_at``.
+    """
+
+    def __init__(self, db: FirestoreClient) -> None:
+        self.db = db
+
+    def take(self, key: str, capacity: float, rate: float) -> float:
+        doc_id = hashlib.sha256(key.encode()).hexdigest()[:32]
+        reference = self.db.collection("rate_limits").document(doc_id)
+
+        @firestore.transactional
+        def take_token(transaction: firestore.Transaction) -> float:
+            now = time.time()
+            snapshot = reference.get(transaction=transaction)
+            tokens = capacity
+            if snapshot.exists:
+                tokens = _refill(
+                    snapshot.get("tokens"), snapshot.get("updated"), now, capacity, rate
+                )
+            retry_after = 0.0
+            if tokens < 1:
+                retry_after = (1 - tokens) / rate
+            else:
+                tokens -= 1
+            full_in = timedelta(seconds=(capacity - tokens) / rate)
+            transaction.set(
+                reference,
+                {
+                    "tokens": tokens,
+                    "updated": now,
+                    "expires_at": datetime.now(timezone.utc) + full_in,
+                },
+            )
+            return retry_after
+
+        return take_token(self.db.transaction())
+
+
+class LoginRateLimiter:
+    """Per-IP and per-account token buckets for password logins.
+
+    The IP bucket stops password spraying across accounts from one client;
+    the account bucket stops guessing one account's password from many.
+    """
+
+    def __init__(self, store: BucketStore) -> None:
+        self.store = store
+
+    def check(self, ip: str, account: str) -> float:
+        """Count a login attempt; return 0, or seconds to wait before retrying."""
+        retry_after = self.store.take(
+            f"login-ip:{ip}",
+            settings.LOGIN_RATE_LIMIT_IP_BURST,
+            settings.LOGIN_RATE_LIMIT_IP_PER_MINUTE / 60,
+        )
+        if retry_after:
+            return retry_after
+        return self.store.take(
+            f"login-account:{account.strip().lower()}",
+            settings.LOGIN_RATE_LIMIT_ACCOUNT_BURST,
+            settings.LOGIN_RATE_LIMIT_ACCOUNT_PER_MINUTE / 60,
+        )
+
+
+def client_ip(request: Request) -> str:
+    """The client's address, taken from X-Forwarded-For behind proxies.
+
+    Each trusted proxy appends the address it received the request from, so
+    with ``FORWARDED_PROXY_HOPS`` proxies in front (1 on Cloud Run) the
+    client is that many entries from the end; entries before it can be
+    forged by the client.
+    """
+    hops = settings.FORWARDED_PROXY_HOPS
+    forwarded = request.headers.get("x-forwarded-for")
+    if hops and forwarded:
+        addresses = [address.strip() for address in forwarded.split(",")]
+        return addresses[max(len(addresses) - hops, 0)]
+    return request.client.host if request.client else "unknown"
+
+
+_memory_store = MemoryBucketStore()
+memory.register_cache("rate_limit.buckets", lambda: len(_memory_store))
+
+
+def get_login_rate_limiter(db: FirestoreClient) -> LoginRateLimiter:
+    if settings.LOGIN_RATE_LIMIT_BACKEND == "firestore":
+        return LoginRateLimiter(FirestoreBucketStore(db))
+    return LoginRateLimiter(_memory_store)
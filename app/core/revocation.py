@@ -0,0 +1,176 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from google.cloud.firestore import Client as FirestoreClient
+from google.cloud.firestore import FieldFilter
+
+from app.core import memory
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "revocations"
+# How long to wait at startup for the revocations already stored; without
+# them revoked tokens would be accepted, so startup fails instead
+INITIAL_LOAD_TIMEOUT = 10.0
+
+
+class BloomFilter:
+    """Set membership in a bit array; no false negatives, rare false positives."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        self.capacity = capacity
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> list[int]:
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + n * second) % self.size for n in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class RevocationList:
+    """Revoked access tokens (by ``jti``) and per-user "not before" times.
+
+    Lookups happen on every authenticated request, so they never touch the
+    database: the bloom filter rules out almost every token with a few bit
+    tests, and only its rare hits are confirmed against the exact set.
+    Revocations are stored in Firestore and every worker follows them with
+    a snapshot listener, so a revocation reaches all workers within about a
+    second. Entries only matter until the tokens they revoke expire.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._lock = threading.Lock()
+        self._tokens: dict[str, float] = {}
+        self._not_before: dict[str, float] = {}
+        self._bloom = BloomFilter(capacity)
+        self._watch: Any = None
+        self._loaded = threading.Event()
+
+    def _add_token(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._tokens[jti] = expires_at
+            if len(self._tokens) > self._bloom.capacity:
+                self._rebuild(time.time())
+            else:
+                self._bloom.add(jti)
+
+    def _add_user(self, user_id: str, not_before: float) -> None:
+        with self._lock:
+            previous = self._not_before.get(user_id, 0)
+            self._not_before[user_id] = max(previous, not_before)
+
+    def _rebuild(self, now: float) -> None:
+        """Drop expired entries and size a new filter for the rest."""
+        self._tokens = {
+            jti: expires_at
+            for jti, expires_at in self._tokens.items()
+            if expires_at > now
+        }
+        # Revoking a user outlives any access token issued before it
+        horizon = now - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        self._not_before = {
+            user_id: not_before
+            for user_id, not_before in self._not_before.items()
+            if not_before > horizon
+        }
+        self._bloom = BloomFilter(max(len(self._tokens) * 2, 1024))
+        for jti in self._tokens:
+            self._bloom.add(jti)
+
+    def is_revoked(self, jti: str, user_id: str, issued_at: float) -> bool:
+        if issued_at < self._not_before.get(user_id, 0):
+            return True
+        return self.is_token_revoked(jti)
+
+    def is_token_revoked(self, jti: str) -> bool:
+        if jti not in self._bloom:
+            return False
+        with self._lock:
+            return jti in self._tokens
+
+    def __len__(self) -> int:
+        return len(self._tokens) + len(self._not_before)
+
+    def revoke_token(self, db: FirestoreClient, jti: str, expires_at: float) -> None:
+        """Revoke one access token until it expires."""
+        self._add_token(jti, expires_at)
+        db.collection(COLLECTION).document(f"token-{jti}").set(
+            {
+                "kind": "token",
+                "jti": jti,
+                "expires_at": datetime.fromtimestamp(expires_at, timezone.utc),
+            }
+        )
+
+    def revoke_user(self, db: FirestoreClient, user_id: str) -> None:
+        """Revoke every token issued to a user so far."""
+        now = time.time()
+        self._add_user(user_id, now)
+        expires_at = now + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        db.collection(COLLECTION).document(f"user-{user_id}").set(
+            {
+                "kind": "user",
+                "user_id": user_id,
+                "not_before": datetime.fromtimestamp(now, timezone.utc),
+                "expires_at": datetime.fromtimestamp(expires_at, timezone.utc),
+            }
+        )
+
+    def apply(self, entry: dict[str, Any]) -> None:
+        """Add a revocation stored by any worker."""
+        if entry.get("kind") == "token":
+            self._add_token(entry["jti"], entry["expires_at"].timestamp())
+        elif entry.get("kind") == "user":
+            self._add_user(entry["user_id"], entry["not_before"].timestamp())
+
+    def _on_snapshot(self, documents: Any, changes: Any, read_time: Any) -> None:
+        for change in changes:
+            if change.type.name in ("ADDED", "MODIFIED"):
+                self.apply(change.document.to_dict() or {})
+        with self._lock:
+            self._rebuild(time.time())
+        self._loaded.set()
+
+    def start(self, db: FirestoreClient, timeout: float = INITIAL_LOAD_TIMEOUT) -> None:
+        """Load the current revocations and follow new ones.
+
+        Raises ``RuntimeError`` if the revocations are not loaded within
+        ``timeout`` seconds, rather than serving with an incomplete list.
+        """
+        query = db.collection(COLLECTION).where(
+            filter=FieldFilter("expires_at", ">", datetime.now(timezone.utc))
+        )
+        self._watch = query.on_snapshot(self._on_snapshot)
+        if not self._loaded.wait(timeout):
+            self.stop()
+            raise RuntimeError(f"Revocation list not loaded within {timeout} seconds")
+
+    def stop(self) -> None:
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+        self._loaded.clear()
+
+
+revocations = RevocationList()
+memory.register_cache("revocation.entries", lambda: len(revocations))
@@ -1,3 +1,6 @@
+import hashlib
+import secrets
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
@@ -12,16 +15,65 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 ALGORITHM = "HS256"
 
 
-def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
-    expire = datetime.now(timezone.utc) + expires_delta
-    to_encode = {"exp": expire, "sub": str(subject)}
+def create_access_token(
+    subject: str | Any,
+    expires_delta: timedelta,
+    claims: dict[str, Any] | None = None,
+) -> str:
+    """Create an access token; ``claims`` are added to the payload.
+
+    ``iat`` keeps sub-second precision so revoking a user's tokens does not
+    also revoke a token issued right after it.
+    """
+    now = datetime.now(timezone.utc)
+    to_encode = {
+        **(claims or {}),
+        "exp": now + expires_delta,
+        "iat": now.timestamp(),
+        "jti": uuid.uuid4().hex,
+        "sub": str(subject),
+    }
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def user_claims(user: Any) -> dict[str, Any]:
+    """Claims that let requests be authenticated without reading the user."""
+    return {
+        "email": user.email,
+        "superuser": user.is_superuser,
+        "name": user.full_name,
+    }
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+def hash_token_secret(secret: str) -> bytes:
+    # Refresh token secrets are random, so a fast hash is enough (unlike
+    # passwords, there is nothing to brute-force)
+    return hashlib.sha256(secret.encode()).digest()
+
+
+def create_refresh_token() -> tuple[str, str, bytes]:
+    """Return ``(token_id, token, secret_hash)`` for a new opaque refresh token.
+
+    The token is ``<token_id>.<secret>``; only the secret's hash is stored,
+    under the token ID.
+    """
+    token_id = uuid.uuid4().hex
+    secret = secrets.token_urlsafe(32)
+    return token_id, f"{token_id}.{secret}", hash_token_secret(secret)
+
+
+def split_refresh_token(token: str) -> tuple[str, bytes] | None:
+    """Return ``(token_id, secret_hash)`` of a refresh token, if well formed."""
+    token_id, _, secret = token.partition(".")
+    if not token_id or not secret:
+        return None
+    return token_id, hash_token_secret(secret)
@@ -0,0 +1,60 @@
+import asyncio
+import logging
+import math
+import time
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class StaleWhileRevalidateCache(Generic[T]):
+    """One computed value, served stale while a fresh one is computed.
+
+    A value younger than ``fresh_seconds`` is served as is. For
+    ``stale_seconds`` longer it is still served, but the first request to
+    see it stale starts a reload in the background. Older values, or no
+    value at all, make requests wait for the reload. Concurrent requests
+    share a single reload.
+    """
+
+    def __init__(self, fresh_seconds: float, stale_seconds: float) -> None:
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self._value: T | None = None
+        self._loaded_at = -math.inf
+        self._reload: asyncio.Task[T] | None = None
+
+    async def get(self, load: Callable[[], Awaitable[T]]) -> T:
+        age = time.monotonic() - self._loaded_at
+        if self._value is not None and age < self.fresh_seconds:
+            return self._value
+        if self._reload is None:
+            self._reload = asyncio.create_task(self._load(load))
+            self._reload.add_done_callback(self._log_failure)
+        if self._value is not None and age < self.fresh_seconds + self.stale_seconds:
+            return self._value
+        # Shielded, so a client disconnecting does not cancel the shared reload
+        return await asyncio.shield(self._reload)
+
+    def __len__(self) -> int:
+        return 0 if self._value is None else 1
+
+    def clear(self) -> None:
+        self._value = None
+        self._loaded_at = -math.inf
+
+    async def _load(self, load: Callable[[], Awaitable[T]]) -> T:
+        try:
+            value = await load()
+            self._value, self._loaded_at = value, time.monotonic()
+            return value
+        finally:
+            self._reload = None
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task[T]) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Reloading a cached value failed", exc_info=task.exception())
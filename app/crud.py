@@ -1,24 +1,88 @@
+import secrets
+from datetime import datetime, timedelta, timezone
 from typing import Any
+from urllib.parse import quote
 
+from google.cloud import firestore
+from google.cloud.firestore import FieldFilter
+
+from app.core import security
+from app.core.api_keys import revoke_api_key
+from app.core.config import settings
+from app.core.database import (
+    Write,
+    apply_write,
+    commit_in_batches,
+    document_to_dict,
+)
+from app.core.document_cache import document_cache
+from app.core.revocation import revocations
 from app.core.security import get_password_hash, verify_password
-from app.models import Item, ItemCreate, ItemUpdate, User, UserCreate, UserUpdate
+from app.models import (
+    AuthenticatedUser,
+    Item,
+    ItemCreate,
+    ItemUpdate,
+    User,
+    UserCreate,
+    UserUpdate,
+)
+
+
+class EmailAlreadyRegisteredError(Exception):
+    """Another user is already registered with the email."""
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+def user_email_ref(db: Any, email: str) -> Any:
+    """The ``user_emails`` entry of an email, holding the ID of its user.
+
+    Entries are keyed by the normalized email, so looking a user up by email
+    is a direct get, and creating an entry with ``create`` fails if the
+    email is taken, which makes emails unique across concurrent requests.
+    """
+    return db.collection("user_emails").document(
+        quote(normalize_email(email), safe="@+")
+    )
+
+
+def user_email_write(db: Any, email: str, user_id: str) -> Write:
+    return ("create", user_email_ref(db, email), {"user_id": user_id})
 
 
 async def create_user(db: Any, user_create: UserCreate) -> User:
-    """Create new user."""
+    """Create new user.
+
+    Raises ``EmailAlreadyRegisteredError`` if the email is taken.
+    """
     user_dict = user_create.model_dump(exclude={"password"})
     user_dict["hashed_password"] = get_password_hash(user_create.password)
+    user_ref = db.collection("users").document()
+    email_write = user_email_write(db, user_create.email, user_ref.id)
 
-    result = await db.users.insert_one(user_dict)
-    user_dict["_id"] = result.inserted_id
+    @firestore.transactional
+    def create(transaction: firestore.Transaction) -> None:
+        if email_write[1].get(transaction=transaction).exists:
+            raise EmailAlreadyRegisteredError(user_create.email)
+        apply_write(transaction, email_write)
+        transaction.create(user_ref, user_dict)
 
-    return User(**user_dict)
+    create(db.transaction())
+    return User(**user_dict, _id=user_ref.id)
 
 
 async def update_user(
     db: Any, user_id: str, user_in: UserUpdate
 ) -> User | None:
-    """Update user."""
+    """Update user.
+
+    Returns the updated user, merged from the transaction's read, and
+    revokes the user's tokens if the update invalidates them. Raises
+    ``EmailAlreadyRegisteredError`` if changing to a taken email.
+    """
     update_data = user_in.model_dump(exclude_unset=True, exclude={"password"})
 
     if user_in.password:
@@ -26,26 +90,73 @@ async def update_user(
 
     if update_data:
         update_data["updated_at"] = user_in.updated_at
-        await db.users.update_one(
-            {"_id": user_id}, {"$set": update_data}
+    user_ref = db.collection("users").document(user_id)
+
+    @firestore.transactional
+    def update(transaction: firestore.Transaction) -> tuple[User, bool] | None:
+        snapshot = user_ref.get(transaction=transaction)
+        if not snapshot.exists:
+            return None
+        user_dict = snapshot.to_dict()
+        # Tokens carry the user's privileges and are trusted without a
+        # database read, so changing them must invalidate issued tokens
+        revoke = (
+            update_data.get("is_active") is False
+            or "hashed_password" in update_data
+            or (
+                "is_superuser" in update_data
+                and update_data["is_superuser"] != bool(user_dict.get("is_superuser"))
+            )
         )
+        email = update_data.get("email")
+        if email and normalize_email(email) != normalize_email(user_dict["email"]):
+            email_write = user_email_write(db, email, user_id)
+            if email_write[1].get(transaction=transaction).exists:
+                raise EmailAlreadyRegisteredError(email)
+            apply_write(transaction, email_write)
+            transaction.delete(user_email_ref(db, user_dict["email"]))
+        if update_data:
+            transaction.update(user_ref, update_data)
+        return User(**{**user_dict, **update_data}, _id=user_id), revoke
 
-    return await get_user_by_id(db, user_id)
+    updated = update(db.transaction())
+    if updated is None:
+        return None
+    user, revoke = updated
+    if revoke:
+        revoke_user_tokens(db, user_id)
+    return user
+
+
+def delete_user(db: Any, user_id: str) -> bool:
+    """Delete a user and its email entry; return whether the user existed."""
+    user_ref = db.collection("users").document(user_id)
+
+    @firestore.transactional
+    def delete(transaction: firestore.Transaction) -> bool:
+        snapshot = user_ref.get(transaction=transaction)
+        if not snapshot.exists:
+            return False
+        transaction.delete(user_email_ref(db, snapshot.get("email")))
+        transaction.delete(user_ref)
+        return True
+
+    return delete(db.transaction())
 
 
 async def get_user_by_email(db: Any, email: str) -> User | None:
     """Get user by email."""
-    user_dict = await db.users.find_one({"email": email})
-    if user_dict:
-        return User(**user_dict)
-    return None
+    entry = user_email_ref(db, email).get()
+    if not entry.exists:
+        return None
+    return await get_user_by_id(db, entry.get("user_id"))
 
 
 async def get_user_by_id(db: Any, user_id: str) -> User | None:
     """Get user by ID."""
-    user_dict = await db.users.find_one({"_id": user_id})
-    if user_dict:
-        return User(**user_dict)
+    snapshot = db.collection("users").document(user_id).get()
+    if snapshot.exists:
+        return User(**snapshot.to_dict(), _id=snapshot.id)
     return None
 
 
@@ -57,3 +168,225 @@ async def authenticate(db: Any, email: str, password: str) -> User | None:
     if not verify_password(password, user.hashed_password):
         return None
     return user
+
+
+def get_documents(db: Any, collection: str, ids: list[str]) -> list[dict[str, Any]]:
+    """Documents by ID, in the order asked for; missing ones are left out.
+
+    Documents in the cache are served from it, and the rest are read with
+    one ``get_all`` and cached.
+    """
+    found: dict[str, dict[str, Any]] = {}
+    misses = []
+    for doc_id in dict.fromkeys(ids):
+        cached = document_cache.get(collection, doc_id)
+        if cached is None:
+            misses.append(db.collection(collection).document(doc_id))
+        else:
+            found[doc_id] = cached
+    if misses:
+        for snapshot in db.get_all(misses):
+            if snapshot.exists:
+                found[snapshot.id] = document_to_dict(snapshot)
+                document_cache.put(collection, snapshot.id, found[snapshot.id])
+    return [found[doc_id] for doc_id in dict.fromkeys(ids) if doc_id in found]
+
+
+def update_document(
+    db: Any,
+    reference: Any,
+    current: dict[str, Any],
+    changes: dict[str, Any],
+    writes: list[Write] | None = None,
+) -> dict[str, Any]:
+    """Apply changes to a document already read as ``current``.
+
+    Returns the updated document, merged from ``current`` and ``changes``
+    instead of read back, so an update costs the caller's read and one
+    write; ``writes`` that go with the update are committed in the same
+    batch.
+    """
+    pending = list(writes or [])
+    if changes:
+        pending.insert(0, ("update", reference, changes))
+    commit_in_batches(db, pending)
+    document_cache.evict(reference.parent.id, reference.id)
+    return {**current, **changes}
+
+
+def apply_adjustment(
+    previous_quantity: float, adjustment_type: str, quantity: float
+) -> float:
+    """Return the stock quantity that results from an adjustment."""
+    if adjustment_type == "add":
+        return previous_quantity + quantity
+    if adjustment_type == "remove":
+        return previous_quantity - quantity
+    return quantity  # set
+
+
+def is_low_stock(quantity: float, reorder_point: float | None) -> bool:
+    """Whether stock is at or below its reorder point."""
+    return reorder_point is not None and quantity <= reorder_point
+
+
+def low_stock_ref(db: Any, kind: str, ref_id: str) -> Any:
+    """Reference to the ``low_stock`` entry of an item or product."""
+    return db.collection("low_stock").document(f"{kind}-{ref_id}")
+
+
+def low_stock_write(
+    db: Any,
+    *,
+    kind: str,
+    ref_id: str,
+    name: str | None,
+    was_low: bool,
+    quantity: float,
+    reorder_point: float | None,
+) -> Write | None:
+    """Return the write that keeps the ``low_stock`` set in sync, if any.
+
+    Stock that stays above its reorder point costs no write; only threshold
+    crossings and changes to stock that is already low touch the set.
+    """
+    reference = low_stock_ref(db, kind, ref_id)
+    if is_low_stock(quantity, reorder_point):
+        return (
+            "set",
+            reference,
+            {
+                "kind": kind,
+                "ref_id": ref_id,
+                "name": name,
+                "stock_quantity": quantity,
+                "reorder_point": reorder_point,
+                "updated_at": datetime.now(timezone.utc),
+            },
+        )
+    if was_low:
+        return ("delete", reference, None)
+    return None
+
+
+def refresh_token_write(
+    db: Any, user_id: str, family_id: str | None = None
+) -> tuple[Write, str]:
+    """Return the write storing a new refresh token, and the token itself.
+
+    Tokens issued by rotating one another share a ``family_id``, so a
+    replayed token can revoke every token of the login session it came from.
+    Expired entries are meant to be removed by a Firestore TTL policy on
+    ``expires_at``.
+    """
+    token_id, token, secret_hash = security.create_refresh_token()
+    now = datetime.now(timezone.utc)
+    write: Write = (
+        "set",
+        db.collection("refresh_tokens").document(token_id),
+        {
+            "user_id": user_id,
+            "family_id": family_id or token_id,
+            "secret_hash": secret_hash,
+            "expires_at": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            "rotated_at": None,
+        },
+    )
+    return write, token
+
+
+def create_refresh_token(db: Any, user_id: str) -> str:
+    """Start a new refresh token family for a password login."""
+    (_, reference, data), token = refresh_token_write(db, user_id)
+    reference.set(data)
+    return token
+
+
+def rotate_refresh_token(
+    db: Any, token: str
+) -> tuple[AuthenticatedUser, str] | None:
+    """Exchange a refresh token for a new one, returning ``(user, token)``.
+
+    Each token can be exchanged once. Presenting an already rotated token
+    means it leaked (or a client replayed it), so its whole family is
+    revoked and the session has to log in again.
+    """
+    parsed = security.split_refresh_token(token)
+    if parsed is None:
+        return None
+    token_id, secret_hash = parsed
+    tokens = db.collection("refresh_tokens")
+    reference = tokens.document(token_id)
+
+    @firestore.transactional
+    def rotate(
+        transaction: firestore.Transaction,
+    ) -> tuple[AuthenticatedUser, str] | None:
+        snapshot = reference.get(transaction=transaction)
+        if not snapshot.exists:
+            return None
+        stored = snapshot.to_dict()
+        if not secrets.compare_digest(stored["secret_hash"], secret_hash):
+            return None
+        now = datetime.now(timezone.utc)
+        if stored["expires_at"] <= now:
+            return None
+
+        if stored.get("rotated_at") is not None:
+            family = tokens.where(
+                filter=FieldFilter("family_id", "==", stored["family_id"])
+            )
+            for member in transaction.get(family):
+                transaction.delete(member.reference)
+            return None
+
+        user = db.collection("users").document(stored["user_id"]).get(
+            transaction=transaction
+        )
+        if not user.exists or not user.get("is_active"):
+            return None
+
+        write, new_token = refresh_token_write(
+            db, stored["user_id"], stored["family_id"]
+        )
+        transaction.update(reference, {"rotated_at": now})
+        apply_write(transaction, write)
+        return AuthenticatedUser(**user.to_dict(), _id=user.id), new_token
+
+    return rotate(db.transaction())
+
+
+def revoke_refresh_token_family(db: Any, token: str) -> None:
+    """Revoke a refresh token and every token rotated from the same login."""
+    parsed = security.split_refresh_token(token)
+    if parsed is None:
+        return
+    tokens = db.collection("refresh_tokens")
+    snapshot = tokens.document(parsed[0]).get()
+    if not snapshot.exists or not secrets.compare_digest(
+        snapshot.get("secret_hash"), parsed[1]
+    ):
+        return
+    family = tokens.where(
+        filter=FieldFilter("family_id", "==", snapshot.get("family_id"))
+    )
+    commit_in_batches(
+        db, (("delete", member.reference, None) for member in family.stream())
+    )
+
+
+def revoke_user_tokens(db: Any, user_id: str) -> None:
+    """Revoke every access and refresh token and API key issued to a user so far."""
+    revocations.revoke_user(db, user_id)
+    # Keys outlive any "not before" time, so they are deleted outright
+    api_keys = db.collection("api_keys").where(
+        filter=FieldFilter("user_id", "==", user_id)
+    )
+    for key in api_keys.select([]).stream():
+        revoke_api_key(db, key.id)
+    refresh_tokens = db.collection("refresh_tokens").where(
+        filter=FieldFilter("user_id", "==", user_id)
+    )
+    commit_in_batches(
+        db, (("delete", token.reference, None) for token in refresh_tokens.stream())
+    )
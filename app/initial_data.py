@@ -1,21 +1,81 @@
-import asyncio
 import logging
+from datetime import datetime, timezone
 
-from app.core.db import close_mongo_connection, connect_to_mongo, init_db
+from google.cloud.firestore import Client as FirestoreClient
+
+from app.core.config import settings
+from app.core.database import (
+    Write,
+    close_firestore_connection,
+    commit_in_batches,
+    connect_to_firestore,
+    get_database,
+)
+from app.core.security import get_password_hash
+from app.crud import user_email_ref, user_email_write
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def init() -> None:
-    await connect_to_mongo()
-    await init_db()
-    await close_mongo_connection()
+def index_user_emails(db: FirestoreClient) -> int:
+    """Add the ``user_emails`` entries missing for existing users.
+
+    Returns the number of entries added. Users sharing an email (possible
+    before emails were indexed) keep the entry of the first one seen.
+    """
+    indexed = {entry.id for entry in db.collection("user_emails").list_documents()}
+    pending: set[str] = set()
+    writes: list[Write] = []
+    for user in db.collection("users").select(["email"]).stream():
+        write = user_email_write(db, user.get("email"), user.id)
+        entry_id = write[1].id
+        if entry_id in pending:
+            logger.warning(f"User {user.id} shares its email with another user")
+        elif entry_id not in indexed:
+            pending.add(entry_id)
+            writes.append(write)
+    commit_in_batches(db, writes)
+    return len(writes)
+
+
+def init() -> None:
+    connect_to_firestore()
+    db = get_database()
+    added = index_user_emails(db)
+    if added:
+        logger.info(f"Indexed the emails of {added} users")
+
+    if not user_email_ref(db, settings.FIRST_SUPERUSER).get().exists:
+        now = datetime.now(timezone.utc)
+        user_ref = db.collection("users").document()
+        commit_in_batches(
+            db,
+            [
+                (
+                    "set",
+                    user_ref,
+                    {
+                        "email": settings.FIRST_SUPERUSER,
+                        "hashed_password": get_password_hash(
+                            settings.FIRST_SUPERUSER_PASSWORD
+                        ),
+                        "full_name": None,
+                        "is_active": True,
+                        "is_superuser": True,
+                        "created_at": now,
+                        "updated_at": now,
+                    },
+                ),
+                user_email_write(db, settings.FIRST_SUPERUSER, user_ref.id),
+            ],
+        )
+    close_firestore_connection()
 
 
 def main() -> None:
     logger.info("Creating initial data")
-    asyncio.run(init())
+    init()
     logger.info("Initial data created")
 
 
@@ -2,13 +2,21 @@ import logging
 from contextlib import asynccontextmanager
 
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
+from app.api.deps import verify_metrics_reader
 from app.api.main import api_router
 from app.core.config import settings
-from app.core.database import close_firestore_connection, connect_to_firestore, create_indexes
+from app.core import latency, metrics
+from app.core.database import close_firestore_connection, connect_to_firestore, create_indexes, get_database
+from app.core.email_outbox import outbox
+from app.core.jobs import cascade_deletes
+from app.core.loop_monitor import monitor as loop_monitor
+from app.core.profiler import ProfilingMiddleware
+from app.core.revocation import revocations
 
 logger = logging.getLogger(__name__)
 
@@ -26,14 +34,24 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
     logger.info("Starting application...")
+    metrics.instrument_firestore()
+    latency.instrument_serialization()
     connect_to_firestore()
     await create_indexes()
+    revocations.start(get_database())
+    loop_monitor.start(capture_stacks=settings.ENVIRONMENT == "local")
+    outbox.start()
+    cascade_deletes.start(get_database())
     logger.info("Application started successfully")
 
     yield
 
     # Shutdown
     logger.info("Shutting down application...")
+    await cascade_deletes.stop()
+    await outbox.stop()
+    await loop_monitor.stop()
+    revocations.stop()
     close_firestore_connection()
     logger.info("Application shutdown complete")
 
@@ -55,4 +73,25 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
-app.include_router(api_router, prefix=settings.API_V1_STR)
\ No newline at end of file
+# LatencyMiddleware runs inside FirestoreMetricsMiddleware (middleware added
+# last runs first) so slow-request records can see the Firestore operations
+app.add_middleware(latency.LatencyMiddleware)
+app.add_middleware(metrics.FirestoreMetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
+
+app.include_router(api_router, prefix=settings.API_V1_STR)
+
+
+@app.get(
+    "/metrics",
+    tags=["metrics"],
+    include_in_schema=False,
+    dependencies=[Depends(verify_metrics_reader)],
+)
+async def read_metrics() -> PlainTextResponse:
+    """Firestore operation counts, latency and event-loop lag, in Prometheus format."""
+    return PlainTextResponse(
+        metrics.render_prometheus()
+        + latency.render_prometheus()
+        + loop_monitor.render_prometheus()
+    )
\ No newline at end of file
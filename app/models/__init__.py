@@ -1,19 +1,46 @@
-from .auth import NewPassword, Token, TokenPayload
+from .api_key import (
+    ApiKeyCreate,
+    ApiKeyCreated,
+    ApiKeyPublic,
+    ApiKeyScope,
+    ApiKeysPublic,
+)
+from .batch import BatchRead
+from .auth import NewPassword, RefreshTokenRequest, Token, TokenPayload
+from .dashboard import DashboardPublic
 from .item import Item, ItemBase, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate
+from .diagnostics import (
+    AllocationSite,
+    BlockingCall,
+    EventLoopReport,
+    LatencyReport,
+    MemoryDiffPublic,
+    MemoryReport,
+    MemorySnapshotPublic,
+    RouteLatency,
+    SlowRequest,
+)
+from .job import CascadeStep, JobPublic, JobStatus
 from .msg import Message
 from .inventory import (
     InventoryAdjustment,
     InventoryAdjustmentBase,
     InventoryAdjustmentCreate,
     InventoryAdjustmentPublic,
+    InventoryAdjustmentsBulkCreate,
     InventoryAdjustmentsPublic,
+    InventoryStockPublic,
+    LowStockAlertPublic,
+    LowStockAlertsPublic,
 )
 from .sale import (
+    PaymentMethod,
     Sale,
     SaleCreate,
     SaleItem,
     SalePublic,
     SalesPublic,
+    SaleStatus,
 )
 from .product import (
     Product,
@@ -24,6 +51,7 @@ from .product import (
     ProductUpdate,
 )
 from .recipe import (
+    ProductionPublic,
     Recipe,
     RecipeBase,
     RecipeCreate,
@@ -33,6 +61,7 @@ from .recipe import (
     RecipeUpdate,
 )
 from .user import (
+    AuthenticatedUser,
     UpdatePassword,
     User,
     UserBase,
@@ -45,14 +74,33 @@ from .user import (
 )
 
 __all__ = [
+    "AllocationSite",
+    "ApiKeyCreate",
+    "ApiKeyCreated",
+    "ApiKeyPublic",
+    "ApiKeyScope",
+    "ApiKeysPublic",
+    "AuthenticatedUser",
+    "BatchRead",
+    "BlockingCall",
+    "DashboardPublic",
+    "EventLoopReport",
     "Item",
     "ItemBase",
     "ItemCreate",
     "ItemPublic",
     "ItemUpdate",
     "ItemsPublic",
+    "CascadeStep",
+    "JobPublic",
+    "JobStatus",
+    "LatencyReport",
+    "MemoryDiffPublic",
+    "MemoryReport",
+    "MemorySnapshotPublic",
     "Message",
     "NewPassword",
+    "RefreshTokenRequest",
     "Token",
     "TokenPayload",
     "UpdatePassword",
@@ -68,11 +116,17 @@ __all__ = [
     "InventoryAdjustmentBase",
     "InventoryAdjustmentCreate",
     "InventoryAdjustmentPublic",
+    "InventoryAdjustmentsBulkCreate",
     "InventoryAdjustmentsPublic",
+    "InventoryStockPublic",
+    "LowStockAlertPublic",
+    "LowStockAlertsPublic",
+    "PaymentMethod",
     "Sale",
     "SaleCreate",
     "SaleItem",
     "SalePublic",
+    "SaleStatus",
     "SalesPublic",
     "Product",
     "ProductBase",
@@ -80,6 +134,7 @@ __all__ = [
     "ProductPublic",
     "ProductsPublic",
     "ProductUpdate",
+    "ProductionPublic",
     "Recipe",
     "RecipeBase",
     "RecipeCreate",
@@ -87,4 +142,6 @@ __all__ = [
     "RecipePublic",
     "RecipesPublic",
     "RecipeUpdate",
+    "RouteLatency",
+    "SlowRequest",
 ]
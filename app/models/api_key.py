@@ -0,0 +1,31 @@
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field
+
+from .base import TimestampModel
+
+ApiKeyScope = Literal["sales", "products"]
+
+
+class ApiKeyCreate(BaseModel):
+    name: str = Field(min_length=1, max_length=255)
+    scopes: list[ApiKeyScope] = Field(min_length=1)
+    # User the device acts on behalf of; defaults to the creator
+    user_id: str | None = None
+
+
+class ApiKeyPublic(TimestampModel):
+    id: Annotated[str, Field(alias="_id")]
+    name: str
+    scopes: list[ApiKeyScope]
+    user_id: str
+
+
+class ApiKeyCreated(ApiKeyPublic):
+    # Only returned once, at creation
+    key: str
+
+
+class ApiKeysPublic(BaseModel):
+    data: list[ApiKeyPublic]
+    count: int
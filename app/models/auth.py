@@ -4,10 +4,21 @@ from pydantic import BaseModel
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: str | None = None
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 
 class TokenPayload(BaseModel):
     sub: str | None = None
+    jti: str | None = None
+    iat: float | None = None
+    exp: float | None = None
+    email: str | None = None
+    superuser: bool = False
+    name: str | None = None
 
 
 class NewPassword(BaseModel):
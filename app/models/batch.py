@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+# Most documents one batch read resolves
+MAX_BATCH_IDS = 100
+
+
+class BatchRead(BaseModel):
+    ids: list[str] = Field(min_length=1, max_length=MAX_BATCH_IDS)
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from .inventory import InventoryAdjustmentPublic
+from .product import ProductPublic
+from .sale import SalePublic
+from .user import UserPublic
+
+
+class DashboardPublic(BaseModel):
+    user: UserPublic
+    recent_sales: list[SalePublic]
+    sales_count: int
+    products: list[ProductPublic]
+    products_count: int
+    recent_adjustments: list[InventoryAdjustmentPublic]
+    # When the shared part (everything but the user) was read
+    generated_at: datetime
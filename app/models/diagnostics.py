@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+# --- Diagnostics Models ---
+
+
+class RouteLatency(BaseModel):
+    route: str
+    count: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+class SlowRequest(BaseModel):
+    at: datetime
+    method: str
+    path: str
+    route: str
+    status_code: int
+    user_id: str | None = None
+    total_ms: float
+    # auth_ms includes the user read, which is also counted in db_ms
+    auth_ms: float
+    db_ms: float
+    serialization_ms: float
+    firestore_calls: int
+    firestore_reads: int
+    firestore_writes: int
+    firestore_deletes: int
+
+
+class LatencyReport(BaseModel):
+    routes: list[RouteLatency]
+    slow_requests: list[SlowRequest]
+
+
+class BlockingCall(BaseModel):
+    at: datetime
+    blocked_ms: float
+    stack: str
+
+
+class EventLoopReport(BaseModel):
+    samples: int
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+    blocked_total: int
+    blocks: list[BlockingCall]
+
+
+class AllocationSite(BaseModel):
+    location: str
+    size_bytes: int
+    count: int
+    size_diff_bytes: int | None = None
+    count_diff: int | None = None
+
+
+class MemorySnapshotPublic(BaseModel):
+    id: str
+    taken_at: datetime
+    traced_bytes: int
+    top: list[AllocationSite]
+
+
+class MemoryDiffPublic(BaseModel):
+    old_id: str
+    new_id: str
+    top: list[AllocationSite]
+
+
+class MemoryReport(BaseModel):
+    rss_bytes: int | None = None
+    tracing: bool
+    snapshots: list[str]
+    caches: dict[str, int]
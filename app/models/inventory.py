@@ -1,5 +1,6 @@
+from datetime import datetime
 from typing import Annotated, List, Literal
-from pydantic import Field
+from pydantic import BaseModel, Field
 from .base import TimestampModel
 
 # --- Inventory Models ---
@@ -14,6 +15,11 @@ class InventoryAdjustmentBase(TimestampModel):
 class InventoryAdjustmentCreate(InventoryAdjustmentBase):
     pass
 
+class InventoryAdjustmentsBulkCreate(BaseModel):
+    # Applied in one commit of at most 500 writes: a ledger entry per
+    # adjustment, plus a stock update and a low-stock entry per item
+    adjustments: list[InventoryAdjustmentCreate] = Field(min_length=1, max_length=166)
+
 class InventoryAdjustmentPublic(InventoryAdjustmentBase):
     id: Annotated[str, Field(alias="_id")]
     user_id: str
@@ -24,6 +30,25 @@ class InventoryAdjustmentsPublic(TimestampModel):
     data: list[InventoryAdjustmentPublic]
     count: int
 
+class InventoryStockPublic(BaseModel):
+    item_id: str
+    at: datetime
+    quantity: float
+    adjustment_id: str | None = None
+
+class LowStockAlertPublic(BaseModel):
+    id: Annotated[str, Field(alias="_id")]
+    kind: Literal["item", "product"]
+    ref_id: str
+    name: str | None = None
+    stock_quantity: float
+    reorder_point: float
+    updated_at: datetime
+
+class LowStockAlertsPublic(BaseModel):
+    data: list[LowStockAlertPublic]
+    count: int
+
 class InventoryAdjustment(InventoryAdjustmentBase):
     user_id: str
     previous_quantity: float
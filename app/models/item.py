@@ -10,6 +10,7 @@ if TYPE_CHECKING:
 class ItemBase(TimestampModel):
     title: str = Field(min_length=1, max_length=255)
     description: str | None = Field(default=None, max_length=255)
+    reorder_point: float | None = Field(default=None, ge=0)
 
 
 # Properties to receive on item creation
@@ -22,6 +23,7 @@ class ItemCreate(ItemBase):
 class ItemUpdate(TimestampModel):
     title: str | None = Field(default=None, min_length=1, max_length=255)  # type: ignore
     description: str | None = Field(default=None, max_length=255)
+    reorder_point: float | None = Field(default=None, ge=0)
 
 
 # Properties to return via API, id is always required
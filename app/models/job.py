@@ -0,0 +1,25 @@
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field
+
+from .base import TimestampModel
+
+JobStatus = Literal["running", "completed", "failed"]
+
+
+class CascadeStep(BaseModel):
+    """Delete every document of ``collection`` whose ``field`` equals ``value``."""
+
+    collection: str
+    field: str
+    value: str
+
+
+class JobPublic(TimestampModel):
+    id: Annotated[str, Field(alias="_id")]
+    kind: str
+    status: JobStatus
+    steps: list[CascadeStep]
+    # Documents deleted so far, by collection
+    deleted: dict[str, int] = Field(default_factory=dict)
+    error: str | None = None
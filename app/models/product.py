@@ -11,6 +11,7 @@ class ProductBase(TimestampModel):
     price: float = Field(gt=0)
     cost: float | None = Field(default=None, ge=0)
     stock_quantity: int = Field(ge=0, default=0)
+    reorder_point: float | None = Field(default=None, ge=0)
     unit: str = Field(max_length=50, default="unit")
     is_active: bool = True
 
@@ -24,6 +25,7 @@ class ProductUpdate(TimestampModel):
     price: float | None = Field(default=None, gt=0)
     cost: float | None = Field(default=None, ge=0)
     stock_quantity: int | None = Field(default=None, ge=0)
+    reorder_point: float | None = Field(default=None, ge=0)
     unit: str | None = Field(default=None, max_length=50)
     is_active: bool | None = None
 
@@ -3,6 +3,7 @@ import uuid
 from pydantic import BaseModel, Field
 from app.models import Product
 from .base import TimestampModel
+from .inventory import InventoryAdjustmentPublic
 
 
 # --- Recipe Models ---
@@ -54,3 +55,11 @@ class RecipesPublic(TimestampModel):
 
 class Recipe(RecipeBase):
     ingredients: list[RecipeIngredient] = Field(default_factory=list)
+
+
+class ProductionPublic(TimestampModel):
+    recipe_id: str
+    product_id: str
+    batches: int
+    produced_quantity: float
+    adjustments: list[InventoryAdjustmentPublic]
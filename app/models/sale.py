@@ -2,6 +2,9 @@ from typing import Annotated, Literal
 from pydantic import BaseModel, Field
 from .base import TimestampModel
 
+PaymentMethod = Literal["cash", "card", "transfer", "other"]
+SaleStatus = Literal["pending", "completed", "cancelled"]
+
 
 class SaleItemCreate(BaseModel):
     product_id: str
@@ -18,7 +21,7 @@ class SaleCreate(TimestampModel):
     customer_name: str | None = Field(default=None, max_length=255)
     customer_email: str | None = Field(default=None, max_length=255)
     customer_phone: str | None = Field(default=None, max_length=50)
-    payment_method: Literal["cash", "card", "transfer", "other"]
+    payment_method: PaymentMethod
     items: list[SaleItemCreate]
     notes: str | None = Field(default=None, max_length=1000)
 
@@ -50,12 +53,12 @@ class Sale(TimestampModel):
     customer_name: str | None = Field(default=None, max_length=255)
     customer_email: str | None = Field(default=None, max_length=255)
     customer_phone: str | None = Field(default=None, max_length=50)
-    payment_method: Literal["cash", "card", "transfer", "other"]
+    payment_method: PaymentMethod
     items: list[SaleItem] = Field(default_factory=list)
     subtotal: float = Field(ge=0)
     tax: float = Field(ge=0, default=0)
     discount: float = Field(ge=0, default=0)
     total: float = Field(ge=0)
-    status: Literal["pending", "completed", "cancelled"] = "completed"
+    status: SaleStatus = "completed"
     user_id: str
     notes: str | None = Field(default=None, max_length=1000)
@@ -54,4 +54,11 @@ class UsersPublic(TimestampModel):
 
 
 class User(UserBase):
+    id: Annotated[str, Field(alias="_id")]
     hashed_password: str
+
+
+class AuthenticatedUser(UserBase):
+    """The user of a request, as described by its access token."""
+
+    id: Annotated[str, Field(alias="_id")]
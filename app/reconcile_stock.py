@@ -0,0 +1,202 @@
+import argparse
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from google.cloud.firestore import Client as FirestoreClient
+
+from app import crud
+from app.core.database import (
+    close_firestore_connection,
+    commit_in_batches,
+    connect_to_firestore,
+    get_database,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Floating point noise below this is not reported as drift
+TOLERANCE = 1e-6
+
+
+@dataclass
+class StockDrift:
+    item_id: str
+    stock_quantity: float
+    expected_quantity: float
+
+
+@dataclass
+class LedgerBreak:
+    """A ledger entry that does not start where the one before it ended."""
+
+    item_id: str
+    adjustment_id: str
+    previous_quantity: float
+    expected_previous_quantity: float
+
+
+@dataclass(order=True)
+class LedgerEntry:
+    created_at: datetime
+    adjustment_id: str
+    adjustment_type: str
+    quantity: float
+    previous_quantity: float
+    new_quantity: float
+
+
+LEDGER_FIELDS = [
+    "item_id",
+    "created_at",
+    "adjustment_type",
+    "quantity",
+    "previous_quantity",
+    "new_quantity",
+]
+
+
+def _partition_entries(partition: Any) -> dict[str, list[LedgerEntry]]:
+    """Return a partition's ledger entries by item."""
+    entries: dict[str, list[LedgerEntry]] = defaultdict(list)
+    for snapshot in partition.query().select(LEDGER_FIELDS).stream():
+        entry = snapshot.to_dict()
+        entries[entry["item_id"]].append(
+            LedgerEntry(
+                entry["created_at"],
+                snapshot.id,
+                entry["adjustment_type"],
+                entry["quantity"],
+                entry.get("previous_quantity", 0),
+                entry.get("new_quantity", 0),
+            )
+        )
+    return entries
+
+
+def read_ledger(db: FirestoreClient, workers: int) -> dict[str, list[LedgerEntry]]:
+    """Read every item's ledger entries, oldest first.
+
+    The ledger is split into partitions that are streamed concurrently; an
+    item's entries may be spread over several of them.
+    """
+    partitions = db.collection_group("inventory_adjustments").get_partitions(workers)
+    ledger: dict[str, list[LedgerEntry]] = defaultdict(list)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for partial in executor.map(_partition_entries, partitions):
+            for item_id, entries in partial.items():
+                ledger[item_id].extend(entries)
+    for entries in ledger.values():
+        entries.sort()
+    return ledger
+
+
+def replay(item_id: str, entries: list[LedgerEntry]) -> tuple[float, list[LedgerBreak]]:
+    """Recompute an item's stock by applying its ledger entries in order.
+
+    Only each entry's type and quantity count, not the ``new_quantity`` the
+    request stored, so a lost or wrong write shows up as drift; stock starts
+    at 0 and a "set" entry replaces whatever came before it. Entries whose
+    ``previous_quantity`` is not the ``new_quantity`` of the one before are
+    returned as breaks.
+    """
+    quantity = 0.0
+    breaks = []
+    last_new_quantity = 0.0
+    for entry in entries:
+        if abs(entry.previous_quantity - last_new_quantity) > TOLERANCE:
+            breaks.append(
+                LedgerBreak(
+                    item_id,
+                    entry.adjustment_id,
+                    entry.previous_quantity,
+                    last_new_quantity,
+                )
+            )
+        last_new_quantity = entry.new_quantity
+        quantity = crud.apply_adjustment(
+            quantity, entry.adjustment_type, entry.quantity
+        )
+    return quantity, breaks
+
+
+def find_drift(
+    db: FirestoreClient, workers: int
+) -> tuple[list[StockDrift], list[LedgerBreak]]:
+    """Compare stored item stock with the stock replayed from the ledger."""
+    expected: dict[str, float] = {}
+    breaks: list[LedgerBreak] = []
+    for item_id, entries in read_ledger(db, workers).items():
+        expected[item_id], item_breaks = replay(item_id, entries)
+        breaks.extend(item_breaks)
+
+    drift = []
+    for snapshot in db.collection("items").select(["stock_quantity"]).stream():
+        stock_quantity = (snapshot.to_dict() or {}).get("stock_quantity", 0)
+        # Items without ledger entries have never had stock
+        expected_quantity = expected.get(snapshot.id, 0)
+        if abs(stock_quantity - expected_quantity) > TOLERANCE:
+            drift.append(StockDrift(snapshot.id, stock_quantity, expected_quantity))
+    return drift, breaks
+
+
+def repair(db: FirestoreClient, drift: list[StockDrift]) -> None:
+    """Overwrite drifted stock with the ledger value in batched writes."""
+    items = db.collection("items")
+    commit_in_batches(
+        db,
+        (
+            (
+                "update",
+                items.document(d.item_id),
+                {"stock_quantity": d.expected_quantity},
+            )
+            for d in drift
+        ),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Recompute item stock by replaying the inventory ledger. Only items "
+            "are covered: product stock has no ledger to replay."
+        )
+    )
+    parser.add_argument(
+        "--workers", type=int, default=8, help="ledger partitions read concurrently"
+    )
+    parser.add_argument(
+        "--repair", action="store_true", help="write the recomputed stock back"
+    )
+    args = parser.parse_args()
+
+    logger.info("Reconciling stock")
+    connect_to_firestore()
+    db = get_database()
+    drift, breaks = find_drift(db, args.workers)
+    for b in breaks:
+        logger.warning(
+            f"Item {b.item_id}: adjustment {b.adjustment_id} starts at "
+            f"{b.previous_quantity}, the previous one ended at "
+            f"{b.expected_previous_quantity}"
+        )
+    for d in drift:
+        logger.warning(
+            f"Item {d.item_id}: stock {d.stock_quantity}, ledger {d.expected_quantity}"
+        )
+    if drift and args.repair:
+        repair(db, drift)
+        logger.info(f"Repaired {len(drift)} items")
+    close_firestore_connection()
+    logger.info(
+        f"Stock reconciled, {len(drift)} items drifted, {len(breaks)} ledger breaks"
+    )
+
+
+if __name__ == "__main__":
+    main()
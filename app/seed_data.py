@@ -0,0 +1,486 @@
+import argparse
+import logging
+import math
+import random
+import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any
+
+from google.cloud.firestore import Client as FirestoreClient
+
+from app.core.config import settings
+from app.core.database import (
+    MAX_BATCH_WRITES,
+    Write,
+    close_firestore_connection,
+    commit_in_batches,
+    connect_to_firestore,
+    get_database,
+)
+from app.core.security import get_password_hash
+from app.crud import low_stock_write, user_email_ref
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ["Panadería", "Pastelería", "Bebidas", "Sandwiches", "Congelados"]
+UNITS = ["kg", "g", "l", "ml", "unit"]
+PAYMENT_METHODS = ["card", "cash", "transfer", "other"]
+PAYMENT_WEIGHTS = [55, 30, 10, 5]
+# Monday first; weekends are the busiest days
+WEEKDAY_WEIGHTS = [0.8, 0.8, 0.9, 1.0, 1.2, 1.6, 1.4]
+# Opening hours 08:00-21:59 with lunch and afternoon peaks
+HOUR_WEIGHTS = {
+    8: 3, 9: 5, 10: 6, 11: 8, 12: 10, 13: 10, 14: 7,
+    15: 5, 16: 6, 17: 8, 18: 9, 19: 7, 20: 4, 21: 2,
+}  # fmt: skip
+# Most tickets have a few lines, with a long tail up to 20
+LINE_COUNT_WEIGHTS = [
+    30, 25, 15, 10, 6, 4, 3, 2, 1, 1,
+    1, 0.5, 0.5, 0.3, 0.3, 0.2, 0.2, 0.1, 0.1, 0.1,
+]  # fmt: skip
+ADJUSTMENT_REASONS = {"add": "Restock", "set": "Stock count", "remove": "Production"}
+TAX_RATE = 0.1
+
+
+@dataclass
+class Volumes:
+    users: int = 5
+    products: int = 500
+    items: int = 300
+    recipes: int = 200
+    sales: int = 100_000
+    years: float = 3
+    adjustments_per_item: int = 50
+
+
+def popularity(count: int, exponent: float = 1.1) -> list[float]:
+    """Cumulative Zipf weights: a few products and ingredients dominate."""
+    cumulative = []
+    total = 0.0
+    for rank in range(1, count + 1):
+        total += 1 / rank**exponent
+        cumulative.append(total)
+    return cumulative
+
+
+def cashier_email(n: int) -> str:
+    return f"cashier{n}@example.com"
+
+
+def generate_users(
+    db: FirestoreClient, volumes: Volumes, now: datetime, password: str
+) -> tuple[list[str], list[Write]]:
+    # One hash for every cashier; bcrypt is deliberately slow
+    hashed_password = get_password_hash(password)
+    users = db.collection("users")
+    ids = [f"seed-user-{n:03d}" for n in range(volumes.users)]
+    writes: list[Write] = [
+        (
+            "set",
+            users.document(user_id),
+            {
+                "email": cashier_email(n),
+                "hashed_password": hashed_password,
+                "full_name": f"Cashier {n}",
+                "is_active": True,
+                "is_superuser": False,
+                "created_at": now,
+                "updated_at": now,
+            },
+        )
+        for n, user_id in enumerate(ids)
+    ]
+    writes += [
+        ("set", user_email_ref(db, cashier_email(n)), {"user_id": user_id})
+        for n, user_id in enumerate(ids)
+    ]
+    return ids, writes
+
+
+def _low_stock_write(
+    db: FirestoreClient,
+    kind: str,
+    ref_id: str,
+    name: str,
+    quantity: float,
+    reorder_point: float | None,
+) -> Write | None:
+    # A previous seed may have left the document low, so clear stale entries too
+    return low_stock_write(
+        db,
+        kind=kind,
+        ref_id=ref_id,
+        name=name,
+        was_low=True,
+        quantity=quantity,
+        reorder_point=reorder_point,
+    )
+
+
+def generate_products(
+    db: FirestoreClient, rng: random.Random, volumes: Volumes, now: datetime
+) -> tuple[dict[str, float], list[Write]]:
+    products = db.collection("products")
+    prices = {}
+    writes: list[Write] = []
+    for n in range(volumes.products):
+        product_id = f"seed-product-{n:06d}"
+        # Log-normal prices: mostly cheap items, a few expensive cakes
+        price = round(rng.lognormvariate(math.log(8), 0.6), 2)
+        prices[product_id] = price
+        stock_quantity = rng.randint(0, 500)
+        reorder_point = rng.choice([None, 10, 20, 50])
+        writes.append(
+            (
+                "set",
+                products.document(product_id),
+                {
+                    "name": f"Product {n}",
+                    "description": None,
+                    "category": rng.choice(CATEGORIES),
+                    "price": price,
+                    "cost": round(price * rng.uniform(0.3, 0.6), 2),
+                    "stock_quantity": stock_quantity,
+                    "reorder_point": reorder_point,
+                    "unit": "unit",
+                    "is_active": rng.random() > 0.05,
+                    "created_at": now,
+                    "updated_at": now,
+                },
+            )
+        )
+        low_stock = _low_stock_write(
+            db, "product", product_id, f"Product {n}", stock_quantity, reorder_point
+        )
+        if low_stock:
+            writes.append(low_stock)
+    return prices, writes
+
+
+def generate_recipes(
+    db: FirestoreClient,
+    rng: random.Random,
+    volumes: Volumes,
+    now: datetime,
+    product_ids: list[str],
+    item_ids: list[str],
+) -> Iterator[Write]:
+    """Recipes for the first products, sharing popular ingredients."""
+    recipes = db.collection("recipes")
+    weights = popularity(len(item_ids))
+    for n, product_id in enumerate(product_ids[: volumes.recipes]):
+        ingredients: dict[str, dict[str, Any]] = {}
+        wanted = min(rng.randint(2, 8), len(item_ids))
+        while len(ingredients) < wanted:
+            (item_id,) = rng.choices(item_ids, cum_weights=weights)
+            ingredients[item_id] = {
+                "item_id": item_id,
+                "quantity": round(rng.uniform(0.05, 2), 3),
+                "unit": rng.choice(UNITS),
+            }
+        yield (
+            "set",
+            recipes.document(f"seed-recipe-{n:06d}"),
+            {
+                "name": f"Recipe {n}",
+                "description": None,
+                "product_id": product_id,
+                "yield_quantity": float(rng.choice([1, 6, 12, 24])),
+                "yield_unit": "unit",
+                "instructions": None,
+                "is_active": True,
+                "ingredients": list(ingredients.values()),
+                "created_at": now,
+                "updated_at": now,
+            },
+        )
+
+
+def generate_inventory(
+    db: FirestoreClient,
+    rng: random.Random,
+    volumes: Volumes,
+    start: datetime,
+    end: datetime,
+    user_ids: list[str],
+) -> Iterator[Write]:
+    """Items with a consistent adjustment ledger.
+
+    Stock is consumed, restocked when it runs low and occasionally counted;
+    replaying each item's ledger gives its ``stock_quantity``, so
+    ``reconcile_stock`` finds no drift. Items left at or below their reorder
+    point get their ``low_stock`` entry.
+    """
+    items = db.collection("items")
+    adjustments = db.collection("inventory_adjustments")
+    span = (end - start).total_seconds()
+    for n in range(volumes.items):
+        item_id = f"seed-item-{n:06d}"
+        capacity = rng.choice([20, 50, 100, 500])
+        quantity = 0.0
+        offsets = sorted(
+            rng.uniform(0, span) for _ in range(volumes.adjustments_per_item)
+        )
+        for offset in offsets:
+            previous = quantity
+            if quantity < capacity * 0.2:
+                adjustment_type = "add"
+                amount = round(capacity * rng.uniform(0.6, 0.9), 2)
+                quantity += amount
+            elif rng.random() < 0.05:
+                adjustment_type = "set"
+                amount = round(max(quantity * rng.uniform(0.95, 1.02), 0.01), 2)
+                quantity = amount
+            else:
+                adjustment_type = "remove"
+                amount = round(min(quantity, capacity * rng.uniform(0.05, 0.2)), 2)
+                if amount <= 0:
+                    continue
+                quantity -= amount
+            quantity = round(quantity, 2)
+            created_at = start + timedelta(seconds=offset)
+            yield (
+                "set",
+                adjustments.document(),
+                {
+                    "item_id": item_id,
+                    "adjustment_type": adjustment_type,
+                    "quantity": amount,
+                    "reason": ADJUSTMENT_REASONS[adjustment_type],
+                    "reference": None,
+                    "user_id": rng.choice(user_ids),
+                    "previous_quantity": previous,
+                    "new_quantity": quantity,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                },
+            )
+        reorder_point = round(capacity * 0.2, 2)
+        yield (
+            "set",
+            items.document(item_id),
+            {
+                "title": f"Item {n}",
+                "description": None,
+                "owner_id": rng.choice(user_ids),
+                "stock_quantity": quantity,
+                "reorder_point": reorder_point,
+                "created_at": start,
+                "updated_at": end,
+            },
+        )
+        low_stock = _low_stock_write(
+            db, "item", item_id, f"Item {n}", quantity, reorder_point
+        )
+        if low_stock:
+            yield low_stock
+
+
+def _daily_sales(volumes: Volumes, start: datetime, days: int) -> Iterator[int]:
+    """Split the sales over the days by weekday, season and a growth trend.
+
+    Fractions are carried to the next day so the total is exact.
+    """
+    weights = []
+    for day in range(days):
+        date = start + timedelta(days=day)
+        # Peak around Christmas
+        day_of_year = date.timetuple().tm_yday
+        season = 1 + 0.25 * math.cos(2 * math.pi * (day_of_year - 350) / 365)
+        trend = 1 + 0.5 * day / days
+        weights.append(WEEKDAY_WEIGHTS[date.weekday()] * season * trend)
+    total = sum(weights)
+    carry = 0.0
+    remaining = volumes.sales
+    for day, weight in enumerate(weights):
+        expected = volumes.sales * weight / total + carry
+        count = remaining if day == days - 1 else min(int(expected), remaining)
+        carry = expected - count
+        remaining -= count
+        yield count
+
+
+def generate_sales(
+    db: FirestoreClient,
+    rng: random.Random,
+    volumes: Volumes,
+    start: datetime,
+    prices: dict[str, float],
+    user_ids: list[str],
+    existing: int = 0,
+) -> Iterator[Write]:
+    """Sales in chronological order, numbered like ``create_sale`` does.
+
+    Numbering carries on after the ``existing`` sales.
+    """
+    sales = db.collection("sales")
+    product_ids = list(prices)
+    product_weights = popularity(len(product_ids))
+    hours = list(HOUR_WEIGHTS)
+    hour_weights = list(HOUR_WEIGHTS.values())
+    line_counts = range(1, len(LINE_COUNT_WEIGHTS) + 1)
+    days = max(int(volumes.years * 365), 1)
+    number = existing
+    for day, count in enumerate(_daily_sales(volumes, start, days)):
+        midnight = start + timedelta(days=day)
+        offsets = sorted(
+            timedelta(hours=hour, seconds=rng.uniform(0, 3600))
+            for hour in rng.choices(hours, weights=hour_weights, k=count)
+        )
+        for offset in offsets:
+            number += 1
+            (line_count,) = rng.choices(line_counts, weights=LINE_COUNT_WEIGHTS)
+            lines = []
+            for product_id in rng.choices(
+                product_ids, cum_weights=product_weights, k=line_count
+            ):
+                quantity = float(rng.choices([1, 2, 3, 6], weights=[80, 12, 5, 3])[0])
+                unit_price = prices[product_id]
+                lines.append(
+                    {
+                        "product_id": product_id,
+                        "quantity": quantity,
+                        "unit_price": unit_price,
+                        "discount": 0.0,
+                        "subtotal": unit_price * quantity,
+                    }
+                )
+            subtotal = sum(line["subtotal"] for line in lines)
+            tax = subtotal * TAX_RATE
+            created_at = midnight + offset
+            yield (
+                "set",
+                sales.document(),
+                {
+                    "sale_number": f"SALE-{number:06d}",
+                    "customer_name": None,
+                    "customer_email": None,
+                    "customer_phone": None,
+                    "payment_method": rng.choices(
+                        PAYMENT_METHODS, weights=PAYMENT_WEIGHTS
+                    )[0],
+                    "items": lines,
+                    "subtotal": subtotal,
+                    "tax": tax,
+                    "discount": 0,
+                    "total": subtotal + tax,
+                    "status": "cancelled" if rng.random() < 0.03 else "completed",
+                    "user_id": rng.choice(user_ids),
+                    "notes": None,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                },
+            )
+
+
+def commit_concurrently(
+    db: FirestoreClient, name: str, writes: Iterator[Write] | list[Write], workers: int
+) -> int:
+    """Commit full batches from several threads, keeping few batches in memory."""
+    writes = iter(writes)
+    written = 0
+    started = time.perf_counter()
+    pending: set[Future[int]] = set()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while chunk := list(islice(writes, MAX_BATCH_WRITES)):
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            pending.add(executor.submit(commit_in_batches, db, chunk))
+            written += len(chunk)
+            if written % (MAX_BATCH_WRITES * 200) == 0:
+                rate = written / (time.perf_counter() - started)
+                logger.info(f"{name}: {written} documents ({rate:.0f}/s)")
+        for future in pending:
+            future.result()
+    logger.info(f"{name}: {written} documents in {time.perf_counter() - started:.1f}s")
+    return written
+
+
+def seed(
+    db: FirestoreClient, volumes: Volumes, workers: int, random_seed: int, password: str
+) -> None:
+    rng = random.Random(random_seed)
+    end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=max(int(volumes.years * 365), 1))
+
+    user_ids, user_writes = generate_users(db, volumes, start, password)
+    commit_concurrently(db, "users", user_writes, workers)
+    prices, product_writes = generate_products(db, rng, volumes, start)
+    commit_concurrently(db, "products", product_writes, workers)
+    item_ids = [f"seed-item-{n:06d}" for n in range(volumes.items)]
+    commit_concurrently(
+        db,
+        "recipes",
+        generate_recipes(db, rng, volumes, start, list(prices), item_ids),
+        workers,
+    )
+    commit_concurrently(
+        db,
+        "items and inventory_adjustments",
+        generate_inventory(db, rng, volumes, start, end, user_ids),
+        workers,
+    )
+    existing_sales = int(db.collection("sales").count().get()[0][0].value)
+    commit_concurrently(
+        db,
+        "sales",
+        generate_sales(db, rng, volumes, start, prices, user_ids, existing_sales),
+        workers,
+    )
+
+
+def main() -> None:
+    defaults = Volumes()
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic data at scale for performance testing."
+    )
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--products", type=int, default=defaults.products)
+    parser.add_argument("--items", type=int, default=defaults.items)
+    parser.add_argument("--recipes", type=int, default=defaults.recipes)
+    parser.add_argument("--sales", type=int, default=defaults.sales)
+    parser.add_argument(
+        "--years", type=float, default=defaults.years, help="history covered by sales"
+    )
+    parser.add_argument(
+        "--adjustments-per-item", type=int, default=defaults.adjustments_per_item
+    )
+    parser.add_argument(
+        "--workers", type=int, default=16, help="batches committed concurrently"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "--password", default="changethis", help="password of the generated users"
+    )
+    args = parser.parse_args()
+
+    if settings.ENVIRONMENT == "production":
+        parser.error("refusing to seed synthetic data in production")
+    if args.users < 1 or args.products < 1 or args.items < 1:
+        parser.error("--users, --products and --items must be at least 1")
+
+    volumes = Volumes(
+        users=args.users,
+        products=args.products,
+        items=args.items,
+        recipes=args.recipes,
+        sales=args.sales,
+        years=args.years,
+        adjustments_per_item=args.adjustments_per_item,
+    )
+    logger.info(f"Seeding {volumes}")
+    connect_to_firestore()
+    seed(get_database(), volumes, args.workers, args.seed, args.password)
+    close_firestore_connection()
+    logger.info("Synthetic data created")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""HTTP load test of the real application against the Firestore emulator.
+
+Every run resets the emulator database and seeds the same fixture, so runs
+on the same machine are comparable. Results are written as JSON (by default
+to ``benchmarks/results/http_load.json``), so a change in throughput or
+latency shows up in the diff of the pull request that caused it.
+
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python -m benchmarks.http_load
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from app.core import database
+from app.core.config import settings
+from app.core.database import commit_in_batches
+from app.core.security import get_password_hash
+from app.crud import user_email_ref
+from app.main import app
+from benchmarks import reporting
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESULTS_PATH = reporting.RESULTS_DIR / "http_load.json"
+METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+USER_ID = "benchmark-user"
+USER_EMAIL = "benchmark@example.com"
+USER_PASSWORD = "benchmark-password"
+PRODUCTS = 200
+ITEMS = 200
+SALE_LINES = 20
+COUNT_LINES = 50
+PAGE_SIZE = 50
+# Requests issued before measuring, so connection setup and first-call
+# caches do not end up in the percentiles
+WARMUP = 5
+
+
+@dataclass
+class Fixture:
+    token: str = ""
+    product_ids: list[str] = field(default_factory=list)
+    item_ids: list[str] = field(default_factory=list)
+    sales: int = 0
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+Operation = Callable[[httpx.AsyncClient, Fixture, int], Awaitable[httpx.Response]]
+
+
+async def login(client: httpx.AsyncClient, fixture: Fixture, n: int) -> httpx.Response:
+    return await client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": USER_EMAIL, "password": USER_PASSWORD},
+    )
+
+
+async def browse_catalog(
+    client: httpx.AsyncClient, fixture: Fixture, n: int
+) -> httpx.Response:
+    # One page of the listing for every three product detail views
+    if n % 4 == 0:
+        skip = (n // 4 * 20) % PRODUCTS
+        return await client.get(
+            f"{settings.API_V1_STR}/products/",
+            params={"skip": skip, "limit": 20},
+            headers=fixture.headers,
+        )
+    product_id = fixture.product_ids[n % len(fixture.product_ids)]
+    return await client.get(
+        f"{settings.API_V1_STR}/products/{product_id}", headers=fixture.headers
+    )
+
+
+async def create_sale(
+    client: httpx.AsyncClient, fixture: Fixture, n: int
+) -> httpx.Response:
+    first = n * SALE_LINES
+    lines = [
+        {
+            "product_id": fixture.product_ids[(first + line) % len(fixture.product_ids)],
+            "quantity": 1,
+            "unit_price": 10.0,
+        }
+        for line in range(SALE_LINES)
+    ]
+    response = await client.post(
+        f"{settings.API_V1_STR}/sales/",
+        json={"payment_method": "card", "items": lines},
+        headers=fixture.headers,
+    )
+    if response.is_success:
+        fixture.sales += 1
+    return response
+
+
+async def count_inventory(
+    client: httpx.AsyncClient, fixture: Fixture, n: int
+) -> httpx.Response:
+    first = n * COUNT_LINES
+    adjustments = [
+        {
+            "item_id": fixture.item_ids[(first + line) % len(fixture.item_ids)],
+            "adjustment_type": "set",
+            "quantity": 100 + line,
+            "reason": "Stock count",
+        }
+        for line in range(COUNT_LINES)
+    ]
+    return await client.post(
+        f"{settings.API_V1_STR}/inventory/adjustments/bulk",
+        json={"adjustments": adjustments},
+        headers=fixture.headers,
+    )
+
+
+async def page_sales(
+    client: httpx.AsyncClient, fixture: Fixture, n: int
+) -> httpx.Response:
+    pages = max(fixture.sales // PAGE_SIZE, 1)
+    return await client.get(
+        f"{settings.API_V1_STR}/sales/",
+        params={"skip": n % pages * PAGE_SIZE, "limit": PAGE_SIZE},
+        headers=fixture.headers,
+    )
+
+
+# Run in this order: paging reads the sales created by the sales scenario
+SCENARIOS: dict[str, Operation] = {
+    "login_burst": login,
+    "catalog_browsing": browse_catalog,
+    "sale_20_lines": create_sale,
+    "inventory_count": count_inventory,
+    "sales_paging": page_sales,
+}
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    if not samples:
+        return 0.0
+    rank = max(int(q * len(samples) + 0.5), 1)
+    return samples[min(rank, len(samples)) - 1]
+
+
+def summarize(
+    latencies: list[float], statuses: Counter[int], elapsed: float
+) -> dict[str, Any]:
+    samples = sorted(latencies)
+    errors = sum(count for status, count in statuses.items() if status >= 400)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+        "seconds": elapsed,
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "max_ms": (samples[-1] if samples else 0.0) * 1000,
+    }
+
+
+def failed_scenarios(results: dict[str, dict[str, Any]]) -> list[str]:
+    """Scenarios with failed requests: their numbers time errors, not the route."""
+    return [name for name, result in results.items() if result["errors"]]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    fixture: Fixture,
+    operation: Operation,
+    requests: int,
+    concurrency: int,
+) -> dict[str, Any]:
+    for n in range(WARMUP):
+        await operation(client, fixture, requests + n)
+
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def issue(n: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await operation(client, fixture, n)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(issue(n) for n in range(requests)))
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+def reset_emulator() -> None:
+    """Delete every document in the emulator database."""
+    db = database.get_database()
+    response = httpx.delete(
+        f"http://{os.environ['FIRESTORE_EMULATOR_HOST']}/emulator/v1/projects/"
+        f"{db.project}/databases/{db._database}/documents"
+    )
+    response.raise_for_status()
+
+
+def seed() -> Fixture:
+    db = database.get_database()
+    now = datetime.now(timezone.utc)
+    fixture = Fixture(
+        product_ids=[f"benchmark-product-{n:04d}" for n in range(PRODUCTS)],
+        item_ids=[f"benchmark-item-{n:04d}" for n in range(ITEMS)],
+    )
+    writes: list[database.Write] = [
+        (
+            "set",
+            db.collection("users").document(USER_ID),
+            {
+                "email": USER_EMAIL,
+                "hashed_password": get_password_hash(USER_PASSWORD),
+                "is_active": True,
+                "is_superuser": True,
+                "full_name": "Benchmark",
+                "created_at": now,
+                "updated_at": now,
+            },
+        ),
+        ("set", user_email_ref(db, USER_EMAIL), {"user_id": USER_ID}),
+    ]
+    writes += [
+        (
+            "set",
+            db.collection("products").document(product_id),
+            {
+                "name": f"Product {n}",
+                "category": f"Category {n % 10}",
+                "price": 10.0,
+                "cost": 4.0,
+                # Enough stock that the sales scenario never runs out
+                "stock_quantity": 1_000_000,
+                "unit": "unit",
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now,
+            },
+        )
+        for n, product_id in enumerate(fixture.product_ids)
+    ]
+    writes += [
+        (
+            "set",
+            db.collection("items").document(item_id),
+            {
+                "title": f"Item {n}",
+                "owner_id": USER_ID,
+                "stock_quantity": 100,
+                "created_at": now,
+                "updated_at": now,
+            },
+        )
+        for n, item_id in enumerate(fixture.item_ids)
+    ]
+    commit_in_batches(db, writes)
+    return fixture
+
+
+async def run(
+    scenarios: list[str], requests: int, concurrency: int
+) -> dict[str, dict[str, Any]]:
+    results = {}
+    # The login burst is one client logging into one account over and over;
+    # keep the buckets in the measured path, but never let them run dry
+    logins = requests + WARMUP + 1
+    settings.LOGIN_RATE_LIMIT_IP_BURST = logins
+    settings.LOGIN_RATE_LIMIT_ACCOUNT_BURST = logins
+    transport = httpx.ASGITransport(app=app)
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client,
+    ):
+        reset_emulator()
+        fixture = seed()
+        response = await login(client, fixture, 0)
+        response.raise_for_status()
+        fixture.token = response.json()["access_token"]
+
+        for name in scenarios:
+            logger.info(f"Running {name}: {requests} requests, concurrency {concurrency}")
+            results[name] = await run_scenario(
+                client, fixture, SCENARIOS[name], requests, concurrency
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=list(SCENARIOS),
+        help="Scenario to run (repeatable); all of them by default",
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH)
+    args = parser.parse_args()
+
+    # The database is wiped and reseeded, so never run against a real project
+    if not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+        parser.error("FIRESTORE_EMULATOR_HOST must point at a Firestore emulator")
+
+    scenarios = [name for name in SCENARIOS if name in (args.scenario or SCENARIOS)]
+    results = asyncio.run(run(scenarios, args.requests, args.concurrency))
+    failed = failed_scenarios(results)
+    if failed:
+        for name in failed:
+            logger.error(f"{name}: {results[name]['status_codes']}")
+        sys.exit(f"Not saving results, requests failed in: {', '.join(failed)}")
+
+    current = {
+        **reporting.run_info(),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "scenarios": results,
+    }
+    reporting.save(args.output, current, "scenarios", METRICS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Micro-benchmarks of model validation and response serialization.
+
+Times the per-request model work at 1, 100 and 1,000 rows: validating a
+sale payload, the ``TimestampModel`` default factories, building the list
+wrappers (``SalesPublic``, ``ProductsPublic``) from documents, and FastAPI's
+response path (validation against ``response_model``, JSON encoding).
+Results are written to ``benchmarks/results/models.json``.
+
+    python -m benchmarks.models
+"""
+
+import argparse
+import asyncio
+import logging
+import timeit
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import pydantic
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.models import ProductsPublic, SaleCreate, SalesPublic
+from app.models.base import TimestampModel
+from benchmarks import reporting
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESULTS_PATH = reporting.RESULTS_DIR / "models.json"
+METRICS = ("us_per_call",)
+ROWS = (1, 100, 1_000)
+# Best of this many timing runs, each at least 0.2 s long
+REPEAT = 5
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def sale_line(n: int) -> dict[str, Any]:
+    return {
+        "product_id": f"product-{n:06d}",
+        "quantity": 2.0,
+        "unit_price": 3.5,
+        "discount": 0.0,
+    }
+
+
+def sale_document(n: int, lines: int = 3) -> dict[str, Any]:
+    items = [{**sale_line(line), "subtotal": 7.0} for line in range(lines)]
+    return {
+        "_id": f"sale-{n:06d}",
+        "sale_number": f"SALE-{n + 1:06d}",
+        "customer_name": "Ana",
+        "customer_email": None,
+        "customer_phone": None,
+        "payment_method": "card",
+        "items": items,
+        "subtotal": 7.0 * lines,
+        "tax": 0.7 * lines,
+        "discount": 0,
+        "total": 7.7 * lines,
+        "status": "completed",
+        "user_id": "user-1",
+        "notes": None,
+        "created_at": NOW,
+        "updated_at": NOW,
+    }
+
+
+def product_document(n: int) -> dict[str, Any]:
+    return {
+        "_id": f"product-{n:06d}",
+        "name": f"Product {n}",
+        "description": "Sourdough loaf",
+        "category": "Bakery",
+        "price": 4.5,
+        "cost": 1.2,
+        "stock_quantity": 40,
+        "reorder_point": 10,
+        "unit": "unit",
+        "is_active": True,
+        "created_at": NOW,
+        "updated_at": NOW,
+    }
+
+
+def sale_create(rows: int) -> Callable[[], Any]:
+    payload = {"payment_method": "card", "items": [sale_line(n) for n in range(rows)]}
+    return lambda: SaleCreate.model_validate(payload)
+
+
+def timestamp_defaults(rows: int) -> Callable[[], Any]:
+    return lambda: [TimestampModel() for _ in range(rows)]
+
+
+def sales_public(rows: int) -> Callable[[], Any]:
+    documents = [sale_document(n) for n in range(rows)]
+    return lambda: SalesPublic(data=documents, count=rows)
+
+
+def products_public(rows: int) -> Callable[[], Any]:
+    documents = [product_document(n) for n in range(rows)]
+    return lambda: ProductsPublic(data=documents, count=rows)
+
+
+def sales_response(rows: int) -> Callable[[], Any]:
+    """What FastAPI does with a ``SalesPublic`` returned by ``read_sales``."""
+    field = create_model_field("Response", SalesPublic)
+    content = SalesPublic(data=[sale_document(n) for n in range(rows)], count=rows)
+    loop = asyncio.new_event_loop()
+
+    def respond() -> bytes:
+        serialized = loop.run_until_complete(
+            serialize_response(field=field, response_content=content)
+        )
+        return JSONResponse(serialized).body
+
+    return respond
+
+
+CASES: dict[str, Callable[[int], Callable[[], Any]]] = {
+    "sale_create": sale_create,
+    "timestamp_defaults": timestamp_defaults,
+    "sales_public": sales_public,
+    "products_public": products_public,
+    "sales_response": sales_response,
+}
+
+
+def measure(func: Callable[[], Any]) -> float:
+    """Best time per call in seconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=REPEAT, number=number)) / number
+
+
+def run(cases: list[str]) -> dict[str, dict[str, Any]]:
+    results = {}
+    for name in cases:
+        for rows in ROWS:
+            seconds = measure(CASES[name](rows))
+            key = f"{name}[{rows}]"
+            results[key] = {
+                "rows": rows,
+                "us_per_call": seconds * 1e6,
+                "us_per_row": seconds * 1e6 / rows,
+            }
+            logger.info(f"{key}: {seconds * 1e6:.1f} us")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--case",
+        action="append",
+        choices=list(CASES),
+        help="Case to run (repeatable); all of them by default",
+    )
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH)
+    args = parser.parse_args()
+
+    cases = [name for name in CASES if name in (args.case or CASES)]
+    current = {
+        **reporting.run_info(),
+        "pydantic": pydantic.VERSION,
+        "cases": run(cases),
+    }
+    reporting.save(args.output, current, "cases", METRICS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import json
+import logging
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_info() -> dict[str, Any]:
+    """Where and when results were measured."""
+    return {
+        "commit": git_commit(),
+        "run_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+    }
+
+
+def compare(
+    previous: dict[str, Any],
+    current: dict[str, Any],
+    key: str,
+    metrics: tuple[str, ...],
+) -> list[str]:
+    """Describe the change of every entry under ``key`` against a previous run."""
+    lines = []
+    for name, result in current[key].items():
+        before = previous.get(key, {}).get(name)
+        if not before:
+            continue
+        changes = []
+        for metric in metrics:
+            if before.get(metric):
+                change = (result[metric] - before[metric]) / before[metric] * 100
+                changes.append(f"{metric} {result[metric]:.1f} ({change:+.1f}%)")
+        lines.append(f"{name}: {', '.join(changes)}")
+    return lines
+
+
+def save(path: Path, current: dict[str, Any], key: str, metrics: tuple[str, ...]) -> None:
+    """Log the change against the stored results, then overwrite them.
+
+    Results files are committed, so the review diff shows every change.
+    """
+    if path.exists():
+        for line in compare(json.loads(path.read_text()), current, key, metrics):
+            logger.info(line)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(current, indent=2) + "\n")
+    logger.info(f"Results written to {path}")
@@ -0,0 +1,34 @@
+from app.core.config import settings
+from tests.utils.firestore import FakeFirestore, auth_headers, client
+
+API = settings.API_V1_STR
+
+
+def test_products_batch_keeps_order_and_drops_unknown_ids() -> None:
+    # IDs no other test uses, as found documents stay in the shared cache
+    db = FakeFirestore(
+        {
+            "products": {
+                "batch-loaf": {"name": "Loaf", "price": 3.0, "stock_quantity": 2},
+                "batch-cake": {"name": "Cake", "price": 9.0},
+            }
+        }
+    )
+
+    response = client(db).post(
+        f"{API}/products/batch",
+        json={"ids": ["batch-cake", "batch-unknown", "batch-loaf", "batch-cake"]},
+        headers=auth_headers(),
+    )
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 2
+    assert [product["_id"] for product in content["data"]] == [
+        "batch-cake",
+        "batch-loaf",
+    ]
+    loaf = content["data"][1]
+    assert loaf["name"] == "Loaf"
+    assert loaf["stock_quantity"] == 2
+    assert loaf["is_active"] is True
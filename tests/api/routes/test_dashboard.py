@@ -0,0 +1,77 @@
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from app.api.routes import dashboard
+from app.core.config import settings
+from tests.utils.firestore import FakeFirestore, auth_headers, client
+
+API = settings.API_V1_STR
+CREATED = {"created_at": "2024-01-01T00:00:00Z", "updated_at": "2024-01-01T00:00:00Z"}
+
+SALE = {
+    "_id": "s1",
+    "sale_number": "SALE-000001",
+    "customer_name": None,
+    "customer_email": None,
+    "customer_phone": None,
+    "payment_method": "cash",
+    "items": [],
+    "subtotal": 10,
+    "tax": 1,
+    "discount": 0,
+    "total": 11,
+    "status": "completed",
+    "user_id": "admin",
+    "notes": None,
+    **CREATED,
+}
+PRODUCT = {"_id": "p1", "name": "Loaf", "price": 3.0, **CREATED}
+ADJUSTMENT = {
+    "_id": "a1",
+    "item_id": "flour",
+    "adjustment_type": "add",
+    "quantity": 5,
+    "user_id": "admin",
+    "previous_quantity": 0,
+    "new_quantity": 5,
+    **CREATED,
+}
+
+
+def test_dashboard_assembles_overview_shared_between_users() -> None:
+    latest = {"sales": [SALE], "inventory_adjustments": [ADJUSTMENT]}
+    counts = {"sales": 120, "products": 7}
+    read_latest = MagicMock(side_effect=lambda db, collection: latest[collection])
+    count = MagicMock(side_effect=lambda db, collection: counts[collection])
+    read_first = MagicMock(return_value=[PRODUCT])
+    dashboard.overview_cache.clear()
+
+    with (
+        patch.object(dashboard, "read_latest", read_latest),
+        patch.object(dashboard, "count", count),
+        patch.object(dashboard, "read_first", read_first),
+    ):
+        admin = client(FakeFirestore()).get(f"{API}/dashboard/", headers=auth_headers())
+        baker = client(FakeFirestore()).get(
+            f"{API}/dashboard/", headers=auth_headers("baker", superuser=False)
+        )
+    dashboard.overview_cache.clear()
+
+    assert admin.status_code == baker.status_code == 200
+    content: dict[str, Any] = admin.json()
+    assert content["user"]["_id"] == "admin"
+    assert content["user"]["is_superuser"] is True
+    assert [sale["_id"] for sale in content["recent_sales"]] == ["s1"]
+    assert content["sales_count"] == 120
+    assert [product["_id"] for product in content["products"]] == ["p1"]
+    assert content["products_count"] == 7
+    assert content["recent_adjustments"][0]["new_quantity"] == 5
+    assert read_first.call_args.args[1:] == ("products", "name")
+
+    # The second user gets the same overview, without reading it again
+    assert baker.json()["user"]["_id"] == "baker"
+    assert {key: value for key, value in baker.json().items() if key != "user"} == {
+        key: value for key, value in content.items() if key != "user"
+    }
+    assert read_latest.call_count == 2
+    assert count.call_count == 2
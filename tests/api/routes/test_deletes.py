@@ -0,0 +1,89 @@
+from app.core.config import settings
+from app.core.document_cache import document_cache
+from tests.utils.firestore import FakeFirestore, auth_headers, client
+
+API = settings.API_V1_STR
+
+
+def _db() -> FakeFirestore:
+    return FakeFirestore(
+        {
+            "items": {
+                "flour": {"title": "Flour", "owner_id": "admin", "stock_quantity": 1}
+            },
+            "products": {
+                "loaf": {"name": "Loaf", "price": 3.0, "stock_quantity": 0},
+                "cake": {"name": "Cake", "price": 9.0, "stock_quantity": 0},
+            },
+            "recipes": {"bread": {"name": "Bread", "product_id": "loaf"}},
+            "low_stock": {
+                "item-flour": {"kind": "item", "ref_id": "flour"},
+                "product-cake": {"kind": "product", "ref_id": "cake"},
+            },
+        }
+    )
+
+
+def test_delete_item_removes_low_stock_entry() -> None:
+    db = _db()
+    document_cache.put("items", "flour", {"_id": "flour"})
+
+    response = client(db).delete(f"{API}/items/flour", headers=auth_headers())
+
+    assert response.status_code == 200
+    assert "flour" not in db.docs["items"]
+    assert "item-flour" not in db.docs["low_stock"]
+    assert db.commits == 1
+    assert document_cache.get("items", "flour") is None
+
+
+def test_delete_item_of_another_owner_is_refused() -> None:
+    db = _db()
+
+    response = client(db).delete(
+        f"{API}/items/flour", headers=auth_headers("baker", superuser=False)
+    )
+
+    assert response.status_code == 400
+    assert "flour" in db.docs["items"]
+
+
+def test_delete_product_removes_low_stock_entry() -> None:
+    db = _db()
+    document_cache.put("products", "cake", {"_id": "cake"})
+
+    response = client(db).delete(f"{API}/products/cake", headers=auth_headers())
+
+    assert response.status_code == 200
+    assert "cake" not in db.docs["products"]
+    assert "product-cake" not in db.docs["low_stock"]
+    assert db.commits == 1
+    assert document_cache.get("products", "cake") is None
+
+
+def test_delete_product_used_in_recipe_is_refused() -> None:
+    db = _db()
+
+    response = client(db).delete(f"{API}/products/loaf", headers=auth_headers())
+
+    assert response.status_code == 400
+    assert "loaf" in db.docs["products"]
+
+
+def test_delete_recipe() -> None:
+    db = _db()
+    document_cache.put("recipes", "bread", {"_id": "bread"})
+
+    response = client(db).delete(f"{API}/recipes/bread", headers=auth_headers())
+
+    assert response.status_code == 200
+    assert "bread" not in db.docs["recipes"]
+    assert document_cache.get("recipes", "bread") is None
+
+
+def test_delete_unknown_documents_is_not_found() -> None:
+    db = _db()
+
+    for path in ("items", "products", "recipes"):
+        response = client(db).delete(f"{API}/{path}/missing", headers=auth_headers())
+        assert response.status_code == 404
@@ -0,0 +1,142 @@
+from datetime import datetime, timezone
+from typing import Any
+
+from app.core.config import settings
+from tests.utils.firestore import FakeFirestore, auth_headers, client
+
+API = settings.API_V1_STR
+
+
+def _db() -> FakeFirestore:
+    return FakeFirestore(
+        {
+            "items": {
+                "flour": {"title": "Flour", "stock_quantity": 10, "reorder_point": 5},
+                "sugar": {"title": "Sugar", "stock_quantity": 3},
+            }
+        }
+    )
+
+
+def _adjust(db: FakeFirestore, *adjustments: dict[str, Any]) -> Any:
+    return client(db).post(
+        f"{API}/inventory/adjustments/bulk",
+        json={"adjustments": list(adjustments)},
+        headers=auth_headers(),
+    )
+
+
+def test_bulk_adjustments_apply_in_order() -> None:
+    db = _db()
+
+    response = _adjust(
+        db,
+        {"item_id": "flour", "adjustment_type": "remove", "quantity": 4},
+        {"item_id": "sugar", "adjustment_type": "set", "quantity": 8},
+        {"item_id": "flour", "adjustment_type": "add", "quantity": 1},
+    )
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert [entry["new_quantity"] for entry in data] == [6, 8, 7]
+    assert data[2]["previous_quantity"] == 6
+    assert db.docs["items"]["flour"]["stock_quantity"] == 7
+    assert db.docs["items"]["sugar"]["stock_quantity"] == 8
+    assert len(db.docs["inventory_adjustments"]) == 3
+    assert db.commits == 1
+
+
+def test_bulk_adjustments_conflict_writes_nothing() -> None:
+    db = _db()
+    get_all = db.get_all
+
+    def get_all_then_adjust(*args: Any, **kwargs: Any) -> Any:
+        snapshots = get_all(*args, **kwargs)
+        # Another request adjusts the stock between the read and the commit
+        db.collection("items").document("flour").update({"stock_quantity": 12})
+        return snapshots
+
+    db.get_all = get_all_then_adjust  # type: ignore[method-assign]
+
+    response = _adjust(
+        db,
+        {"item_id": "flour", "adjustment_type": "remove", "quantity": 6},
+        {"item_id": "sugar", "adjustment_type": "add", "quantity": 1},
+    )
+
+    assert response.status_code == 409
+    assert db.docs["items"]["flour"]["stock_quantity"] == 12
+    assert db.docs["items"]["sugar"]["stock_quantity"] == 3
+    assert "inventory_adjustments" not in db.docs
+    assert "low_stock" not in db.docs
+
+
+def test_bulk_adjustments_for_unknown_item_write_nothing() -> None:
+    db = _db()
+
+    response = _adjust(
+        db,
+        {"item_id": "flour", "adjustment_type": "add", "quantity": 1},
+        {"item_id": "salt", "adjustment_type": "add", "quantity": 1},
+    )
+
+    assert response.status_code == 404
+    assert db.docs["items"]["flour"]["stock_quantity"] == 10
+    assert "inventory_adjustments" not in db.docs
+
+
+def _entry(item_id: str, day: int, new_quantity: float) -> dict[str, Any]:
+    return {
+        "item_id": item_id,
+        "adjustment_type": "set",
+        "quantity": new_quantity,
+        "new_quantity": new_quantity,
+        "created_at": datetime(2024, 1, day, tzinfo=timezone.utc),
+    }
+
+
+def _stock_at(db: FakeFirestore, item_id: str, at: str | None = None) -> Any:
+    params = {"at": at} if at else {}
+    return client(db).get(
+        f"{API}/inventory/items/{item_id}/stock", params=params, headers=auth_headers()
+    )
+
+
+def test_stock_at_without_entries_is_zero() -> None:
+    response = _stock_at(_db(), "flour")
+
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 0
+    assert response.json()["adjustment_id"] is None
+
+
+def test_stock_at_of_unknown_item_is_not_found() -> None:
+    assert _stock_at(_db(), "salt").status_code == 404
+
+
+def test_stock_at_before_first_entry_is_zero() -> None:
+    db = _db()
+    db.docs["inventory_adjustments"] = {"a1": _entry("flour", 10, 7)}
+
+    response = _stock_at(db, "flour", "2024-01-05T00:00:00Z")
+
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 0
+
+
+def test_stock_at_is_latest_entry_up_to_then() -> None:
+    db = _db()
+    db.docs["inventory_adjustments"] = {
+        "a1": _entry("flour", 1, 7),
+        "a3": _entry("flour", 3, 2),
+        "a2": _entry("flour", 2, 5),
+        "b2": _entry("sugar", 2, 40),
+    }
+
+    response = _stock_at(db, "flour", "2024-01-02T12:00:00Z")
+    latest = _stock_at(db, "flour")
+
+    assert response.json()["quantity"] == 5
+    assert response.json()["adjustment_id"] == "a2"
+    assert latest.json()["quantity"] == 2
+    assert latest.json()["adjustment_id"] == "a3"
@@ -0,0 +1,71 @@
+from app.core.config import settings
+from tests.utils.firestore import FakeFirestore, auth_headers, client
+
+API = settings.API_V1_STR
+
+
+def _db() -> FakeFirestore:
+    return FakeFirestore(
+        {
+            "items": {
+                "flour": {"title": "Flour", "owner_id": "admin", "stock_quantity": 4}
+            },
+            "products": {"loaf": {"name": "Loaf", "price": 3.0, "stock_quantity": 2}},
+            "recipes": {
+                "bread": {
+                    "name": "Bread",
+                    "product_id": "loaf",
+                    "ingredients": [{"item_id": "flour", "quantity": 1, "unit": "kg"}],
+                }
+            },
+        }
+    )
+
+
+def test_update_item_returns_updated_item() -> None:
+    db = _db()
+
+    response = client(db).put(
+        f"{API}/items/flour",
+        json={"title": "Wheat flour", "reorder_point": 5},
+        headers=auth_headers(),
+    )
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["_id"] == "flour"
+    assert content["title"] == "Wheat flour"
+    assert content["owner_id"] == "admin"
+    assert db.docs["items"]["flour"]["title"] == "Wheat flour"
+    assert db.docs["low_stock"]["item-flour"]["reorder_point"] == 5
+
+
+def test_update_product_returns_updated_product() -> None:
+    db = _db()
+
+    response = client(db).put(
+        f"{API}/products/loaf", json={"price": 3.5}, headers=auth_headers()
+    )
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["_id"] == "loaf"
+    assert content["price"] == 3.5
+    assert content["stock_quantity"] == 2
+    assert db.docs["products"]["loaf"]["price"] == 3.5
+
+
+def test_update_recipe_returns_updated_recipe() -> None:
+    db = _db()
+
+    response = client(db).put(
+        f"{API}/recipes/bread",
+        json={"ingredients": [{"item_id": "flour", "quantity": 2, "unit": "kg"}]},
+        headers=auth_headers(),
+    )
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["_id"] == "bread"
+    assert content["ingredients"][0]["quantity"] == 2
+    assert db.docs["recipes"]["bread"]["ingredients"][0]["quantity"] == 2
@@ -402,9 +402,10 @@ def test_delete_user_me(client: TestClient, db: Session) -> None:
         f"{settings.API_V1_STR}/users/me",
         headers=headers,
     )
-    assert r.status_code == 200
-    deleted_user = r.json()
-    assert deleted_user["message"] == "User deleted successfully"
+    assert r.status_code == 202
+    job = r.json()
+    assert job["kind"] == "delete_user"
+    assert job["steps"][0]["value"] == str(user_id)
     result = db.exec(select(User).where(User.id == user_id)).first()
     assert result is None
 
@@ -437,9 +438,10 @@ def test_delete_user_super_user(
         f"{settings.API_V1_STR}/users/{user_id}",
         headers=superuser_token_headers,
     )
-    assert r.status_code == 200
-    deleted_user = r.json()
-    assert deleted_user["message"] == "User deleted successfully"
+    assert r.status_code == 202
+    job = r.json()
+    assert job["kind"] == "delete_user"
+    assert job["steps"][0]["value"] == str(user_id)
     result = db.exec(select(User).where(User.id == user_id)).first()
     assert result is None
 
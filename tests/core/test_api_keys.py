@@ -0,0 +1,134 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app import crud
+from app.api.deps import SalesUser, authenticate_api_key, get_db
+from app.core.api_keys import (
+    ApiKeyCache,
+    CachedApiKey,
+    api_key_cache,
+    create_api_key,
+    split_api_key,
+)
+from app.core.revocation import revocations
+
+
+def _db(secret_hash: bytes, scopes: list[str], is_active: bool = True) -> MagicMock:
+    key = MagicMock(exists=True)
+    key.to_dict.return_value = {
+        "user_id": "cashier",
+        "scopes": scopes,
+        "secret_hash": secret_hash,
+    }
+    user = MagicMock(exists=True, id="cashier")
+    user.to_dict.return_value = {
+        "email": "cashier@example.com",
+        "is_active": is_active,
+        "is_superuser": True,
+        "hashed_password": "hash",
+    }
+    user.get.side_effect = lambda field: user.to_dict.return_value[field]
+    db = MagicMock()
+    db.collection.side_effect = lambda name: MagicMock(
+        document=MagicMock(
+            return_value=MagicMock(
+                get=MagicMock(return_value=key if name == "api_keys" else user)
+            )
+        )
+    )
+    return db
+
+
+def test_split_api_key() -> None:
+    key_id, key, secret_hash = create_api_key()
+    assert split_api_key(key) == (key_id, secret_hash)
+    assert split_api_key(key.removeprefix("mk_")) is None
+    assert split_api_key(f"mk_{key_id}") is None
+
+
+def test_verified_key_is_cached() -> None:
+    key_id, key, secret_hash = create_api_key()
+    db = _db(secret_hash, ["sales"])
+
+    first = authenticate_api_key(db, key, "sales")
+    second = authenticate_api_key(db, key, "sales")
+
+    assert first.id == "cashier"
+    assert not first.is_superuser
+    assert second is first
+    # One read of the key and one of its user, on the first use only
+    assert db.collection.call_count == 2
+
+
+def test_key_rejected_outside_scope_or_with_wrong_secret() -> None:
+    key_id, key, secret_hash = create_api_key()
+    db = _db(secret_hash, ["products"])
+
+    with pytest.raises(HTTPException) as exc_info:
+        authenticate_api_key(db, key, "sales")
+    assert exc_info.value.status_code == 403
+
+    with pytest.raises(HTTPException):
+        authenticate_api_key(db, f"mk_{key_id}.wrong-secret", "products")
+
+
+def test_key_of_inactive_user_and_revoked_key_rejected() -> None:
+    _, key, secret_hash = create_api_key()
+    with pytest.raises(HTTPException):
+        authenticate_api_key(_db(secret_hash, ["sales"], is_active=False), key, "sales")
+
+    key_id, key, secret_hash = create_api_key()
+    db = _db(secret_hash, ["sales"])
+    authenticate_api_key(db, key, "sales")
+    revocations.revoke_token(MagicMock(), key_id, time.time() + 60)
+    with pytest.raises(HTTPException):
+        authenticate_api_key(db, key, "sales")
+
+
+def test_revoking_user_tokens_revokes_their_keys() -> None:
+    key_id, key, secret_hash = create_api_key()
+    db = _db(secret_hash, ["sales"])
+    authenticate_api_key(db, key, "sales")
+    writes = MagicMock()
+    owned = writes.collection.return_value.where.return_value.select.return_value
+    owned.stream.return_value = [MagicMock(id=key_id)]
+
+    crud.revoke_user_tokens(writes, "cashier")
+
+    writes.collection.return_value.document.assert_any_call(key_id)
+    writes.collection.return_value.document.return_value.delete.assert_called()
+    with pytest.raises(HTTPException):
+        authenticate_api_key(db, key, "sales")
+
+
+def test_cache_expires_and_evicts_least_recently_used() -> None:
+    cache = ApiKeyCache(maxsize=2)
+    for key_id in ("a", "b", "c"):
+        cache.put(key_id, CachedApiKey(b"", (), None, time.monotonic()))
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+
+    with patch("app.core.api_keys.settings.API_KEY_CACHE_SECONDS", 0):
+        time.sleep(0.01)
+        assert cache.get("c") is None
+
+
+def test_route_accepts_api_key_header() -> None:
+    _, key, secret_hash = create_api_key()
+    app = FastAPI()
+    app.dependency_overrides[get_db] = lambda: _db(secret_hash, ["sales"])
+
+    @app.get("/sales")
+    async def sales(current_user: SalesUser) -> dict[str, str]:
+        return {"user": current_user.id}
+
+    client = TestClient(app)
+    assert client.get("/sales", headers={"X-API-Key": key}).json() == {
+        "user": "cashier"
+    }
+    assert client.get("/sales").status_code == 401
+    api_key_cache.evict(split_api_key(key)[0])
@@ -0,0 +1,41 @@
+from unittest.mock import MagicMock
+
+from app.core.database import MAX_BATCH_WRITES, commit_in_batches
+
+
+def test_commit_in_batches_splits_at_limit() -> None:
+    database = MagicMock()
+    writes = [("set", MagicMock(), {"n": n}) for n in range(MAX_BATCH_WRITES + 1)]
+
+    committed = commit_in_batches(database, writes)
+
+    assert committed == 2
+    assert database.batch.call_count == 2
+    assert database.batch.return_value.commit.call_count == 2
+
+
+def test_commit_in_batches_dispatches_operations() -> None:
+    database = MagicMock()
+    batch = database.batch.return_value
+    reference = MagicMock()
+
+    commit_in_batches(
+        database,
+        [
+            ("set", reference, {"a": 1}),
+            ("update", reference, {"a": 2}),
+            ("delete", reference, None),
+        ],
+    )
+
+    batch.set.assert_called_once_with(reference, {"a": 1})
+    batch.update.assert_called_once_with(reference, {"a": 2})
+    batch.delete.assert_called_once_with(reference)
+    batch.commit.assert_called_once()
+
+
+def test_commit_in_batches_without_writes() -> None:
+    database = MagicMock()
+
+    assert commit_in_batches(database, []) == 0
+    database.batch.return_value.commit.assert_not_called()
@@ -0,0 +1,90 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.core import email_outbox
+from app.core.email_outbox import EmailOutbox, OutgoingEmail
+
+
+def _email(n: int) -> OutgoingEmail:
+    return OutgoingEmail(
+        email_to=f"user{n}@example.com", subject="Hi", html_content="<p>Hi</p>"
+    )
+
+
+def _deliver(outbox: EmailOutbox, count: int) -> None:
+    async def run() -> None:
+        outbox.start()
+        for n in range(count):
+            outbox.enqueue(_email(n))
+        await outbox.stop()
+
+    asyncio.run(run())
+
+
+def test_emails_share_one_connection_and_drain_on_stop() -> None:
+    outbox = EmailOutbox()
+    message = MagicMock()
+    message.return_value.send.return_value.success = True
+    with (
+        patch.object(email_outbox, "SMTPBackend") as backend,
+        patch.object(email_outbox.emails, "Message", message),
+    ):
+        _deliver(outbox, 3)
+
+    assert outbox.sent_total == 3
+    backend.assert_called_once()
+    backend.return_value.close.assert_called_once()
+    assert len(outbox) == 0
+
+
+def test_failed_emails_are_retried_then_dropped() -> None:
+    outbox = EmailOutbox()
+    message = MagicMock()
+    results = [False, True, False, False]
+    message.return_value.send.side_effect = lambda **kwargs: MagicMock(
+        success=results.pop(0) if results else False
+    )
+    with (
+        patch.object(email_outbox, "SMTPBackend"),
+        patch.object(email_outbox.emails, "Message", message),
+        patch.object(email_outbox, "RETRY_DELAY", 0),
+        patch.object(email_outbox, "MAX_ATTEMPTS", 3),
+    ):
+        _deliver(outbox, 2)
+
+    # First attempt: one sent, one failed; both retries of the other fail
+    assert outbox.sent_total == 1
+    assert outbox.failed_total == 1
+    assert message.return_value.send.call_count == 4
+
+
+def test_delivery_survives_a_failing_batch() -> None:
+    outbox = EmailOutbox()
+    message = MagicMock()
+    message.return_value.send.return_value.success = True
+    # The first connection attempt raises outside the per-email handling
+    backend = MagicMock(side_effect=[OSError("connection refused"), MagicMock()])
+
+    async def run() -> None:
+        outbox.start()
+        outbox.enqueue(_email(0))
+        await asyncio.wait_for(outbox._queue.join(), 1)
+        outbox.enqueue(_email(1))
+        await outbox.stop()
+
+    with (
+        patch.object(email_outbox, "SMTPBackend", backend),
+        patch.object(email_outbox.emails, "Message", message),
+    ):
+        asyncio.run(run())
+
+    assert outbox.failed_total == 1
+    assert outbox.sent_total == 1
+    message.return_value.send.assert_called_once()
+
+
+def test_enqueue_requires_running_outbox() -> None:
+    with pytest.raises(RuntimeError):
+        EmailOutbox().enqueue(_email(0))
@@ -0,0 +1,173 @@
+import asyncio
+import itertools
+import json
+from datetime import datetime, timezone
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.cloud import firestore
+from google.cloud.firestore_admin_v1.types import Index
+
+from app.api.routes.sales import read_sales
+from app.core import database, indexes
+from app.core.indexes import INDEXES, SALES_FILTERS, CompositeIndex
+
+
+def _index(index: CompositeIndex, state: Index.State = Index.State.READY) -> Index:
+    fields = [
+        Index.IndexField(field_path=field, order=Index.IndexField.Order[order])
+        for field, order in index.fields
+    ]
+    fields.append(
+        Index.IndexField(field_path="__name__", order=Index.IndexField.Order.DESCENDING)
+    )
+    return Index(
+        name=f"projects/p/databases/d/collectionGroups/{index.collection}/indexes/x",
+        query_scope=Index.QueryScope.COLLECTION,
+        state=state,
+        fields=fields,
+    )
+
+
+def test_indexes_file_is_up_to_date() -> None:
+    # Regenerate with: python -m app.core.indexes
+    assert indexes.INDEXES_FILE.read_text() == indexes.render()
+    document = json.loads(indexes.render())
+    assert document["indexes"][0] == {
+        "collectionGroup": "sales",
+        "queryScope": "COLLECTION",
+        "fields": [
+            {"fieldPath": "user_id", "order": "ASCENDING"},
+            {"fieldPath": "created_at", "order": "DESCENDING"},
+        ],
+    }
+
+
+def test_missing_indexes_ignores_name_field_and_building_indexes() -> None:
+    ready, building, *rest = INDEXES
+    existing = [
+        _index(ready),
+        _index(building, Index.State.CREATING),
+        *(_index(index) for index in rest),
+    ]
+
+    assert indexes.missing_indexes(existing) == [building]
+
+
+def test_create_indexes_fails_outside_local_when_indexes_are_missing() -> None:
+    admin = MagicMock()
+    admin.return_value.list_indexes.return_value = [_index(INDEXES[0])]
+
+    with (
+        patch.object(database, "FirestoreAdminClient", admin),
+        patch.object(
+            database, "db", MagicMock(_database_string="projects/p/databases/d")
+        ),
+        patch.object(database.settings, "ENVIRONMENT", "production"),
+        patch.dict("os.environ", clear=False) as environ,
+    ):
+        environ.pop("FIRESTORE_EMULATOR_HOST", None)
+        with pytest.raises(RuntimeError):
+            asyncio.run(database.create_indexes())
+        admin.return_value.list_indexes.return_value = [
+            _index(index) for index in INDEXES
+        ]
+        asyncio.run(database.create_indexes())
+
+    admin.return_value.list_indexes.assert_called_with(
+        parent="projects/p/databases/d/collectionGroups/-"
+    )
+
+
+def test_create_indexes_fails_outside_local_when_listing_fails() -> None:
+    admin = MagicMock()
+    admin.return_value.list_indexes.side_effect = PermissionError("denied")
+
+    with (
+        patch.object(database, "FirestoreAdminClient", admin),
+        patch.object(
+            database, "db", MagicMock(_database_string="projects/p/databases/d")
+        ),
+        patch.dict("os.environ", clear=False) as environ,
+    ):
+        environ.pop("FIRESTORE_EMULATOR_HOST", None)
+        with patch.object(database.settings, "ENVIRONMENT", "local"):
+            asyncio.run(database.create_indexes())
+        with (
+            patch.object(database.settings, "ENVIRONMENT", "production"),
+            pytest.raises(RuntimeError),
+        ):
+            asyncio.run(database.create_indexes())
+
+
+class _RecordingQuery:
+    """Records the filters and sort of a query, which matches nothing."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, str, Any]] = []
+
+    def where(self, *, filter: Any) -> "_RecordingQuery":
+        self.calls.append(("where", filter.field_path, filter.op_string))
+        return self
+
+    def order_by(self, field: str, direction: str) -> "_RecordingQuery":
+        self.calls.append(("order_by", field, direction))
+        return self
+
+    def offset(self, offset: int) -> "_RecordingQuery":
+        return self
+
+    def limit(self, limit: int) -> "_RecordingQuery":
+        return self
+
+    def count(self) -> MagicMock:
+        return MagicMock(get=MagicMock(return_value=[[MagicMock(value=0)]]))
+
+    def stream(self) -> list[Any]:
+        return []
+
+
+BOUND = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "fields, start, end",
+    [
+        (fields, start, end)
+        for n in range(len(SALES_FILTERS) + 1)
+        for fields in itertools.combinations(SALES_FILTERS, n)
+        for start, end in itertools.product([None, BOUND], repeat=2)
+    ],
+)
+def test_read_sales_queries_are_covered_by_indexes(
+    fields: tuple[str, ...], start: datetime | None, end: datetime | None
+) -> None:
+    query = _RecordingQuery()
+    db = MagicMock(collection=MagicMock(return_value=query))
+
+    asyncio.run(
+        read_sales(
+            db=db,
+            current_user=MagicMock(),
+            skip=0,
+            limit=10,
+            start=start,
+            end=end,
+            **{field: f"{field}-value" for field in fields},
+        )
+    )
+
+    ranges = [op for op, bound in ((">=", start), ("<", end)) if bound is not None]
+    assert query.calls == [
+        *(("where", field, "==") for field in fields),
+        *(("where", "created_at", op) for op in ranges),
+        ("order_by", "created_at", firestore.Query.DESCENDING),
+    ]
+    # Equality filters sorted by created_at need one composite index per
+    # filtered field; the sort alone uses the automatic single-field index
+    for field in fields:
+        index = CompositeIndex(
+            "sales", ((field, "ASCENDING"), ("created_at", "DESCENDING"))
+        )
+        assert index in INDEXES
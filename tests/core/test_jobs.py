@@ -0,0 +1,124 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from app.core import jobs
+from app.core.jobs import CascadeDeleteRunner
+from app.models import CascadeStep
+
+STEP = CascadeStep(collection="items", field="owner_id", value="user-1")
+
+
+def _db(matching: int) -> MagicMock:
+    """A database with ``matching`` documents, served a page at a time."""
+    db = MagicMock()
+    remaining = [matching]
+
+    def stream() -> list[MagicMock]:
+        page = min(remaining[0], jobs.MAX_BATCH_WRITES)
+        return [MagicMock() for _ in range(page)]
+
+    def commit() -> None:
+        remaining[0] -= min(remaining[0], jobs.MAX_BATCH_WRITES)
+
+    query = db.collection.return_value.where.return_value
+    query.select.return_value.limit.return_value.stream.side_effect = stream
+    db.batch.return_value.commit.side_effect = commit
+    return db
+
+
+def _submit(runner: CascadeDeleteRunner, db: MagicMock) -> dict:
+    async def run() -> dict:
+        job = runner.submit(db, "delete_user", [STEP])
+        await asyncio.wait(runner._tasks.values())
+        return job
+
+    return asyncio.run(run())
+
+
+def test_deletes_in_batches_and_tracks_progress() -> None:
+    db = _db(1_200)
+    runner = CascadeDeleteRunner()
+    with patch.object(jobs, "BATCH_INTERVAL", 0):
+        job = _submit(runner, db)
+
+    assert job["status"] == "running"
+    assert job["deleted"] == {"items": 0}
+    assert db.batch.return_value.commit.call_count == 3
+    updates = db.collection.return_value.document.return_value.update.call_args_list
+    increments = [
+        update.args[0]["deleted.items"].value
+        for update in updates
+        if "deleted.items" in update.args[0]
+    ]
+    assert increments == [500, 500, 200]
+    assert updates[-1].args[0]["status"] == "completed"
+
+
+def test_failed_job_records_error() -> None:
+    db = _db(10)
+    db.batch.return_value.commit.side_effect = RuntimeError("quota exceeded")
+    _submit(CascadeDeleteRunner(), db)
+
+    update = db.collection.return_value.document.return_value.update.call_args
+    assert update.args[0]["status"] == "failed"
+    assert update.args[0]["error"] == "quota exceeded"
+
+
+def _job(job_id: str, age: float) -> MagicMock:
+    snapshot = MagicMock(id=job_id)
+    snapshot.reference.id = job_id
+    data = {
+        "status": "running",
+        "updated_at": datetime.now(timezone.utc) - timedelta(seconds=age),
+        "steps": [dict(STEP)],
+    }
+    snapshot.get.side_effect = data.__getitem__
+    snapshot.reference.get.return_value = snapshot
+    return snapshot
+
+
+def test_start_resumes_only_abandoned_jobs() -> None:
+    db = _db(0)
+    fresh, abandoned = _job("fresh", 0), _job("abandoned", jobs.LEASE_SECONDS + 1)
+    db.collection.return_value.where.return_value.stream.return_value = [
+        fresh,
+        abandoned,
+    ]
+    runner = CascadeDeleteRunner()
+
+    async def run() -> int:
+        runner.start(db)
+        resumed = len(runner)
+        await asyncio.wait(runner._tasks.values())
+        await runner.stop()
+        return resumed
+
+    assert asyncio.run(run()) == 1
+    fresh.reference.update.assert_not_called()
+    assert abandoned.reference.update.call_args.args[0]["status"] == "completed"
+
+
+def test_jobs_abandoned_later_are_resumed_by_running_workers() -> None:
+    db = _db(0)
+    jobs_running: list[MagicMock] = []
+    db.collection.return_value.where.return_value.stream.side_effect = (
+        lambda: list(jobs_running)
+    )
+    abandoned = _job("abandoned", jobs.LEASE_SECONDS + 1)
+    runner = CascadeDeleteRunner()
+
+    async def run() -> None:
+        with patch.object(jobs, "RESUME_INTERVAL", 0.01):
+            runner.start(db)
+            assert len(runner) == 0
+            # Another worker dies after this one started
+            jobs_running.append(abandoned)
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if abandoned.reference.update.called:
+                    break
+            await runner.stop()
+
+    asyncio.run(run())
+    assert abandoned.reference.update.call_args.args[0]["status"] == "completed"
@@ -0,0 +1,41 @@
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import latency, metrics
+from app.core.latency import LatencyHistogram
+from app.main import custom_generate_unique_id
+
+
+def test_histogram_quantiles() -> None:
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.observe(ms / 1000)
+
+    # Buckets grow by 25%, so estimates are within one bucket of the truth
+    assert 0.040 <= histogram.quantile(0.50) <= 0.063
+    assert 0.076 <= histogram.quantile(0.95) <= 0.119
+    assert histogram.quantile(0.99) <= 0.125
+    assert LatencyHistogram().quantile(0.5) == 0.0
+
+
+def test_slow_requests_are_captured() -> None:
+    latency.reset()
+    app = FastAPI(generate_unique_id_function=custom_generate_unique_id)
+    app.add_middleware(latency.LatencyMiddleware)
+    app.add_middleware(metrics.FirestoreMetricsMiddleware)
+
+    @app.get("/sales", tags=["sales"])
+    async def read_sales() -> dict[str, str]:
+        latency.identify_user("user-1")
+        return {}
+
+    with patch("app.core.config.settings.SLOW_REQUEST_THRESHOLD_MS", 0):
+        TestClient(app).get("/sales")
+
+    assert latency.percentiles()["sales-read_sales"]["count"] == 1
+    [record] = latency.slow_requests
+    assert record["route"] == "sales-read_sales"
+    assert record["user_id"] == "user-1"
+    assert record["status_code"] == 200
@@ -0,0 +1,28 @@
+import asyncio
+import time
+
+from app.core.loop_monitor import LoopMonitor
+
+
+def _blocking_call() -> None:
+    time.sleep(0.3)
+
+
+def test_blocking_call_is_detected() -> None:
+    monitor = LoopMonitor()
+    monitor.interval = 0.01
+    monitor.threshold = 0.05
+
+    async def run() -> None:
+        monitor.start(capture_stacks=True)
+        await asyncio.sleep(0.05)
+        _blocking_call()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    asyncio.run(run())
+
+    report = monitor.report()
+    assert report["blocked_total"] >= 1
+    assert report["max_ms"] >= 200
+    assert any("_blocking_call" in block["stack"] for block in report["blocks"])
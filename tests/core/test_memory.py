@@ -0,0 +1,44 @@
+from app.core import memory
+
+
+def test_snapshot_diff_shows_new_allocations() -> None:
+    try:
+        baseline = memory.take_snapshot(limit=10)
+        retained = [bytearray(1024) for _ in range(2000)]
+        after = memory.take_snapshot(limit=10)
+
+        top = memory.compare_snapshots(baseline["id"], after["id"], limit=5)
+        assert top is not None
+        assert top[0]["location"].startswith(__file__)
+        assert top[0]["size_diff_bytes"] >= 1024 * 2000
+        assert after["traced_bytes"] > baseline["traced_bytes"]
+        del retained
+    finally:
+        memory.stop_tracing()
+
+
+def test_compare_unknown_snapshot() -> None:
+    try:
+        snapshot = memory.take_snapshot(limit=1)
+        assert memory.compare_snapshots(snapshot["id"], "missing", limit=1) is None
+    finally:
+        memory.stop_tracing()
+    assert memory.snapshot_ids() == []
+
+
+def test_only_recent_snapshots_kept() -> None:
+    try:
+        ids = [memory.take_snapshot(limit=1)["id"] for _ in range(memory.MAX_SNAPSHOTS + 2)]
+        assert memory.snapshot_ids() == ids[-memory.MAX_SNAPSHOTS :]
+    finally:
+        memory.stop_tracing()
+
+
+def test_cache_sizes() -> None:
+    entries = {"a": 1, "b": 2}
+    memory.register_cache("test.entries", lambda: len(entries))
+    assert memory.cache_sizes()["test.entries"] == 2
+    # Registered by the diagnostics modules themselves
+    import app.core.latency  # noqa: F401
+
+    assert "latency.histograms" in memory.cache_sizes()
@@ -0,0 +1,73 @@
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.core.metrics import FirestoreMetricsMiddleware, OperationStats
+from app.main import app as main_app
+from app.main import custom_generate_unique_id
+from tests.utils.firestore import auth_headers
+
+
+def _app() -> FastAPI:
+    app = FastAPI(generate_unique_id_function=custom_generate_unique_id)
+    app.add_middleware(FirestoreMetricsMiddleware)
+
+    @app.get("/products", tags=["products"])
+    async def read_products() -> dict[str, str]:
+        metrics._record(OperationStats(calls=2, reads=101, documents=100))
+        return {}
+
+    return app
+
+
+def test_operations_are_attributed_to_route() -> None:
+    metrics.reset()
+    client = TestClient(_app())
+
+    r = client.get("/products")
+    client.get("/products")
+
+    assert r.headers["x-firestore-reads"] == "101"
+    stats = metrics.snapshot()["products-read_products"]
+    assert stats.reads == 202
+    assert stats.documents == 200
+
+
+def test_render_prometheus() -> None:
+    metrics.reset()
+    metrics.record_request("products-read_products", OperationStats(calls=1, reads=3))
+
+    body = metrics.render_prometheus()
+
+    assert 'http_requests_total{route="products-read_products"} 1' in body
+    assert 'firestore_reads_total{route="products-read_products"} 3' in body
+    assert "# TYPE firestore_call_seconds summary" in body
+
+
+def test_metrics_endpoint_accepts_scrape_token() -> None:
+    client = TestClient(main_app)
+
+    with patch("app.core.config.settings.METRICS_TOKEN", "scrape-token"):
+        missing = client.get("/metrics")
+        wrong = client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+        response = client.get(
+            "/metrics", headers={"Authorization": "Bearer scrape-token"}
+        )
+
+    assert missing.status_code == 401
+    assert wrong.status_code == 403
+    assert response.status_code == 200
+    assert "firestore" in response.text
+
+
+def test_metrics_endpoint_requires_superuser() -> None:
+    client = TestClient(main_app)
+
+    with patch("app.core.config.settings.METRICS_TOKEN", None):
+        user = client.get("/metrics", headers=auth_headers("u", superuser=False))
+        superuser = client.get("/metrics", headers=auth_headers())
+
+    assert user.status_code == 403
+    assert superuser.status_code == 200
@@ -0,0 +1,45 @@
+import time
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.profiler import ProfilingMiddleware, SamplingProfiler, get_request_profile
+
+
+def _busy_loop(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampling_profiler_collapsed_stacks() -> None:
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    _busy_loop(0.2)
+    collapsed = profiler.stop()
+
+    busy = [line for line in collapsed.splitlines() if "_busy_loop" in line]
+    assert busy
+    stack, count = busy[0].rsplit(" ", 1)
+    assert stack.startswith("MainThread;")
+    assert int(count) > 0
+
+
+def test_request_profiled_with_token() -> None:
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get("/busy")
+    async def busy() -> dict[str, str]:
+        _busy_loop(0.05)
+        return {}
+
+    client = TestClient(app)
+    with patch("app.core.config.settings.PROFILING_TOKEN", "secret"):
+        assert "x-profile-id" not in client.get("/busy").headers
+        assert "x-profile-id" not in client.get("/busy", headers={"X-Profile": "x"}).headers
+        r = client.get("/busy", headers={"X-Profile": "secret"})
+
+    profile = get_request_profile(r.headers["x-profile-id"])
+    assert profile is not None
@@ -0,0 +1,79 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.api.deps import get_db
+from app.api.routes import login
+from app.core import rate_limit
+from app.core.rate_limit import LoginRateLimiter, MemoryBucketStore, client_ip
+
+
+def test_bucket_allows_burst_then_refills() -> None:
+    store = MemoryBucketStore()
+    with patch.object(rate_limit.time, "monotonic", return_value=100.0):
+        assert [store.take("k", 3, 1.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert store.take("k", 3, 1.0) == 1.0
+    with patch.object(rate_limit.time, "monotonic", return_value=101.0):
+        assert store.take("k", 3, 1.0) == 0.0
+        assert store.take("k", 3, 1.0) > 0
+
+
+def test_full_buckets_are_swept() -> None:
+    store = MemoryBucketStore()
+    with patch.object(rate_limit.time, "monotonic", return_value=0.0):
+        for n in range(10):
+            store.take(f"client-{n}", 5, 1.0)
+    assert len(store) == 10
+    with (
+        patch.object(rate_limit, "SWEEP_INTERVAL", 1),
+        patch.object(rate_limit.time, "monotonic", return_value=60.0),
+    ):
+        store.take("client-0", 5, 1.0)
+    assert len(store) == 1
+
+
+def test_account_limit_ignores_case_and_ip() -> None:
+    limiter = LoginRateLimiter(MemoryBucketStore())
+    with (
+        patch.object(rate_limit.settings, "LOGIN_RATE_LIMIT_ACCOUNT_BURST", 2),
+        patch.object(rate_limit.time, "monotonic", return_value=0.0),
+    ):
+        assert limiter.check("10.0.0.1", "ana@example.com") == 0
+        assert limiter.check("10.0.0.2", " Ana@Example.com") == 0
+        assert limiter.check("10.0.0.3", "ANA@example.com") > 0
+        assert limiter.check("10.0.0.3", "luis@example.com") == 0
+
+
+def test_client_ip_trusts_only_proxy_hops() -> None:
+    request = Request(
+        {
+            "type": "http",
+            "headers": [(b"x-forwarded-for", b"6.6.6.6, 1.2.3.4, 10.0.0.1")],
+            "client": ("169.254.1.1", 1234),
+        }
+    )
+    assert client_ip(request) == "169.254.1.1"
+    with patch.object(rate_limit.settings, "FORWARDED_PROXY_HOPS", 2):
+        assert client_ip(request) == "1.2.3.4"
+
+
+def test_throttled_login_skips_password_check() -> None:
+    app = FastAPI()
+    app.include_router(login.router)
+    app.dependency_overrides[get_db] = lambda: MagicMock()
+    client = TestClient(app)
+    authenticate = AsyncMock(return_value=None)
+    with (
+        patch.object(rate_limit, "_memory_store", MemoryBucketStore()),
+        patch.object(rate_limit.settings, "LOGIN_RATE_LIMIT_ACCOUNT_BURST", 1),
+        patch.object(login.crud, "authenticate", authenticate),
+    ):
+        form = {"username": "ana@example.com", "password": "wrong"}
+        assert client.post("/login/access-token", data=form).status_code == 400
+        response = client.post("/login/access-token", data=form)
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert authenticate.await_count == 1
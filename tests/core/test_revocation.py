@@ -0,0 +1,117 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.deps import get_current_user
+from app.core import security
+from app.core.revocation import BloomFilter, RevocationList, revocations
+
+
+def test_bloom_filter_has_no_false_negatives() -> None:
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [uuid.uuid4().hex for _ in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10_000))
+    assert false_positives < 300
+
+
+def test_revoked_token_and_user() -> None:
+    revoked = RevocationList(capacity=4)
+    db = MagicMock()
+    now = time.time()
+
+    revoked.revoke_token(db, "jti-1", now + 60)
+    assert revoked.is_revoked("jti-1", "user-1", now)
+    assert not revoked.is_revoked("jti-2", "user-1", now)
+
+    revoked.revoke_user(db, "user-2")
+    assert revoked.is_revoked("jti-3", "user-2", now - 1)
+    assert not revoked.is_revoked("jti-4", "user-2", time.time() + 1)
+    assert db.collection.return_value.document.call_count == 2
+
+
+def test_filter_grows_and_drops_expired_tokens() -> None:
+    revoked = RevocationList(capacity=4)
+    now = time.time()
+    expired_at = datetime.fromtimestamp(now - 1, timezone.utc)
+    revoked.apply({"kind": "token", "jti": "expired", "expires_at": expired_at})
+    for n in range(10):
+        revoked.apply(
+            {
+                "kind": "token",
+                "jti": f"jti-{n}",
+                "expires_at": datetime.fromtimestamp(now + 60, timezone.utc),
+            }
+        )
+
+    assert all(revoked.is_revoked(f"jti-{n}", "user", now) for n in range(10))
+    assert not revoked.is_revoked("expired", "user", now)
+
+
+def test_snapshot_changes_are_applied() -> None:
+    revoked = RevocationList()
+    change = MagicMock()
+    change.type.name = "ADDED"
+    change.document.to_dict.return_value = {
+        "kind": "user",
+        "user_id": "user-1",
+        "not_before": datetime.now(timezone.utc),
+    }
+
+    revoked._on_snapshot([], [change], None)
+
+    assert revoked.is_revoked("jti", "user-1", time.time() - 5)
+
+
+def _token(user_id: str) -> str:
+    return security.create_access_token(
+        user_id,
+        expires_delta=timedelta(minutes=5),
+        claims={"email": "user@example.com", "superuser": True, "name": "User"},
+    )
+
+
+def test_current_user_from_token_claims() -> None:
+    user = asyncio.run(get_current_user(_token("user-claims")))
+
+    assert user.id == "user-claims"
+    assert user.email == "user@example.com"
+    assert user.is_superuser
+
+
+def test_current_user_rejects_revoked_token() -> None:
+    token = _token("user-revoked")
+    revocations.revoke_user(MagicMock(), "user-revoked")
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(get_current_user(token))
+    assert exc_info.value.status_code == 401
+
+
+def test_start_fails_without_initial_snapshot() -> None:
+    revoked = RevocationList()
+    db = MagicMock()
+
+    with pytest.raises(RuntimeError):
+        revoked.start(db, timeout=0.01)
+
+    watch = db.collection.return_value.where.return_value.on_snapshot.return_value
+    watch.unsubscribe.assert_called_once()
+
+
+def test_start_returns_once_loaded() -> None:
+    revoked = RevocationList()
+    db = MagicMock()
+    query = db.collection.return_value.where.return_value
+    query.on_snapshot.side_effect = lambda callback: callback([], [], None)
+
+    revoked.start(db, timeout=0.01)
+    revoked.stop()
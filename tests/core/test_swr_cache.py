@@ -0,0 +1,51 @@
+import asyncio
+from unittest.mock import patch
+
+from app.core import swr_cache
+from app.core.swr_cache import StaleWhileRevalidateCache
+
+
+def test_concurrent_misses_share_one_load() -> None:
+    cache: StaleWhileRevalidateCache[int] = StaleWhileRevalidateCache(5, 60)
+    loads = []
+
+    async def load() -> int:
+        loads.append(1)
+        await asyncio.sleep(0)
+        return len(loads)
+
+    async def run() -> list[int]:
+        return await asyncio.gather(*(cache.get(load) for _ in range(5)))
+
+    assert len(cache) == 0
+    assert asyncio.run(run()) == [1, 1, 1, 1, 1]
+    assert len(loads) == 1
+    assert len(cache) == 1
+
+
+def test_stale_value_is_served_while_reloading() -> None:
+    cache: StaleWhileRevalidateCache[str] = StaleWhileRevalidateCache(5, 60)
+    values = iter(["first", "second", "third"])
+
+    async def load() -> str:
+        return next(values)
+
+    async def get_at(now: float) -> str:
+        with patch.object(swr_cache.time, "monotonic", return_value=now):
+            value = await cache.get(load)
+            await asyncio.sleep(0)
+            return value
+
+    async def run() -> list[str]:
+        return [
+            await get_at(0.0),
+            # Fresh, no reload
+            await get_at(4.0),
+            # Stale: served as is, reloaded in the background
+            await get_at(10.0),
+            await get_at(11.0),
+            # Too old: waits for a reload
+            await get_at(100.0),
+        ]
+
+    assert asyncio.run(run()) == ["first", "first", "first", "second", "third"]
@@ -0,0 +1,68 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+from app import crud
+from app.api.routes import inventory
+from app.core import document_cache
+from app.core.document_cache import DocumentCache
+from app.models import InventoryAdjustmentCreate
+
+
+def _snapshot(doc_id: str, exists: bool = True) -> MagicMock:
+    snapshot = MagicMock(id=doc_id, exists=exists)
+    snapshot.to_dict.return_value = {"name": f"Product {doc_id}"}
+    return snapshot
+
+
+def test_get_documents_reads_misses_once_and_keeps_order() -> None:
+    cache = DocumentCache()
+    cache.put("products", "b", {"_id": "b", "name": "Cached"})
+    db = MagicMock()
+    db.collection.return_value.document.side_effect = lambda doc_id: doc_id
+    db.get_all.side_effect = lambda refs: [
+        _snapshot(doc_id, exists=doc_id != "gone") for doc_id in refs
+    ]
+
+    with patch.object(crud, "document_cache", cache):
+        documents = crud.get_documents(db, "products", ["c", "b", "gone", "a", "c"])
+        again = crud.get_documents(db, "products", ["a", "c"])
+
+    assert [document["_id"] for document in documents] == ["c", "b", "a"]
+    assert documents[1]["name"] == "Cached"
+    db.get_all.assert_called_once_with(["c", "gone", "a"])
+    assert again == [documents[2], documents[0]]
+
+
+def test_cache_entries_expire_and_are_evicted() -> None:
+    cache = DocumentCache(maxsize=2)
+    with patch.object(document_cache.time, "monotonic", return_value=0.0):
+        cache.put("items", "a", {"_id": "a"})
+        cache.put("items", "b", {"_id": "b"})
+        cache.put("items", "c", {"_id": "c"})
+        assert cache.get("items", "a") is None
+        cache.evict("items", "b")
+        assert cache.get("items", "b") is None
+    with patch.object(document_cache.time, "monotonic", return_value=3600.0):
+        assert cache.get("items", "c") is None
+
+
+def test_adjustments_evict_cached_items() -> None:
+    cache = DocumentCache()
+    cache.put("items", "flour", {"_id": "flour", "stock_quantity": 1})
+    db = MagicMock()
+    db.collection.return_value.document.return_value.id = "adjustment"
+    item = db.collection.return_value.document.return_value.get.return_value
+    item.to_dict.return_value = {"title": "Flour", "stock_quantity": 1}
+    adjustment_in = InventoryAdjustmentCreate(
+        item_id="flour", adjustment_type="add", quantity=2
+    )
+
+    with patch.object(inventory, "document_cache", cache):
+        adjustment = asyncio.run(
+            inventory.create_adjustment(
+                db=db, current_user=MagicMock(id="user"), adjustment_in=adjustment_in
+            )
+        )
+
+    assert adjustment.new_quantity == 3
+    assert cache.get("items", "flour") is None
@@ -0,0 +1,91 @@
+import asyncio
+from unittest.mock import MagicMock
+
+from app import crud
+from app.api.routes import items, products
+from app.models import ItemCreate, ProductCreate
+
+
+def _write(db: MagicMock, *, was_low: bool, quantity: float, reorder_point: float | None):
+    return crud.low_stock_write(
+        db,
+        kind="item",
+        ref_id="flour",
+        name="Flour",
+        was_low=was_low,
+        quantity=quantity,
+        reorder_point=reorder_point,
+    )
+
+
+def test_low_stock_write_when_crossing_below() -> None:
+    db = MagicMock()
+    operation, reference, data = _write(db, was_low=False, quantity=2, reorder_point=5)
+    assert operation == "set"
+    db.collection.assert_called_with("low_stock")
+    db.collection.return_value.document.assert_called_with("item-flour")
+    assert data["stock_quantity"] == 2
+    assert data["reorder_point"] == 5
+
+
+def test_low_stock_write_when_crossing_above() -> None:
+    db = MagicMock()
+    operation, _, data = _write(db, was_low=True, quantity=8, reorder_point=5)
+    assert operation == "delete"
+    assert data is None
+
+
+def test_low_stock_write_skipped_above_threshold() -> None:
+    assert _write(MagicMock(), was_low=False, quantity=8, reorder_point=5) is None
+    assert _write(MagicMock(), was_low=False, quantity=0, reorder_point=None) is None
+
+
+def _database() -> MagicMock:
+    db = MagicMock()
+    db.collection.return_value.document.return_value.id = "new"
+    return db
+
+
+def _committed(db: MagicMock) -> list:
+    batch = db.batch.return_value
+    return [call.args for call in batch.set.call_args_list]
+
+
+def test_product_created_below_reorder_point_is_low() -> None:
+    db = _database()
+    product_in = ProductCreate(name="Bread", price=2, stock_quantity=3, reorder_point=5)
+
+    product = asyncio.run(
+        products.create_product(db=db, current_user=MagicMock(), product_in=product_in)
+    )
+
+    (_, product_data), (_, alert) = _committed(db)
+    assert product_data["name"] == "Bread"
+    assert product.id == alert["ref_id"] == "new"
+    assert alert["stock_quantity"] == 3
+
+
+def test_item_created_with_reorder_point_is_low() -> None:
+    db = _database()
+    current_user = MagicMock(id="user")
+
+    asyncio.run(
+        items.create_item(
+            db=db,
+            current_user=current_user,
+            item_in=ItemCreate(title="Flour", reorder_point=1),
+        )
+    )
+    asyncio.run(
+        items.create_item(
+            db=db, current_user=current_user, item_in=ItemCreate(title="Salt")
+        )
+    )
+
+    written = [data for _, data in _committed(db)]
+    assert [data.get("title", data.get("name")) for data in written] == [
+        "Flour",
+        "Flour",
+        "Salt",
+    ]
+    assert written[1]["stock_quantity"] == 0
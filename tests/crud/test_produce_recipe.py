@@ -0,0 +1,133 @@
+import asyncio
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.routes.recipes import produce_recipe
+from app.core.document_cache import document_cache
+
+
+class _Database:
+    """Just enough of a Firestore client for producing a recipe."""
+
+    def __init__(self, docs: dict[tuple[str, str], dict[str, Any]]) -> None:
+        self.docs = docs
+        self.created: list[dict[str, Any]] = []
+        self.transaction = MagicMock(return_value=MagicMock())
+        writer = self.transaction.return_value
+        writer.set.side_effect = self._set
+        writer.update.side_effect = lambda ref, data: self.docs[ref.key].update(data)
+        writer.delete.side_effect = lambda ref: self.docs.pop(ref.key, None)
+
+    def _set(self, ref: Any, data: dict[str, Any]) -> None:
+        if ref.key[0] == "inventory_adjustments":
+            self.created.append(data)
+        self.docs[ref.key] = dict(data)
+
+    def _snapshot(self, ref: Any) -> MagicMock:
+        data = self.docs.get(ref.key)
+        snapshot = MagicMock(exists=data is not None, id=ref.id, reference=ref)
+        snapshot.to_dict.return_value = dict(data or {})
+        return snapshot
+
+    def get_all(self, refs: list[Any], transaction: Any = None) -> list[MagicMock]:
+        return [self._snapshot(ref) for ref in refs]
+
+    def collection(self, name: str) -> MagicMock:
+        def document(doc_id: str | None = None) -> MagicMock:
+            doc_id = doc_id or f"new-{len(self.created)}"
+            ref = MagicMock(id=doc_id, key=(name, doc_id), path=f"{name}/{doc_id}")
+            ref.get.side_effect = lambda transaction=None: self._snapshot(ref)
+            return ref
+
+        return MagicMock(document=document)
+
+
+def _database(yield_quantity: float = 2, flour: float = 10) -> _Database:
+    return _Database(
+        {
+            ("recipes", "bread"): {
+                "name": "Bread",
+                "product_id": "loaf",
+                "yield_quantity": yield_quantity,
+                "ingredients": [
+                    {"item_id": "flour", "quantity": 1.5, "unit": "kg"},
+                    {"item_id": "water", "quantity": 1, "unit": "l"},
+                    {"item_id": "flour", "quantity": 0.5, "unit": "kg"},
+                ],
+            },
+            ("products", "loaf"): {"name": "Loaf", "price": 3, "stock_quantity": 1},
+            ("items", "flour"): {"title": "Flour", "stock_quantity": flour},
+            ("items", "water"): {"title": "Water", "stock_quantity": 5},
+        }
+    )
+
+
+def _produce(db: _Database, batches: int) -> Any:
+    return asyncio.run(
+        produce_recipe(
+            db=db, current_user=MagicMock(id="baker"), id="bread", batches=batches
+        )
+    )
+
+
+def test_produce_consumes_repeated_ingredient_once_per_item() -> None:
+    db = _database()
+
+    production = _produce(db, batches=3)
+
+    # Both flour lines are consumed together: (1.5 + 0.5) * 3
+    assert db.docs[("items", "flour")]["stock_quantity"] == 4
+    assert db.docs[("items", "water")]["stock_quantity"] == 2
+    assert db.docs[("products", "loaf")]["stock_quantity"] == 7
+    assert production.produced_quantity == 6
+
+
+def test_produce_writes_one_ledger_entry_per_item() -> None:
+    db = _database()
+
+    production = _produce(db, batches=1)
+
+    entries = {entry["item_id"]: entry for entry in db.created}
+    assert set(entries) == {"flour", "water"}
+    assert entries["flour"]["adjustment_type"] == "remove"
+    assert entries["flour"]["quantity"] == 2
+    assert entries["flour"]["previous_quantity"] == 10
+    assert entries["flour"]["new_quantity"] == 8
+    assert entries["water"]["user_id"] == "baker"
+    assert len(production.adjustments) == 2
+
+
+def test_produce_without_enough_stock_writes_nothing() -> None:
+    db = _database(flour=3)
+
+    with pytest.raises(HTTPException) as raised:
+        _produce(db, batches=2)
+
+    assert raised.value.status_code == 400
+    assert db.docs[("items", "flour")]["stock_quantity"] == 3
+    assert db.docs[("products", "loaf")]["stock_quantity"] == 1
+    assert db.created == []
+
+
+def test_produce_refuses_fractional_product_stock() -> None:
+    db = _database(yield_quantity=1.5)
+
+    with pytest.raises(HTTPException) as raised:
+        _produce(db, batches=1)
+
+    assert raised.value.status_code == 400
+    assert _produce(db, batches=2).produced_quantity == 3
+
+
+def test_produce_evicts_cached_stock() -> None:
+    db = _database()
+    document_cache.put("products", "loaf", {"_id": "loaf", "stock_quantity": 1})
+    document_cache.put("items", "flour", {"_id": "flour", "stock_quantity": 10})
+
+    _produce(db, batches=1)
+
+    assert document_cache.get("products", "loaf") is None
+    assert document_cache.get("items", "flour") is None
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from app import crud
+from app.core import security
+
+
+def _snapshot(data: dict | None) -> MagicMock:
+    snapshot = MagicMock(exists=data is not None)
+    snapshot.to_dict.return_value = data
+    snapshot.get.side_effect = lambda field: data[field]
+    return snapshot
+
+
+def _db(stored: dict | None, user: dict | None = None) -> MagicMock:
+    db = MagicMock()
+    tokens = MagicMock()
+    users = MagicMock()
+    db.collection.side_effect = lambda name: tokens if name == "refresh_tokens" else users
+    tokens.document.return_value.get.return_value = _snapshot(stored)
+    users.document.return_value.get.return_value = _snapshot(
+        user or {"email": "user@example.com", "is_active": True}
+    )
+    users.document.return_value.get.return_value.id = "user-1"
+    return db
+
+
+def _stored(secret_hash: bytes, **overrides: object) -> dict:
+    return {
+        "user_id": "user-1",
+        "family_id": "family-1",
+        "secret_hash": secret_hash,
+        "expires_at": datetime.now(timezone.utc) + timedelta(days=1),
+        "rotated_at": None,
+        **overrides,
+    }
+
+
+def test_split_refresh_token() -> None:
+    token_id, token, secret_hash = security.create_refresh_token()
+    assert security.split_refresh_token(token) == (token_id, secret_hash)
+    assert security.split_refresh_token("no-secret") is None
+
+
+def test_rotate_refresh_token() -> None:
+    _, token, secret_hash = security.create_refresh_token()
+    db = _db(_stored(secret_hash))
+    transaction = db.transaction.return_value
+
+    user, new_token = crud.rotate_refresh_token(db, token)
+
+    assert user.id == "user-1"
+    assert user.email == "user@example.com"
+    assert new_token != token
+    transaction.update.assert_called_once()
+    (new_ref, data), _ = transaction.set.call_args
+    assert data["family_id"] == "family-1"
+    assert data["secret_hash"] == security.split_refresh_token(new_token)[1]
+
+
+def test_rotate_rejects_wrong_secret_and_expired_token() -> None:
+    _, token, secret_hash = security.create_refresh_token()
+    _, other_token, _ = security.create_refresh_token()
+    assert crud.rotate_refresh_token(_db(_stored(secret_hash)), other_token) is None
+
+    expired = _stored(secret_hash, expires_at=datetime.now(timezone.utc))
+    assert crud.rotate_refresh_token(_db(expired), token) is None
+
+
+def test_rotate_rejects_inactive_user() -> None:
+    _, token, secret_hash = security.create_refresh_token()
+    db = _db(_stored(secret_hash), user={"is_active": False})
+    assert crud.rotate_refresh_token(db, token) is None
+
+
+def test_reused_token_revokes_family() -> None:
+    _, token, secret_hash = security.create_refresh_token()
+    db = _db(_stored(secret_hash, rotated_at=datetime.now(timezone.utc)))
+    transaction = db.transaction.return_value
+    members = [MagicMock(), MagicMock()]
+    transaction.get.return_value = members
+
+    assert crud.rotate_refresh_token(db, token) is None
+    assert [c.args[0] for c in transaction.delete.call_args_list] == [
+        member.reference for member in members
+    ]
+    transaction.set.assert_not_called()
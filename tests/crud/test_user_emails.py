@@ -0,0 +1,107 @@
+import asyncio
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app import crud
+from app.models import UserCreate, UserUpdate
+
+
+class _Database:
+    """Just enough of a Firestore client for the user functions."""
+
+    def __init__(self) -> None:
+        self.docs: dict[tuple[str, str], dict[str, Any]] = {}
+        self.transaction = MagicMock(return_value=MagicMock())
+        writer = self.transaction.return_value
+        writer.create.side_effect = self._create
+        writer.update.side_effect = lambda ref, data: self.docs[ref.key].update(data)
+        writer.delete.side_effect = lambda ref: self.docs.pop(ref.key, None)
+
+    def _create(self, ref: Any, data: dict[str, Any]) -> None:
+        assert ref.key not in self.docs
+        self.docs[ref.key] = dict(data)
+
+    def _snapshot(self, key: tuple[str, str]) -> MagicMock:
+        data = self.docs.get(key)
+        snapshot = MagicMock(exists=data is not None, id=key[1])
+        snapshot.to_dict.return_value = dict(data or {})
+        snapshot.get.side_effect = lambda field: data[field]
+        return snapshot
+
+    def collection(self, name: str) -> MagicMock:
+        def document(doc_id: str = "new-user") -> MagicMock:
+            ref = MagicMock(id=doc_id, key=(name, doc_id))
+            ref.get.side_effect = lambda transaction=None: self._snapshot(ref.key)
+            return ref
+
+        return MagicMock(document=document)
+
+
+def _create(db: _Database, email: str) -> Any:
+    user_in = UserCreate(email=email, password="password123")
+    with patch.object(crud, "get_password_hash", return_value="hash"):
+        return asyncio.run(crud.create_user(db, user_in))
+
+
+def test_create_user_indexes_normalized_email() -> None:
+    db = _Database()
+    user = _create(db, "Ana@Example.com")
+
+    assert db.docs[("user_emails", "ana@example.com")] == {"user_id": user.id}
+    found = asyncio.run(crud.get_user_by_email(db, " ANA@example.com"))
+    assert found is not None and found.id == user.id
+
+
+def test_duplicate_email_is_rejected() -> None:
+    db = _Database()
+    _create(db, "ana@example.com")
+    with pytest.raises(crud.EmailAlreadyRegisteredError):
+        _create(db, "ANA@example.com")
+
+
+def test_update_user_moves_email_entry() -> None:
+    db = _Database()
+    user = _create(db, "ana@example.com")
+    db.docs[("users", "other")] = {"email": "luis@example.com"}
+    db.docs[("user_emails", "luis@example.com")] = {"user_id": "other"}
+
+    with pytest.raises(crud.EmailAlreadyRegisteredError):
+        asyncio.run(
+            crud.update_user(db, user.id, UserUpdate(email="luis@example.com"))
+        )
+    updated = asyncio.run(
+        crud.update_user(db, user.id, UserUpdate(email="ana.b@example.com"))
+    )
+
+    assert updated is not None and updated.email == "ana.b@example.com"
+    assert ("user_emails", "ana@example.com") not in db.docs
+    assert db.docs[("user_emails", "ana.b@example.com")] == {"user_id": user.id}
+
+
+def test_delete_user_frees_email() -> None:
+    db = _Database()
+    user = _create(db, "ana@example.com")
+
+    assert crud.delete_user(db, user.id)
+    assert not crud.delete_user(db, user.id)
+    assert asyncio.run(crud.get_user_by_email(db, "ana@example.com")) is None
+    _create(db, "ana@example.com")
+
+
+def test_update_user_revokes_tokens_when_privileges_change() -> None:
+    db = _Database()
+    user = _create(db, "ana@example.com")
+
+    with patch.object(crud, "revoke_user_tokens") as revoke:
+        asyncio.run(crud.update_user(db, user.id, UserUpdate(is_superuser=False)))
+        asyncio.run(crud.update_user(db, user.id, UserUpdate(full_name="Ana")))
+        revoke.assert_not_called()
+        updated = asyncio.run(
+            crud.update_user(db, user.id, UserUpdate(is_superuser=True))
+        )
+
+    revoke.assert_called_once_with(db, user.id)
+    assert updated is not None and updated.is_superuser
+    assert db.docs[("users", user.id)]["is_superuser"] is True
@@ -0,0 +1,45 @@
+from collections import Counter
+
+from benchmarks.http_load import METRICS, failed_scenarios, percentile, summarize
+from benchmarks.reporting import compare
+
+
+def test_percentile_nearest_rank() -> None:
+    samples = [float(n) for n in range(1, 101)]
+    assert percentile(samples, 0.50) == 50.0
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile([3.0], 0.99) == 3.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_summarize_counts_errors() -> None:
+    result = summarize([0.01, 0.02, 0.03, 0.04], Counter({200: 3, 500: 1}), 2.0)
+    assert result["requests"] == 4
+    assert result["errors"] == 1
+    assert result["status_codes"] == {"200": 3, "500": 1}
+    assert result["throughput_rps"] == 2.0
+    assert result["max_ms"] == 40.0
+
+
+def test_failed_scenarios_have_errors() -> None:
+    ok = summarize([0.01], Counter({200: 1}), 1.0)
+    failing = summarize([0.01, 0.02], Counter({200: 1, 500: 1}), 1.0)
+
+    assert failed_scenarios({"login_burst": ok, "sale_20_lines": failing}) == [
+        "sale_20_lines"
+    ]
+
+
+def test_compare_reports_relative_change() -> None:
+    before = {"throughput_rps": 100.0, "p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 40.0}
+    after = {"throughput_rps": 50.0, "p50_ms": 20.0, "p95_ms": 20.0, "p99_ms": 40.0}
+    lines = compare(
+        {"scenarios": {"login_burst": before}},
+        {"scenarios": {"login_burst": after, "sales_paging": after}},
+        "scenarios",
+        METRICS,
+    )
+    assert lines == [
+        "login_burst: throughput_rps 50.0 (-50.0%), p50_ms 20.0 (+100.0%), "
+        "p95_ms 20.0 (+0.0%), p99_ms 40.0 (+0.0%)"
+    ]
@@ -0,0 +1,16 @@
+import json
+
+import pytest
+
+from benchmarks.models import CASES
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_case_runs(name: str) -> None:
+    assert CASES[name](3)() is not None
+
+
+def test_sales_response_is_public_json() -> None:
+    body = json.loads(CASES["sales_response"](2)())
+    assert body["count"] == 2
+    assert [sale["_id"] for sale in body["data"]] == ["sale-000000", "sale-000001"]
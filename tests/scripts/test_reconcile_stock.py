@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from app.reconcile_stock import LedgerBreak, StockDrift, find_drift
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _snapshot(doc_id: str, data: dict) -> MagicMock:
+    snapshot = MagicMock(id=doc_id)
+    snapshot.to_dict.return_value = data
+    return snapshot
+
+
+def _partition(*entries: tuple[str, dict]) -> MagicMock:
+    partition = MagicMock()
+    partition.query.return_value.select.return_value.stream.return_value = [
+        _snapshot(doc_id, entry) for doc_id, entry in entries
+    ]
+    return partition
+
+
+def _entry(
+    item_id: str,
+    day: int,
+    adjustment_type: str,
+    quantity: float,
+    previous_quantity: float,
+    new_quantity: float,
+) -> dict:
+    return {
+        "item_id": item_id,
+        "created_at": START + timedelta(days=day),
+        "adjustment_type": adjustment_type,
+        "quantity": quantity,
+        "previous_quantity": previous_quantity,
+        "new_quantity": new_quantity,
+    }
+
+
+def _database(partitions: list[MagicMock], stock: dict[str, float]) -> MagicMock:
+    db = MagicMock()
+    db.collection_group.return_value.get_partitions.return_value = partitions
+    db.collection.return_value.select.return_value.stream.return_value = [
+        _snapshot(item_id, {"stock_quantity": quantity})
+        for item_id, quantity in stock.items()
+    ]
+    return db
+
+
+def test_find_drift_replays_entries_across_partitions() -> None:
+    db = _database(
+        [
+            _partition(
+                ("a3", _entry("flour", 3, "remove", 2, 12, 10)),
+                ("a1", _entry("flour", 1, "add", 5, 0, 5)),
+            ),
+            _partition(
+                ("a2", _entry("flour", 2, "set", 12, 5, 12)),
+                ("b1", _entry("sugar", 1, "add", 2, 0, 2)),
+            ),
+        ],
+        {"flour": 10, "sugar": 3, "salt": 1},
+    )
+
+    drift, breaks = find_drift(db, workers=2)
+
+    assert drift == [StockDrift("sugar", 3, 2), StockDrift("salt", 1, 0)]
+    assert breaks == []
+
+
+def test_find_drift_ignores_stored_new_quantity() -> None:
+    # The request wrote a wrong new_quantity, and the item along with it
+    db = _database(
+        [
+            _partition(
+                ("a1", _entry("flour", 1, "add", 5, 0, 5)),
+                ("a2", _entry("flour", 2, "remove", 2, 5, 4)),
+            )
+        ],
+        {"flour": 4},
+    )
+
+    drift, breaks = find_drift(db, workers=1)
+
+    assert drift == [StockDrift("flour", 4, 3)]
+    assert breaks == []
+
+
+def test_find_drift_reports_ledger_breaks() -> None:
+    # The entry between a1 and a3 was lost
+    db = _database(
+        [
+            _partition(
+                ("a1", _entry("flour", 1, "add", 5, 0, 5)),
+                ("a3", _entry("flour", 3, "add", 1, 8, 9)),
+            )
+        ],
+        {"flour": 9},
+    )
+
+    drift, breaks = find_drift(db, workers=1)
+
+    assert drift == [StockDrift("flour", 9, 6)]
+    assert breaks == [LedgerBreak("flour", "a3", 8, 5)]
@@ -0,0 +1,124 @@
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from app.seed_data import (
+    Volumes,
+    generate_inventory,
+    generate_products,
+    generate_recipes,
+    generate_sales,
+)
+
+START = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+def _db() -> MagicMock:
+    db = MagicMock()
+    db.collection.side_effect = lambda name: MagicMock(
+        document=lambda doc_id=None: (name, doc_id)
+    )
+    return db
+
+
+def test_sales_are_numbered_in_chronological_order() -> None:
+    volumes = Volumes(sales=2_000, years=0.5)
+    prices = {f"p{n}": 1.0 + n for n in range(20)}
+    writes = list(
+        generate_sales(_db(), random.Random(1), volumes, START, prices, ["u"])
+    )
+
+    assert len(writes) == 2_000
+    sales = [data for _, _, data in writes]
+    assert [sale["sale_number"] for sale in sales[:2]] == ["SALE-000001", "SALE-000002"]
+    created = [sale["created_at"] for sale in sales]
+    assert created == sorted(created)
+    assert created[-1] < START + timedelta(days=183)
+    for sale in sales:
+        assert 1 <= len(sale["items"]) <= 20
+        assert sale["total"] == sale["subtotal"] + sale["tax"]
+
+
+def test_sales_are_numbered_after_existing_ones() -> None:
+    volumes = Volumes(sales=10, years=0.1)
+    writes = generate_sales(
+        _db(), random.Random(1), volumes, START, {"p": 1.0}, ["u"], existing=41
+    )
+
+    assert next(writes)[2]["sale_number"] == "SALE-000042"
+
+
+def test_item_stock_matches_latest_ledger_entry() -> None:
+    volumes = Volumes(items=10, adjustments_per_item=40)
+    end = START + timedelta(days=365)
+    ledger: dict[str, list[dict]] = defaultdict(list)
+    stock = {}
+    for _, (collection, doc_id), data in generate_inventory(
+        _db(), random.Random(2), volumes, START, end, ["u"]
+    ):
+        if collection == "items":
+            stock[doc_id] = data["stock_quantity"]
+        elif collection == "inventory_adjustments":
+            ledger[data["item_id"]].append(data)
+
+    assert len(stock) == 10
+    for item_id, entries in ledger.items():
+        assert [e["created_at"] for e in entries] == sorted(
+            e["created_at"] for e in entries
+        )
+        for previous, entry in zip(entries, entries[1:]):
+            assert entry["previous_quantity"] == previous["new_quantity"]
+        assert all(e["new_quantity"] >= 0 and e["quantity"] > 0 for e in entries)
+        assert stock[item_id] == entries[-1]["new_quantity"]
+
+
+def test_recipe_ingredients_are_distinct() -> None:
+    volumes = Volumes(recipes=30)
+    writes = list(
+        generate_recipes(
+            _db(),
+            random.Random(3),
+            volumes,
+            START,
+            [f"p{n}" for n in range(50)],
+            [f"i{n}" for n in range(10)],
+        )
+    )
+
+    assert len(writes) == 30
+    for _, _, recipe in writes:
+        item_ids = [ingredient["item_id"] for ingredient in recipe["ingredients"]]
+        assert 2 <= len(item_ids) == len(set(item_ids)) <= 8
+
+
+def test_low_stock_entries_match_reorder_points() -> None:
+    end = START + timedelta(days=365)
+    writes = [
+        *generate_products(_db(), random.Random(4), Volumes(products=50), START)[1],
+        *generate_inventory(
+            _db(), random.Random(5), Volumes(items=50), START, end, ["u"]
+        ),
+    ]
+    documents = {
+        (collection, doc_id): data
+        for _, (collection, doc_id), data in writes
+        if collection in ("products", "items")
+    }
+    low_stock = {
+        doc_id: (operation, data)
+        for operation, (collection, doc_id), data in writes
+        if collection == "low_stock"
+    }
+
+    kinds = {"products": "product", "items": "item"}
+    for (collection, doc_id), document in documents.items():
+        operation, entry = low_stock[f"{kinds[collection]}-{doc_id}"]
+        reorder_point = document["reorder_point"]
+        if reorder_point is not None and document["stock_quantity"] <= reorder_point:
+            assert operation == "set"
+            assert entry["stock_quantity"] == document["stock_quantity"]
+        else:
+            # Clears what an earlier seed may have left
+            assert operation == "delete"
+    assert any(operation == "set" for operation, _ in low_stock.values())
@@ -0,0 +1,262 @@
+"""An in-memory stand-in for the Firestore client, for route tests.
+
+Covers what the routes use: document reads and writes, ``get_all``,
+batches (with ``last_update_time`` preconditions), transactions run through
+``firestore.transactional``, and simple queries.
+"""
+
+import operator
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+from unittest.mock import MagicMock
+
+from fastapi.testclient import TestClient
+from google.api_core.exceptions import FailedPrecondition
+from google.cloud import firestore
+
+from app.api.deps import get_db
+from app.core import security
+from app.main import app
+
+OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class Snapshot:
+    def __init__(self, reference: "DocumentReference", data: dict | None, version: int):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self.update_time = version
+        self._data = data
+
+    def to_dict(self) -> dict[str, Any] | None:
+        return None if self._data is None else dict(self._data)
+
+    def get(self, field: str) -> Any:
+        return (self._data or {})[field]
+
+
+class DocumentReference:
+    def __init__(self, db: "FakeFirestore", collection: str, doc_id: str) -> None:
+        self._db = db
+        self.id = doc_id
+        self.parent = MagicMock(id=collection)
+        self.path = f"{collection}/{doc_id}"
+
+    def get(self, transaction: Any = None) -> Snapshot:
+        return self._db.snapshot(self)
+
+    def set(self, data: dict[str, Any]) -> None:
+        self._db.apply("set", self, data)
+
+    def update(self, data: dict[str, Any]) -> None:
+        self._db.apply("update", self, data)
+
+    def delete(self) -> None:
+        self._db.apply("delete", self, None)
+
+
+class Query:
+    def __init__(self, db: "FakeFirestore", collection: str) -> None:
+        self._db = db
+        self._collection = collection
+        self._filters: list[tuple[str, str, Any]] = []
+        self._orders: list[tuple[str, str]] = []
+        self._offset = 0
+        self._limit: int | None = None
+
+    def _copy(self) -> "Query":
+        query = Query(self._db, self._collection)
+        query._filters = list(self._filters)
+        query._orders = list(self._orders)
+        query._offset, query._limit = self._offset, self._limit
+        return query
+
+    def where(self, *, filter: Any) -> "Query":
+        query = self._copy()
+        query._filters.append((filter.field_path, filter.op_string, filter.value))
+        return query
+
+    def order_by(
+        self, field: str, direction: str = firestore.Query.ASCENDING
+    ) -> "Query":
+        query = self._copy()
+        query._orders.append((field, direction))
+        return query
+
+    def offset(self, offset: int) -> "Query":
+        query = self._copy()
+        query._offset = offset
+        return query
+
+    def limit(self, limit: int) -> "Query":
+        query = self._copy()
+        query._limit = limit
+        return query
+
+    def select(self, fields: list[str]) -> "Query":
+        return self
+
+    def _matching(self) -> list[Snapshot]:
+        snapshots = [
+            self._db.snapshot(self._db.collection(self._collection).document(doc_id))
+            for doc_id in list(self._db.docs.get(self._collection, {}))
+        ]
+        snapshots = [
+            snapshot
+            for snapshot in snapshots
+            if all(
+                field in snapshot._data and OPERATORS[op](snapshot._data[field], value)
+                for field, op, value in self._filters
+            )
+        ]
+        for field, direction in reversed(self._orders):
+            snapshots.sort(
+                key=lambda snapshot: snapshot._data[field],
+                reverse=direction == firestore.Query.DESCENDING,
+            )
+        return snapshots
+
+    def stream(self) -> list[Snapshot]:
+        snapshots = self._matching()[self._offset :]
+        return snapshots if self._limit is None else snapshots[: self._limit]
+
+    def count(self) -> MagicMock:
+        result = MagicMock()
+        result.get.return_value = [[MagicMock(value=len(self._matching()))]]
+        return result
+
+
+class CollectionReference(Query):
+    def __init__(self, db: "FakeFirestore", name: str) -> None:
+        super().__init__(db, name)
+        self.id = name
+
+    def document(self, doc_id: str | None = None) -> DocumentReference:
+        if doc_id is None:
+            self._db.generated += 1
+            doc_id = f"{self.id}-{self._db.generated}"
+        return DocumentReference(self._db, self.id, doc_id)
+
+
+class WriteBatch:
+    def __init__(self, db: "FakeFirestore") -> None:
+        self._db = db
+        self._writes: list[tuple[str, DocumentReference, Any, Any]] = []
+
+    def set(self, reference: DocumentReference, data: dict[str, Any]) -> None:
+        self._writes.append(("set", reference, data, None))
+
+    def create(self, reference: DocumentReference, data: dict[str, Any]) -> None:
+        self._writes.append(("create", reference, data, None))
+
+    def update(
+        self, reference: DocumentReference, data: dict[str, Any], option: Any = None
+    ) -> None:
+        self._writes.append(("update", reference, data, option))
+
+    def delete(self, reference: DocumentReference) -> None:
+        self._writes.append(("delete", reference, None, None))
+
+    def commit(self) -> None:
+        # All or nothing, like a real commit
+        for operation, reference, _, option in self._writes:
+            if option is not None and option != self._db.version(reference):
+                raise FailedPrecondition(f"{reference.path} changed")
+            if operation == "create" and self._db.snapshot(reference).exists:
+                raise FailedPrecondition(f"{reference.path} exists")
+        for operation, reference, data, _ in self._writes:
+            self._db.apply(operation, reference, data)
+        self._writes = []
+
+
+class Transaction(WriteBatch):
+    _read_only = False
+    _max_attempts = 1
+    _id = b"transaction"
+
+    def _clean_up(self) -> None:
+        self._writes = []
+
+    def _begin(self, retry_id: Any = None) -> None:
+        pass
+
+    def _commit(self) -> None:
+        self.commit()
+
+    def _rollback(self) -> None:
+        self._writes = []
+
+
+class FakeFirestore:
+    def __init__(self, docs: dict[str, dict[str, dict[str, Any]]] | None = None):
+        self.docs: dict[str, dict[str, dict[str, Any]]] = {
+            collection: {doc_id: dict(data) for doc_id, data in documents.items()}
+            for collection, documents in (docs or {}).items()
+        }
+        self.versions: dict[str, int] = {}
+        self.generated = 0
+        self.commits = 0
+
+    def collection(self, name: str) -> CollectionReference:
+        return CollectionReference(self, name)
+
+    def version(self, reference: DocumentReference) -> int:
+        return self.versions.get(reference.path, 0)
+
+    def snapshot(self, reference: DocumentReference) -> Snapshot:
+        data = self.docs.get(reference.parent.id, {}).get(reference.id)
+        return Snapshot(reference, data, self.version(reference))
+
+    def apply(self, operation: str, reference: DocumentReference, data: Any) -> None:
+        documents = self.docs.setdefault(reference.parent.id, {})
+        if operation == "delete":
+            documents.pop(reference.id, None)
+        elif operation == "update":
+            if reference.id not in documents:
+                raise FailedPrecondition(f"{reference.path} does not exist")
+            documents[reference.id].update(data)
+        else:
+            documents[reference.id] = dict(data)
+        self.versions[reference.path] = self.version(reference) + 1
+
+    def get_all(
+        self, references: list[DocumentReference], transaction: Any = None
+    ) -> list[Snapshot]:
+        return [self.snapshot(reference) for reference in references]
+
+    def batch(self) -> WriteBatch:
+        self.commits += 1
+        return WriteBatch(self)
+
+    def transaction(self) -> Transaction:
+        return Transaction(self)
+
+    def write_option(self, *, last_update_time: Any) -> Any:
+        return last_update_time
+
+
+def client(db: FakeFirestore) -> TestClient:
+    """A client of the application reading and writing ``db``.
+
+    The lifespan is not run, so nothing connects to Firestore.
+    """
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def auth_headers(user_id: str = "admin", superuser: bool = True) -> dict[str, str]:
+    user = MagicMock(
+        email=f"{user_id}@example.com", is_superuser=superuser, full_name=None
+    )
+    token = security.create_access_token(
+        user_id, timedelta(minutes=5), claims=security.user_claims(user)
+    )
+    return {"Authorization": f"Bearer {token}"}